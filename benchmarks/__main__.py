@@ -0,0 +1,41 @@
+"""
+ * Runs the benchmark suite.
+ *
+ *   python -m benchmarks                          # run everything
+ *   python -m benchmarks -k dispatch              # only names containing "dispatch"
+ *   python -m benchmarks --json results.json      # save machine readable results
+ *   python -m benchmarks --baseline results.json  # fail on regressions
+"""
+import argparse
+import sys
+from . import suite
+from . import bench_core, bench_change_detection, bench_columnar
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Runs the python_redux benchmark suite.')
+	parser.add_argument('-k', dest='pattern', help='only run benchmarks whose name contains this string')
+	parser.add_argument('--json', dest='output', help='write the results to this JSON file')
+	parser.add_argument('--baseline', help='compare against the results in this JSON file')
+	parser.add_argument('--threshold', type=float, default=0.1, help='allowed slowdown against the baseline (default 0.1 = 10%%)')
+	parser.add_argument('--repeat', type=int, default=5, help='number of timing repeats per benchmark (default 5)')
+	parser.add_argument('--min-time', type=float, default=0.2, help='minimum seconds per repeat (default 0.2)')
+	args = parser.parse_args(argv)
+	
+	report = lambda name, seconds: print('{:<50} {:>12.3f} us'.format(name, seconds * 1e6))
+	results = suite.run(args.pattern, args.repeat, args.min_time, report)
+	if args.output:
+		suite.save(results, args.output)
+	
+	if args.baseline:
+		regressions = 0
+		print('\n{:<50} {:>12} {:>12} {:>8}'.format('benchmark', 'baseline us', 'current us', 'ratio'))
+		for name, seconds, baseline_seconds, ratio, regressed in suite.compare(results, suite.load(args.baseline), args.threshold):
+			regressions += regressed
+			print('{:<50} {:>12.3f} {:>12.3f} {:>7.2f}x{}'.format(name, baseline_seconds * 1e6, seconds * 1e6, ratio, '  REGRESSION' if regressed else ''))
+		if regressions:
+			print('\n{} benchmark(s) regressed by more than {:.0%}'.format(regressions, args.threshold))
+			return 1
+	return 0
+
+if __name__ == '__main__':
+	sys.exit(main())
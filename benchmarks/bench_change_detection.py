@@ -0,0 +1,71 @@
+"""
+ * Compares identity and value-equality change detection in `combine_reducers`
+ * on large list and dict slices that are untouched by the dispatched action.
+ *
+ * Run with `python -m benchmarks.bench_change_detection`, or as part of the
+ * suite with `python -m benchmarks`.
+"""
+import operator
+import timeit
+from python_redux import PersistentVector, combine_reducers, diff_state
+from .suite import benchmark
+
+SLICE_SIZE = 10000
+SLICE_COUNT = 4
+
+def make_reducer(is_equal=None):
+	def list_slice(state=None, action=None):
+		if state is None:
+			state = list(range(SLICE_SIZE))
+		return state
+	
+	def dict_slice(state=None, action=None):
+		if state is None:
+			state = dict((str(i), i) for i in range(SLICE_SIZE))
+		return state
+	
+	reducers = {}
+	for i in range(SLICE_COUNT):
+		reducers['list_{}'.format(i)] = list_slice
+		reducers['dict_{}'.format(i)] = dict_slice
+	return combine_reducers(reducers, is_equal=is_equal)
+
+COMPARATORS = { 'identity': None, 'equality': operator.eq }
+
+@benchmark('change_detection', mode=sorted(COMPARATORS))
+def unchanged_dispatch(mode):
+	reducer = make_reducer(COMPARATORS[mode])
+	state = reducer(None, { 'type': '@@redux/INIT' })
+	action = { 'type': 'UNRELATED' }
+	return lambda: reducer(state, action)
+
+@benchmark('diff_state', container=('list', 'vector'))
+def diff_one_changed_item(container):
+	items = list(range(SLICE_SIZE))
+	if container == 'list':
+		previous_items = items
+		next_items = list(items)
+		next_items[SLICE_SIZE // 2] = -1
+	else:
+		previous_items = PersistentVector(items)
+		next_items = previous_items.set(SLICE_SIZE // 2, -1)
+	previous_state = dict(make_reducer()(None, { 'type': '@@redux/INIT' }), list_0=previous_items)
+	next_state = dict(previous_state, list_0=next_items)
+	return lambda: diff_state(previous_state, next_state, frozenset(['list_0']))
+
+def run(number=200):
+	results = {}
+	for name in COMPARATORS:
+		seconds = timeit.timeit(unchanged_dispatch(name), number=number)
+		results[name] = seconds / number
+	return results
+
+def main():
+	results = run()
+	print('{} slices of {} elements, per dispatch:'.format(SLICE_COUNT * 2, SLICE_SIZE))
+	for name in sorted(results):
+		print('  {:<10} {:>10.2f} us'.format(name, results[name] * 1e6))
+	print('  speedup    {:>10.1f}x'.format(results['equality'] / results['identity']))
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,42 @@
+"""
+ * Compares a batch of deposits applied to a list of dicts, one action at a
+ * time, with the same batch applied to a columnar `Table`. Only registered
+ * when numpy is installed.
+"""
+from python_redux import Table, column_add, table_batch, table_reducer
+from python_redux.columnar import numpy
+from .suite import benchmark
+
+ROWS = 100000
+BATCH = 1000
+
+def records(state=None, action=None):
+	if state is None:
+		state = [{ 'balance': 0 } for i in range(ROWS)]
+	if action.get('type') == 'DEPOSIT':
+		state = list(state)
+		record = state[action['account']]
+		state[action['account']] = dict(record, balance=record['balance'] + action['amount'])
+	return state
+
+def deposits():
+	return [{ 'type': 'DEPOSIT', 'account': (i * 7919) % ROWS, 'amount': i } for i in range(BATCH)]
+
+if numpy is not None:
+	@benchmark('deposit_batch', layout=('records', 'columnar'))
+	def apply_deposit_batch(layout):
+		actions = deposits()
+		if layout == 'records':
+			state = records(None, {})
+			def apply():
+				result = state
+				for action in actions:
+					result = records(result, action)
+				return result
+			return apply
+		reducer = table_reducer(Table(balance=numpy.zeros(ROWS, dtype=numpy.int64)), {
+			'DEPOSIT': column_add('balance', index='account', value='amount')
+		})
+		state = reducer(None, {})
+		action = table_batch(actions)
+		return lambda: reducer(state, action)
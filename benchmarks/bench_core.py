@@ -0,0 +1,157 @@
+"""
+ * Benchmarks for the hot paths of the core API: dispatch, listener
+ * notification, subscription churn, middleware, compose, bound action
+ * creators and entity slices.
+"""
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from python_redux import apply_middleware, bind_action_creators, coalesce, coalescing_middleware, combine_reducers, compose, create_entity_adapter, create_store, flush_coalesced, handles, parallel
+from test.helpers.reducers import counter
+from .suite import benchmark
+
+def make_slice():
+	def slice_reducer(state=None, action=None):
+		if state is None:
+			state = 0
+		if action.get('type') == 'increment':
+			return state + 1
+		return state
+	return slice_reducer
+
+def pass_through(store):
+	return lambda next: lambda action: next(action)
+
+@benchmark('dispatch', slices=(1, 10, 100, 1000))
+def dispatch_with_slices(slices):
+	reducer = combine_reducers(dict(('slice_{}'.format(i), make_slice()) for i in range(slices)))
+	dispatch = create_store(reducer)['dispatch']
+	action = { 'type': 'increment' }
+	return lambda: dispatch(action)
+
+@benchmark('combine_reducers', sanity_check=('eager', 'lazy', 'once', 'off'))
+def build_combination(sanity_check):
+	slices = dict(('slice_{}'.format(i), counter) for i in range(100))
+	return lambda: combine_reducers(slices, sanity_check=sanity_check)
+
+@benchmark('dispatch_production', production=(False, True))
+def dispatch_in_production_mode(production):
+	reducer = combine_reducers(dict(('slice_{}'.format(i), make_slice()) for i in range(10)), production=production)
+	dispatch = create_store(reducer, production=production)['dispatch']
+	action = { 'type': 'increment' }
+	return lambda: dispatch(action)
+
+PAYLOAD = bytes(1 << 20)
+
+def make_hashing_slice():
+	# hashlib releases the GIL while hashing large buffers
+	@parallel
+	def hashing_slice(state=None, action=None):
+		return hashlib.sha256(PAYLOAD).digest()
+	return hashing_slice
+
+@benchmark('parallel_slices', workers=(0, 4))
+def dispatch_with_parallel_slices(workers):
+	executor = ThreadPoolExecutor(workers) if workers else None
+	reducer = combine_reducers(dict(('slice_{}'.format(i), make_hashing_slice()) for i in range(4)), executor=executor)
+	dispatch = create_store(reducer)['dispatch']
+	action = { 'type': 'hash' }
+	return lambda: dispatch(action)
+
+@benchmark('dispatch_listeners', listeners=(0, 10, 100, 1000))
+def dispatch_with_listeners(listeners):
+	store = create_store(counter)
+	for i in range(listeners):
+		store['subscribe'](lambda: None)
+	dispatch = store['dispatch']
+	action = { 'type': 'increment' }
+	return lambda: dispatch(action)
+
+@benchmark('nested_dispatch_listeners', scheduler=('immediate', 'coalesce'))
+def dispatch_from_listener(scheduler):
+	# One listener reacts to every increment by dispatching 10 more actions, 100 others only read
+	store = create_store(counter, scheduler=coalesce if scheduler == 'coalesce' else None)
+	dispatch = store['dispatch']
+	follow_up = { 'type': 'follow_up' }
+	last_count = [store['get_state']()]
+	def reacting_listener():
+		if store['get_state']() != last_count[0]:
+			last_count[0] = store['get_state']()
+			for i in range(10):
+				dispatch(follow_up)
+	store['subscribe'](reacting_listener)
+	for i in range(100):
+		store['subscribe'](lambda: None)
+	action = { 'type': 'increment' }
+	return lambda: dispatch(action)
+
+@benchmark('subscribe_unsubscribe', listeners=(10, 1000, 10000))
+def subscribe_churn(listeners):
+	store = create_store(counter)
+	for i in range(listeners):
+		store['subscribe'](lambda: None)
+	subscribe = store['subscribe']
+	listener = lambda: None
+	return lambda: subscribe(listener)()
+
+@benchmark('apply_middleware', depth=(0, 1, 10, 50))
+def dispatch_through_middleware(depth):
+	store = create_store(counter, apply_middleware(*[pass_through] * depth))
+	dispatch = store['dispatch']
+	action = { 'type': 'increment' }
+	return lambda: dispatch(action)
+
+@benchmark('filtered_middleware', handled=(20, 1, 0))
+def dispatch_through_filtered_middleware(handled):
+	# 20 middlewares, of which only `handled` are interested in the action
+	chain = [pass_through] * handled + [handles('type_{}'.format(i))(pass_through) for i in range(20 - handled)]
+	store = create_store(counter, apply_middleware(*chain))
+	dispatch = store['dispatch']
+	action = { 'type': 'increment' }
+	return lambda: dispatch(action)
+
+@benchmark('coalesced_burst', coalescing=(False, True))
+def dispatch_burst(coalescing):
+	# 100 position updates for 10 entities, then a flush, with 100 listeners
+	def positions(state=None, action=None):
+		if state is None:
+			state = {}
+		if action.get('type') == 'move':
+			return dict(state, **{ action['id']: action['x'] })
+		return state
+	middleware = [coalescing_middleware(key=lambda action: action.get('id'), window=None)] if coalescing else []
+	store = create_store(positions, apply_middleware(*middleware))
+	for i in range(100):
+		store['subscribe'](lambda: None)
+	dispatch = store['dispatch']
+	actions = [{ 'type': 'move', 'id': 'entity_{}'.format(i % 10), 'x': i } for i in range(100)]
+	flush = flush_coalesced()
+	def burst():
+		for action in actions:
+			dispatch(action)
+		if coalescing:
+			dispatch(flush)
+	return burst
+
+@benchmark('compose', depth=(1, 10, 100))
+def call_composition(depth):
+	composition = compose(*[lambda x: x] * depth)
+	return lambda: composition(1)
+
+@benchmark('bind_action_creators')
+def call_bound_action_creator():
+	store = create_store(counter)
+	increment = bind_action_creators(lambda: { 'type': 'increment' }, store['dispatch'])
+	return increment
+
+@benchmark('entity_update', storage=('list', 'adapter'))
+def update_entity_by_id(storage):
+	todos = [{ 'id': id, 'text': 'todo {}'.format(id) } for id in range(10000)]
+	if storage == 'list':
+		def update(state, id):
+			return [dict(todo, text='done') if todo['id'] == id else todo for todo in state]
+		state = todos
+	else:
+		adapter = create_entity_adapter()
+		update = lambda state, id: adapter['update_one'](state, id, { 'text': 'done' })
+		state = adapter['get_initial_state'](todos)
+	return lambda: update(state, 5000)
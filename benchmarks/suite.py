@@ -0,0 +1,67 @@
+"""
+ * A tiny benchmark registry and runner built on `timeit`.
+ *
+ * A benchmark is a setup function registered with `@benchmark`. It receives
+ * one value for each parameter and returns the zero argument callable to time.
+ * Results are the best time per call, in seconds, over several repeats.
+"""
+import json
+import platform
+import timeit
+
+BENCHMARKS = []
+
+def benchmark(name, **params):
+	"""Registers a setup function. At most one parameter may be given, as a
+	sequence of values, and a case is registered for every value.
+	"""
+	def register(setup):
+		if not params:
+			BENCHMARKS.append((name, setup, {}))
+		for key, values in params.items():
+			for value in values:
+				BENCHMARKS.append(('{}[{}={}]'.format(name, key, value), setup, { key: value }))
+		return setup
+	return register
+
+def time_case(setup, kwargs, repeat, min_time):
+	timer = timeit.Timer(setup(**kwargs))
+	number = 1
+	while timer.timeit(number) < min_time / 10:
+		number *= 10
+	return min(timer.repeat(repeat, number)) / number
+
+def run(pattern=None, repeat=5, min_time=0.2, report=None):
+	results = {}
+	for name, setup, kwargs in BENCHMARKS:
+		if pattern and pattern not in name:
+			continue
+		results[name] = time_case(setup, kwargs, repeat, min_time)
+		if report:
+			report(name, results[name])
+	return {
+		'python': platform.python_version(),
+		'implementation': platform.python_implementation(),
+		'results': results
+	}
+
+def compare(results, baseline, threshold):
+	"""Returns `(name, seconds, baseline_seconds, ratio, regressed)` for every
+	benchmark present in both runs.
+	"""
+	comparison = []
+	for name, seconds in sorted(results['results'].items()):
+		baseline_seconds = baseline['results'].get(name)
+		if baseline_seconds is None:
+			continue
+		ratio = seconds / baseline_seconds
+		comparison.append((name, seconds, baseline_seconds, ratio, ratio > 1 + threshold))
+	return comparison
+
+def load(path):
+	with open(path) as f:
+		return json.load(f)
+
+def save(results, path):
+	with open(path, 'w') as f:
+		json.dump(results, f, indent=2, sort_keys=True)
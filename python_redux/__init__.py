@@ -1,7 +1,23 @@
+from .apply_async_middleware import apply_async_middleware, async_thunk
 from .apply_middleware import apply_middleware
 from .bind_action_creators import bind_action_creators
-from .combine_reducers import combine_reducers
+from .coalescing_middleware import coalescing_middleware, flush_coalesced
+from .columnar import column_add, column_append, column_set, Table, table_batch, table_reducer
+from .combine_reducers import combine_reducers, handles, parallel, set_sanity_check_default
 from .compose import compose
+from .create_async_store import create_async_store
+from .create_entity_adapter import create_entity_adapter
+from .create_selector import create_selector
 from .create_store import create_store
+from .dispatch_queue import dispatch_queue
+from .journal import journal
+from .patch import apply_patch, diff_state, patch_stream
+from .persistent import PersistentMap, PersistentVector
+from .production_mode import set_production_mode
+from .profiler import create_profiler
+from .replica import create_replica, replication
+from .schedulers import coalesce, debounce, immediate, next_tick, throttle
+from .thread_safe import thread_safe
+from .undo_history import undo_history
 
-__all__ = ['apply_middleware', 'bind_action_creators', 'combine_reducers', 'compose', 'create_store']
\ No newline at end of file
+__all__ = ['apply_async_middleware', 'apply_middleware', 'apply_patch', 'async_thunk', 'bind_action_creators', 'coalesce', 'coalescing_middleware', 'column_add', 'column_append', 'column_set', 'combine_reducers', 'compose', 'create_async_store', 'create_entity_adapter', 'create_profiler', 'create_replica', 'create_selector', 'create_store', 'debounce', 'diff_state', 'dispatch_queue', 'flush_coalesced', 'handles', 'immediate', 'journal', 'next_tick', 'parallel', 'patch_stream', 'PersistentMap', 'PersistentVector', 'replication', 'set_production_mode', 'set_sanity_check_default', 'Table', 'table_batch', 'table_reducer', 'thread_safe', 'throttle', 'undo_history']
\ No newline at end of file
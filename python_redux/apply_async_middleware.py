@@ -0,0 +1,90 @@
+import inspect
+from contextvars import ContextVar
+from .apply_middleware import compile_pipeline
+
+def apply_to_async_batch(chain, action_types, dispatch_batch, dispatch):
+	# Each dispatch_batch call collects into its own batch, found through the
+	# context of the task running it, so batches awaiting concurrently never mix
+	current_batch = ContextVar('current_batch', default=None)
+	
+	async def collect_action(action):
+		batch = current_batch.get()
+		# Middleware that held on to an action of a finished batch dispatches it alone
+		if batch is None or not batch['open']:
+			return await dispatch(action)
+		batch['actions'].append(action)
+	collect = compile_pipeline(chain, action_types, collect_action)
+	
+	async def dispatch_batch_through_chain(actions=None):
+		if actions is None or type(actions) == dict:
+			raise Exception('Expected actions to be a sequence of plain dictionaries')
+		batch = { 'actions': [], 'open': True }
+		token = current_batch.set(batch)
+		try:
+			for action in actions:
+				await collect(action)
+		finally:
+			batch['open'] = False
+			current_batch.reset(token)
+		return await dispatch_batch(batch['actions'])
+	return dispatch_batch_through_chain
+
+def apply_async_middleware(*middlewares):
+	"""Creates an async store enhancer that applies middleware to the dispatch
+	method of a store created with `create_async_store`. It works exactly like
+	`apply_middleware`, including `handles` filters, except that `next` and
+	`dispatch` are coroutine functions, so each middleware returns a coroutine
+	function as well:
+	
+		def logger(store):
+			def apply(next):
+				async def apply_action(action):
+					result = await next(action)
+					await log(store['get_state']())
+					return result
+				return apply_action
+			return apply
+	
+	@param {*Function} middlewares The middleware chain to be applied.
+	@returns {Function} An async store enhancer applying the middleware.
+	"""
+	def chain(create_async_store):
+		def inner(reducer, preloaded_state=None, enhancer=None):
+			store = create_async_store(reducer, preloaded_state, enhancer)
+			dispatch = store.get('dispatch')
+			
+			async def dispatch_through_chain(action):
+				return await dispatch(action)
+			
+			middleware_api = {
+				'get_state': store.get('get_state'),
+				'dispatch': dispatch_through_chain
+			}
+			chain = [middleware(middleware_api) for middleware in middlewares]
+			action_types = [getattr(middleware, 'action_types', None) for middleware in middlewares]
+			dispatch = compile_pipeline(chain, action_types, store.get('dispatch'))
+			
+			store_to_return = store.copy()
+			store_to_return['dispatch'] = dispatch
+			if 'dispatch_batch' in store:
+				store_to_return['dispatch_batch'] = apply_to_async_batch(chain, action_types, store.get('dispatch_batch'), store.get('dispatch'))
+			return store_to_return
+		return inner
+	return chain
+
+"""
+ * Middleware that lets you dispatch thunks: functions called with `dispatch`
+ * and `get_state`. Coroutine functions are awaited, so a thunk can perform I/O
+ * and dispatch further actions once it completes.
+"""
+def async_thunk(store):
+	def apply(next):
+		async def apply_action(action):
+			if hasattr(action, '__call__'):
+				result = action(store['dispatch'], store['get_state'])
+				if inspect.isawaitable(result):
+					result = await result
+				return result
+			return await next(action)
+		return apply_action
+	return apply
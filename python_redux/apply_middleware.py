@@ -1,4 +1,80 @@
+import threading
 from .compose import compose
+
+"""
+ * Builds the dispatch function for a middleware chain ending in `dispatch`.
+ * Middleware that declares the action types it handles with `handles` is left
+ * out of the pipeline for every other type, so each action only passes through
+ * the frames of the middleware that cares about it. Pipelines are composed the
+ * first time a type is dispatched and shared between types that run the same
+ * middleware; actions that are not dictionaries only run the middleware that
+ * did not declare any types.
+ *
+ * @param {List} chain The middleware, already given the middleware API.
+ * @param {List} action_types The types each middleware handles, or None.
+ * @param {Function} dispatch The function at the end of the chain.
+ * @returns {Function} A dispatch function running the matching pipeline.
+"""
+def compile_pipeline(chain, action_types, dispatch):
+	if all(types is None for types in action_types):
+		return compose(*chain)(dispatch)
+	
+	pipelines = {}
+	shared = {}
+	def build(included):
+		if included not in shared:
+			shared[included] = compose(*[chain[i] for i in included])(dispatch)
+		return shared[included]
+	
+	wildcard_pipeline = build(tuple(i for i, types in enumerate(action_types) if types is None))
+	
+	def dispatch_through_pipeline(action):
+		if type(action) != dict:
+			return wildcard_pipeline(action)
+		action_type = action.get('type')
+		try:
+			pipeline = pipelines[action_type]
+		except KeyError:
+			pipeline = pipelines[action_type] = build(tuple(
+				i for i, types in enumerate(action_types) if types is None or action_type in types
+			))
+		except TypeError:
+			pipeline = wildcard_pipeline
+		return pipeline(action)
+	return dispatch_through_pipeline
+
+def apply_to_batch(chain, action_types, dispatch_batch, dispatch):
+	# Each thread collects its own batches, so concurrent batches never mix
+	local = threading.local()
+	
+	def thread_batches():
+		try:
+			return local.batches
+		except AttributeError:
+			local.batches = []
+			return local.batches
+	
+	def collect_action(action):
+		batches = thread_batches()
+		# Middleware that held on to an action of a finished batch dispatches it alone
+		if not batches:
+			return dispatch(action)
+		batches[-1].append(action)
+	collect = compile_pipeline(chain, action_types, collect_action)
+	
+	def dispatch_batch_through_chain(actions=None):
+		if actions is None or type(actions) == dict:
+			raise Exception('Expected actions to be a sequence of plain dictionaries')
+		batches = thread_batches()
+		batches.append([])
+		try:
+			for action in actions:
+				collect(action)
+		finally:
+			collected = batches.pop()
+		return dispatch_batch(collected)
+	return dispatch_batch_through_chain
+
 def apply_middleware(*middlewares):
 	"""Creates a store enhancer that applies middleware to the dispatch method
 	of the Redux store. This is handy for a variety of tasks, such as expressing
@@ -11,6 +87,16 @@ def apply_middleware(*middlewares):
  
 	Note that each middleware will be given the `dispatch` and `getState` functions
 	as named arguments.
+	
+	Middleware decorated with `handles(*action_types)` only sees actions of those
+	types; any other action skips it entirely. Its `next` layer is called once for
+	each distinct pipeline it ends up in, rather than once per store.
+	
+	Actions passed to `dispatch_batch` run through the middleware one by one, and
+	whatever reaches the end of the chain is reduced as a single batch. Middleware
+	therefore sees the state from before the batch while it is being collected.
+	Each thread collects its own batches, and actions that middleware holds back
+	and only passes on after the batch was reduced are dispatched on their own.
  
 	@param {*Function} middlewares The middleware chain to be applied.
 	@returns {Function} A store enhancer applying the middleware.
@@ -18,18 +104,22 @@ def apply_middleware(*middlewares):
 	def chain(create_store):
 		def inner(reducer, preloaded_state=None, enhancer=None):
 			store = create_store(reducer, preloaded_state, enhancer)
+			if not middlewares:
+				return store
 			dispatch = store.get('dispatch')
-			chain = []
 			
 			middleware_api = {
 				'get_state': store.get('get_state'),
 				'dispatch': lambda action: dispatch(action)
 			}
 			chain = [middleware(middleware_api) for middleware in middlewares]
-			dispatch = compose(*chain)(store.get('dispatch'))
+			action_types = [getattr(middleware, 'action_types', None) for middleware in middlewares]
+			dispatch = compile_pipeline(chain, action_types, store.get('dispatch'))
 			
 			store_to_return = store.copy()
 			store_to_return['dispatch'] = dispatch
+			if 'dispatch_batch' in store:
+				store_to_return['dispatch_batch'] = apply_to_batch(chain, action_types, store.get('dispatch_batch'), store.get('dispatch'))
 			return store_to_return
 		return inner
 	return chain
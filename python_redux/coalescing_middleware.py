@@ -0,0 +1,116 @@
+import time
+from collections import OrderedDict
+from threading import Condition, Thread
+from .combine_reducers import handles
+
+COALESCE_ACTION_TYPES = {
+	'FLUSH': '@@redux/COALESCE_FLUSH'
+}
+
+"""
+ * Creates the action that makes coalescing middleware forward everything it
+ * buffered right away. Each coalescing middleware passes it on after its
+ * buffer, so every one in the chain flushes, and reducers then ignore it like
+ * any other private `@@redux/*` action.
+ *
+ * @returns {Object} The flush action.
+"""
+def flush_coalesced():
+	return { 'type': COALESCE_ACTION_TYPES['FLUSH'] }
+
+def last_write_wins(buffered_action, action):
+	return action
+
+"""
+ * Creates middleware that coalesces "last write wins" actions, such as
+ * position updates or progress ticks, before they are reduced.
+ *
+ * Actions with a key, as returned by `key(action)`, are buffered per type and
+ * key instead of being passed on. A new action for a buffered type and key is
+ * combined with the buffered one with `merge(buffered_action, action)`. As
+ * soon as `flush_coalesced()` is dispatched, the buffer is passed on to the
+ * rest of the middleware chain, one merged action per type and key in the
+ * order they were first buffered. Middleware earlier in the chain only sees
+ * the original actions and the flush action.
+ *
+ * Actions without a key pass straight through, so they may be reduced before
+ * coalesced actions buffered earlier. With a `window`, the buffer is also
+ * flushed `window` seconds after its first action was buffered, by one
+ * background thread per store, so the store must be made `thread_safe` inside
+ * `apply_middleware`:
+ *
+ *		create_store(reducer, compose(apply_middleware(coalescing), thread_safe))
+ *
+ * @param {Function} key Returns the key of an action, such as the id of the
+ * entity it updates, or None for actions that must not be coalesced.
+ * @param {Function} [merge] Combines a buffered action with a newer one with
+ * the same type and key. Defaults to keeping the newer one.
+ * @param {float} [window] Seconds to buffer actions for, or None, the default,
+ * to only flush on `flush_coalesced()`.
+ * @param {Iterable} [action_types] The only action types to coalesce. Other
+ * actions skip the middleware entirely (see `handles`).
+ * @returns {Function} The middleware, for `apply_middleware`.
+"""
+def coalescing_middleware(key=None, merge=last_write_wins, window=None, action_types=None):
+	if not hasattr(key, '__call__'):
+		raise Exception('Expected key to be a function')
+	if not hasattr(merge, '__call__'):
+		raise Exception('Expected merge to be a function')
+	if window is not None and window < 0:
+		raise Exception('Expected window to be at least 0 or None, instead received {}.'.format(window))
+	
+	def middleware(store):
+		condition = Condition()
+		# Maps (type, key) to the merged action and the `next` of its pipeline
+		buffer = OrderedDict()
+		first_buffered_at = None
+		timer = None
+		
+		def flush():
+			nonlocal first_buffered_at
+			with condition:
+				entries = list(buffer.values())
+				buffer.clear()
+				first_buffered_at = None
+			for action, next in entries:
+				next(action)
+			return [action for action, next in entries]
+		
+		def flush_after_window():
+			while True:
+				with condition:
+					while first_buffered_at is None or time.monotonic() < first_buffered_at + window:
+						condition.wait(None if first_buffered_at is None else first_buffered_at + window - time.monotonic())
+				flush()
+		
+		def apply_middleware(next):
+			def apply_action(action):
+				nonlocal first_buffered_at, timer
+				if type(action) != dict:
+					return next(action)
+				if action.get('type') == COALESCE_ACTION_TYPES['FLUSH']:
+					flushed = flush()
+					next(action)
+					return flushed
+				action_key = key(action)
+				if action_key is None:
+					return next(action)
+				buffer_key = (action.get('type'), action_key)
+				with condition:
+					if buffer_key in buffer:
+						buffer[buffer_key] = (merge(buffer[buffer_key][0], action), next)
+					else:
+						buffer[buffer_key] = (action, next)
+						if window is not None and first_buffered_at is None:
+							first_buffered_at = time.monotonic()
+							if timer is None:
+								timer = Thread(target=flush_after_window, daemon=True)
+								timer.start()
+							condition.notify()
+				return action
+			return apply_action
+		return apply_middleware
+	
+	if action_types is not None:
+		return handles(*action_types, COALESCE_ACTION_TYPES['FLUSH'])(middleware)
+	return middleware
@@ -0,0 +1,199 @@
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
+"""
+ * Columnar slices for large tables of numeric records.
+ *
+ * A `Table` keeps one NumPy array per field instead of a list of dicts, and is
+ * read straight from `get_state()`: `state['accounts']['balance']` is the
+ * array itself. Tables are immutable, their arrays are read-only, and every
+ * update returns a new table that only copies the columns it changed, so
+ * identity change detection in `combine_reducers` keeps working.
+ *
+ * `table_reducer` turns a set of column operations into a slice reducer. A
+ * batch of actions, dispatched as a single `table_batch(actions)` action, is
+ * applied with one vectorized NumPy call for each run of actions of the same
+ * type instead of one Python call per action.
+ *
+ * NumPy is only needed once a table is created.
+"""
+
+TABLE_ACTION_TYPES = {
+	'BATCH': 'TABLE_BATCH'
+}
+
+def require_numpy():
+	if numpy is None:
+		raise Exception('Columnar tables require numpy to be installed')
+
+def read_only(array):
+	array.flags.writeable = False
+	return array
+
+class Table(object):
+	"""An immutable table holding one read-only NumPy array per field.
+	
+		positions = Table(x=numpy.zeros(1000), y=numpy.zeros(1000))
+		positions = positions.set_columns(x=positions['x'] + 1)
+	"""
+	__slots__ = ('_columns', '_length')
+	
+	def __init__(self, columns=None, **kwargs):
+		require_numpy()
+		arrays = {}
+		for field, values in dict(columns or {}, **kwargs).items():
+			arrays[field] = read_only(numpy.array(values))
+		lengths = set(len(array) for array in arrays.values())
+		if len(lengths) > 1:
+			raise Exception('Expected every column of a table to have the same length')
+		self._columns = arrays
+		self._length = lengths.pop() if lengths else 0
+	
+	@classmethod
+	def _create(cls, columns, length):
+		instance = cls.__new__(cls)
+		instance._columns = columns
+		instance._length = length
+		return instance
+	
+	@classmethod
+	def from_rows(cls, rows, dtypes):
+		"""Builds a table from a sequence of dicts, given the dtype of every field."""
+		require_numpy()
+		rows = list(rows)
+		return cls(dict(
+			(field, numpy.fromiter((row[field] for row in rows), dtype=dtype, count=len(rows)))
+			for field, dtype in dtypes.items()
+		))
+	
+	@property
+	def fields(self):
+		return tuple(self._columns)
+	
+	def __len__(self):
+		return self._length
+	
+	def __getitem__(self, field):
+		return self._columns[field]
+	
+	def __contains__(self, field):
+		return field in self._columns
+	
+	def row(self, index):
+		return dict((field, array[index].item()) for field, array in self._columns.items())
+	
+	def rows(self):
+		for index in range(self._length):
+			yield self.row(index)
+	
+	def set_columns(self, columns=None, **kwargs):
+		"""Returns a table with the given columns replaced or added. Arrays that are
+		already read-only are shared rather than copied."""
+		updated = dict(self._columns)
+		for field, values in dict(columns or {}, **kwargs).items():
+			if isinstance(values, numpy.ndarray) and not values.flags.writeable:
+				updated[field] = values
+			else:
+				updated[field] = read_only(numpy.array(values))
+			if len(updated[field]) != self._length:
+				raise Exception('Expected column "{}" to have {} rows'.format(field, self._length))
+		return Table._create(updated, self._length)
+	
+	def __repr__(self):
+		return 'Table({} rows: {})'.format(self._length, ', '.join(str(field) for field in self._columns))
+
+def gather(actions, key, dtype):
+	return numpy.fromiter((action[key] for action in actions), dtype=dtype, count=len(actions))
+
+"""
+ * A column operation adding `action[value]` to `field` at row `action[index]`.
+ * Rows hit several times in a batch accumulate every value.
+"""
+def column_add(field, index='index', value='value'):
+	def apply(table, actions):
+		column = table[field].copy()
+		numpy.add.at(column, gather(actions, index, numpy.intp), gather(actions, value, column.dtype))
+		return table.set_columns({ field: read_only(column) })
+	return apply
+
+"""
+ * A column operation setting `field` at row `action[index]` to `action[value]`.
+ * The last action of a batch wins for rows set several times.
+"""
+def column_set(field, index='index', value='value'):
+	def apply(table, actions):
+		column = table[field].copy()
+		indexes = gather(actions, index, numpy.intp)
+		values = gather(actions, value, column.dtype)
+		# Fancy assignment does not promise an order, so keep the last value per row
+		unique_indexes, last = numpy.unique(indexes[::-1], return_index=True)
+		column[unique_indexes] = values[::-1][last]
+		return table.set_columns({ field: read_only(column) })
+	return apply
+
+"""
+ * A column operation appending `action[key]` as a new row, where `key` is the
+ * action key holding the row dict. Every field of the table must be given.
+"""
+def column_append(key='row'):
+	def apply(table, actions):
+		columns = {}
+		for field in table.fields:
+			column = table[field]
+			added = numpy.fromiter((action[key][field] for action in actions), dtype=column.dtype, count=len(actions))
+			columns[field] = read_only(numpy.concatenate((column, added)))
+		return Table._create(columns, len(table) + len(actions))
+	return apply
+
+"""
+ * Wraps actions in a single action that a `table_reducer` applies with one
+ * vectorized operation per run of consecutive actions of the same type.
+ *
+ * @param {Iterable} actions The actions to apply.
+ * @returns {Object} The batch action.
+"""
+def table_batch(actions):
+	return { 'type': TABLE_ACTION_TYPES['BATCH'], 'actions': list(actions) }
+
+"""
+ * Creates a slice reducer for a `Table`.
+ *
+ * @param {Table} initial_table The state of the slice before any action.
+ * @param {Object} operations Maps action types to column operations, such as
+ * `column_add('balance', index='account')`.
+ * @returns {Function} A reducer handling those action types and `table_batch`
+ * actions. Actions of other types, including those inside a batch, are ignored.
+ * The reducer declares its action types for `combine_reducers` routing.
+"""
+def table_reducer(initial_table, operations):
+	if not isinstance(initial_table, Table):
+		raise Exception('Expected initial_table to be a Table')
+	
+	def apply_batch(table, actions):
+		start = 0
+		while start < len(actions):
+			action_type = actions[start].get('type')
+			end = start + 1
+			while end < len(actions) and actions[end].get('type') == action_type:
+				end += 1
+			operation = operations.get(action_type)
+			if operation is not None:
+				table = operation(table, actions[start:end])
+			start = end
+		return table
+	
+	def reducer(state=None, action=None):
+		if state is None:
+			state = initial_table
+		action_type = action.get('type')
+		if action_type == TABLE_ACTION_TYPES['BATCH']:
+			return apply_batch(state, action['actions'])
+		operation = operations.get(action_type)
+		if operation is None:
+			return state
+		return operation(state, [action])
+	
+	reducer.action_types = frozenset(operations) | frozenset([TABLE_ACTION_TYPES['BATCH']])
+	return reducer
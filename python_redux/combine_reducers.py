@@ -1,15 +1,30 @@
 from .utils.warning import warning
-from random import choice
+from random import getrandbits
+from weakref import WeakSet
+from .persistent import PersistentMap
+from .production_mode import is_production
 
 ACTION_TYPES = {
 	'INIT': '@@redux/INIT'
 }
 
+PRIVATE_ACTION_PREFIX = '@@redux/'
+
+SANITY_CHECK_MODES = ('eager', 'lazy', 'once', 'off')
+
+sanity_check_defaults = { 'mode': 'eager' }
+
+# Slice reducers that passed a sanity check in 'once' mode, for the whole process
+sane_reducers = WeakSet()
+
 def get_undefined_state_error_message(key, action):
 	action_type = action and action['type']
 	action_name = action_type and str(action_type) or 'an action'
 	return 'Given action "{}", reducer "{}" returned None.  To ignore an action you must return the previous state'.format(action_name, key)
 
+def is_state_map(state):
+	return type(state) == dict or type(state) == PersistentMap
+
 def get_unexpected_state_shape_warning_message(input_state, reducers, action, unexpected_key_cache):
 	reducer_keys = reducers.keys()
 	argument_name = 'preloaded_state argument passed to create_store' if action and type(action) == dict and action.get('type') == ACTION_TYPES['INIT'] else 'previous state recieved by reducer'
@@ -17,7 +32,7 @@ def get_unexpected_state_shape_warning_message(input_state, reducers, action, un
 	if len(reducer_keys) == 0:
 		return 'Store does not have a valid reducer. Make sure the argument passed to combine_reducers is an object whose values are reducers.'
 	
-	if not type(input_state) == dict:
+	if not is_state_map(input_state):
 		return 'The {} has an unexpected type of {}. Expected argument to be an object with the following keys: "{}"'.format(
 			argument_name,
 			str(type(input_state)).replace('\'', '"'),
@@ -36,23 +51,105 @@ def get_unexpected_state_shape_warning_message(input_state, reducers, action, un
 			'", "'.join(reducer_keys)
 		)
 	
-def assert_reducer_sanity(reducers):
+def is_known_sane(reducer):
+	try:
+		return reducer in sane_reducers
+	except TypeError:
+		return False
+
+def remember_sane(reducer):
+	try:
+		sane_reducers.add(reducer)
+	except TypeError:
+		pass
+
+def assert_reducer_sanity(reducers, remember=False):
+	probe = '@@redux/PROBE_UNKNOWN_ACTION_{:020X}'.format(getrandbits(80))
 	for key in reducers.keys():
 		reducer = reducers[key]
+		if remember and is_known_sane(reducer):
+			continue
 		initial_state = reducer(None, { 'type': ACTION_TYPES['INIT'] })
 
 		if initial_state is None:
 			raise Exception('Reducer "{}" returned undefined during initialization. If the state passed to the reducer is undefined, you must explicitly return the initial state. The initial state may not be undefined.'.format(key))
-		ty = '@@redux/PROBE_UNKNOWN_ACTION_{}'.format('.'.join(choice('0123456789ABCDEFGHIJKLM') for i in range(20)))
-		if reducer(None, { 'type': ty }) is None:
+		if reducer(None, { 'type': probe }) is None:
 			msg = 'Reducer "{}" returned undefined when probed with a random type. Don\'t try to handle {} or other actions in "redux/*" \namespace. They are considered private. Instead, you must return the current state for any unknown actions, unless it is undefined, in which case you must return initial state, regardless of the action type. The initial state may not be undefined.'.format(key, ACTION_TYPES['INIT'])
 			raise Exception(msg)
+		if remember:
+			remember_sane(reducer)
+
+"""
+ * Sets the sanity check mode used by `combine_reducers` calls that do not pass
+ * one, e.g. 'off' for a production build.
+ *
+ * @param {String} mode One of 'eager', 'lazy', 'once' or 'off'.
+ * @returns {String} The previous default mode.
+"""
+def set_sanity_check_default(mode):
+	if mode not in SANITY_CHECK_MODES:
+		raise Exception('Expected sanity_check to be one of "{}"'.format('", "'.join(SANITY_CHECK_MODES)))
+	previous = sanity_check_defaults['mode']
+	sanity_check_defaults['mode'] = mode
+	return previous
+
+"""
+ * Declares which action types a reducer responds to. `combine_reducers` uses
+ * the declaration to build an action type index and only calls the reducers
+ * that handle the dispatched type. Reducers without a declaration are treated
+ * as wildcards and are called for every action. Private `@@redux/*` actions
+ * are always delivered to every reducer.
+ *
+ * @param {...any} action_types The action types handled by the reducer.
+ * @returns {Function} A decorator that marks the reducer and returns it.
+"""
+def handles(*action_types):
+	def decorate(reducer):
+		reducer.action_types = frozenset(action_types)
+		return reducer
+	return decorate
+
+"""
+ * Marks a slice reducer as safe to run on the executor given to
+ * `combine_reducers`, alongside the other slices, e.g. because it spends its
+ * time in NumPy or another C extension that releases the GIL. A process pool
+ * executor also needs the reducer, its state and the action to be picklable.
+ *
+ * @param {Function} reducer The slice reducer.
+ * @returns {Function} The same reducer, marked as parallel.
+"""
+def parallel(reducer):
+	reducer.parallel = True
+	return reducer
+
+def is_init_action(action):
+	return type(action) == dict and action.get('type') == ACTION_TYPES['INIT']
+
+def is_private_action_type(action_type):
+	return isinstance(action_type, str) and action_type.startswith(PRIVATE_ACTION_PREFIX)
+
+def build_action_type_index(reducers):
+	declared = dict((key, getattr(reducers[key], 'action_types', None)) for key in reducers)
+	if all(action_types is None for action_types in declared.values()):
+		return None, None
+	
+	wildcard_keys = tuple(key for key in declared if declared[key] is None)
+	all_types = set()
+	for action_types in declared.values():
+		if action_types is not None:
+			all_types.update(action_types)
 	
+	index = {}
+	for action_type in all_types:
+		index[action_type] = tuple(key for key in declared if declared[key] is None or action_type in declared[key])
+	return index, wildcard_keys
+
 """
  * Turns an object whose values are different reducer functions, into a single
  * reducer function. It will call every child reducer, and gather their results
  * into a single state object, whose keys correspond to the keys of the passed
- * reducer functions.
+ * reducer functions. Child reducers decorated with `handles()` are only called
+ * for the action types they declare.
  *
  * @param {Object} reducers An object whose values correspond to different
  * reducer functions that need to be combined into one. One handy way to obtain
@@ -61,10 +158,40 @@ def assert_reducer_sanity(reducers):
  * if the state passed to them was undefined, and the current state for any
  * unrecognized action.
  *
+ * The state may be a dict or a `PersistentMap`. A persistent root state is
+ * updated with structural sharing instead of being copied, so a dispatch only
+ * pays for the slices that changed.
+ *
+ * @param {Function} [is_equal] Decides whether a slice is unchanged, given its
+ * previous and next state. Defaults to an identity (`is`) check, which relies
+ * on reducers returning a new object whenever they change something. Pass
+ * `operator.eq` to fall back to value equality.
+ *
+ * @param {String} [sanity_check] When to check that every slice reducer returns
+ * an initial state and ignores unknown actions: 'eager' while combining, 'lazy'
+ * on the first call of the combined reducer, 'once' per reducer function for
+ * the whole process, or 'off'. Defaults to `set_sanity_check_default`, which
+ * starts as 'eager', or to 'off' in production mode. Errors found are raised
+ * when the combined reducer is called.
+ *
+ * @param {Executor} [executor] A `concurrent.futures` thread or process pool.
+ * Slice reducers marked with `parallel` are submitted to it whenever they are
+ * called, while the others run in the calling thread, and the next state is
+ * assembled in the same key order as without an executor. If several slices
+ * fail, the error of the first one in key order is raised.
+ *
+ * @param {bool} [production] Overrides `set_production_mode` for this reducer.
+ * In production mode the shape of the state is only checked for the first INIT
+ * action instead of on every call.
+ *
  * @returns {Function} A reducer function that invokes every reducer inside the
- * passed object, and builds a state object with the same shape.
+ * passed object, and builds a state object with the same shape. Whenever it
+ * returns a new state object, its `last_change` attribute holds a
+ * `(previous_state, next_state, changed_keys)` tuple describing the change.
+ * Its `reducers` and `options` attributes hold the slice reducers and keyword
+ * arguments it was built from, so enhancers can rebuild it.
 """
-def combine_reducers(reducers):
+def combine_reducers(reducers, is_equal=None, sanity_check=None, production=None, executor=None):
 	reducer_keys = reducers.keys()
 	final_reducers = {}
 	for key in reducer_keys:
@@ -74,33 +201,159 @@ def combine_reducers(reducers):
 	final_reducer_keys = final_reducers.keys()
 	sanity_error = None
 	unexpected_key_cache = {}
+	action_type_index, wildcard_keys = build_action_type_index(final_reducers)
+	parallel_keys = None
+	if executor is not None:
+		parallel_keys = frozenset(key for key in final_reducer_keys if getattr(final_reducers[key], 'parallel', False)) or None
+	last_built_state = None
 	
-	try:
-		assert_reducer_sanity(final_reducers)
-	except Exception as e:
-		sanity_error = e
+	if is_equal is None:
+		has_slice_changed = lambda previous, next: next is not previous
+	else:
+		has_slice_changed = lambda previous, next: not is_equal(previous, next)
+	
+	production = is_production(production)
+	check_state_shape = True
+	if sanity_check is None:
+		sanity_check = 'off' if production else sanity_check_defaults['mode']
+	if sanity_check not in SANITY_CHECK_MODES:
+		raise Exception('Expected sanity_check to be one of "{}"'.format('", "'.join(SANITY_CHECK_MODES)))
+	sanity_pending = sanity_check == 'lazy'
+	if sanity_check == 'eager' or sanity_check == 'once':
+		try:
+			assert_reducer_sanity(final_reducers, sanity_check == 'once')
+		except Exception as e:
+			sanity_error = e
+	
+	def has_all_keys(state):
+		if type(state) == dict:
+			return final_reducer_keys <= state.keys()
+		return all(key in state for key in final_reducer_keys)
+	
+	def routed_keys(state, action):
+		if action_type_index is None or not is_state_map(state):
+			return None
+		action_type = action.get('type') if type(action) == dict else None
+		if is_private_action_type(action_type):
+			return None
+		# Skipped slices are carried over from `state`, so it must hold all of them
+		if state is not last_built_state and not has_all_keys(state):
+			return None
+		try:
+			return action_type_index.get(action_type, wildcard_keys)
+		except TypeError:
+			return None
+	
+	def commit_changes(state, next_state, changes):
+		nonlocal last_built_state
+		changed_keys = [key for key, value in changes]
+		unexpected_keys = []
+		if is_state_map(state) and state is not last_built_state:
+			unexpected_keys = [key for key in state if key not in final_reducers]
+			changed_keys.extend(unexpected_keys)
+		
+		if type(state) == PersistentMap:
+			next_state = state
+			for key, value in changes:
+				next_state = next_state.set(key, value)
+			for key in unexpected_keys:
+				next_state = next_state.remove(key)
+		elif next_state is None:
+			next_state = dict(state) if state is last_built_state else dict((key, state[key]) for key in final_reducer_keys)
+			next_state.update(changes)
+		
+		last_built_state = next_state
+		combination.last_change = (state, next_state, frozenset(changed_keys))
+		return next_state
+	
+	def reduce_in_parallel(state, action, keys, next_state):
+		pending = {}
+		for key in keys:
+			if key in parallel_keys:
+				pending[key] = executor.submit(final_reducers[key], state.get(key) if is_state_map(state) else state, action)
+		changes = []
+		try:
+			for key in keys:
+				previous_state_for_key = state.get(key) if is_state_map(state) else state
+				if key in pending:
+					next_state_for_key = pending[key].result()
+				else:
+					next_state_for_key = final_reducers[key](previous_state_for_key, action)
+				if next_state_for_key is None:
+					error_message = get_undefined_state_error_message(key, action)
+					raise Exception(error_message)
+				if next_state is not None:
+					next_state[key] = next_state_for_key
+				if has_slice_changed(previous_state_for_key, next_state_for_key):
+					changes.append((key, next_state_for_key))
+		finally:
+			for future in pending.values():
+				future.cancel()
+		return changes
+	
+	def routed_combination(state, action, keys):
+		if parallel_keys is not None:
+			changes = reduce_in_parallel(state, action, keys, None)
+			return commit_changes(state, None, changes) if changes else state
+		changes = []
+		for key in keys:
+			reducer = final_reducers[key]
+			previous_state_for_key = state[key]
+			next_state_for_key = reducer(previous_state_for_key, action)
+			if next_state_for_key is None:
+				error_message = get_undefined_state_error_message(key, action)
+				raise Exception(error_message)
+			if has_slice_changed(previous_state_for_key, next_state_for_key):
+				changes.append((key, next_state_for_key))
+		if not changes:
+			return state
+		return commit_changes(state, None, changes)
 	
 	def combination(state=None, action = None):
-		nonlocal sanity_error
+		nonlocal sanity_error, sanity_pending, check_state_shape
 		if state is None:
 			state = {}
+		if sanity_pending:
+			sanity_pending = False
+			try:
+				assert_reducer_sanity(final_reducers)
+			except Exception as e:
+				sanity_error = e
 		if sanity_error:
 			raise sanity_error
-		warning_message = get_unexpected_state_shape_warning_message(state, final_reducers, action, unexpected_key_cache)
-		if warning_message:
-			warning(warning_message)
+		if check_state_shape and (not production or is_init_action(action)):
+			check_state_shape = not production
+			warning_message = get_unexpected_state_shape_warning_message(state, final_reducers, action, unexpected_key_cache)
+			if warning_message:
+				warning(warning_message)
+		
+		keys = routed_keys(state, action)
+		if keys is not None:
+			return routed_combination(state, action, keys)
 		
-		has_changed = False
 		next_state = {}
+		if parallel_keys is not None:
+			changes = reduce_in_parallel(state, action, final_reducer_keys, next_state)
+			return commit_changes(state, next_state, changes) if changes else state
+		changes = []
 		for key in final_reducer_keys:
 			reducer = final_reducers.get(key)
-			previous_state_for_key = state.get(key) if type(state) == dict else state
+			previous_state_for_key = state.get(key) if is_state_map(state) else state
 			next_state_for_key = reducer(previous_state_for_key, action)
 			if next_state_for_key is None:
 				error_message = get_undefined_state_error_message(key, action)
 				raise Exception(error_message)
 			next_state[key] = next_state_for_key
-			has_changed = has_changed or next_state_for_key != previous_state_for_key
-		return next_state if has_changed else state
+			if has_slice_changed(previous_state_for_key, next_state_for_key):
+				changes.append((key, next_state_for_key))
+		if not changes:
+			return state
+		return commit_changes(state, next_state, changes)
+	
+	combination.last_change = None
+	combination.reducers = dict(final_reducers)
+	combination.options = { 'is_equal': is_equal, 'sanity_check': sanity_check, 'production': production, 'executor': executor }
+	if action_type_index is not None and not wildcard_keys:
+		combination.action_types = frozenset(action_type_index.keys())
 	return combination
 	
\ No newline at end of file
@@ -0,0 +1,74 @@
+import asyncio
+from functools import partial
+from .create_store import create_store
+
+"""
+ * Creates a Redux store for asyncio applications. It holds the state tree
+ * exactly like `create_store` does, and reducers stay synchronous and pure, but
+ * `dispatch`, `dispatch_batch` and the methods replacing reducers are
+ * coroutines so that async middleware (see `apply_async_middleware`) can await
+ * I/O without blocking the event loop.
+ *
+ * Listeners are not called from within `dispatch()`. Instead each notification
+ * is scheduled on the running event loop with `call_soon`, or as a task if the
+ * listener is a coroutine function. Listeners subscribed with `with_change`
+ * receive the change as it was when the notification was scheduled.
+ *
+ * @param {Function} reducer A function that returns the next state tree, given
+ * the current state tree and the action to handle.
+ * @param {any} [preloaded_state] The initial state.
+ * @param {Function} [enhancer] An async store enhancer, such as
+ * `apply_async_middleware()`.
+ * @param {bool} [production] Overrides `set_production_mode` for this store.
+ * @returns {Store} An async Redux store.
+"""
+def create_async_store(reducer=None, preloaded_state=None, enhancer=None, production=None):
+	if hasattr(preloaded_state, '__call__') and enhancer is None:
+		enhancer = preloaded_state
+		preloaded_state = None
+	
+	if enhancer is not None:
+		if not hasattr(enhancer, '__call__'):
+			raise Exception('Expected the enhancer to be a function')
+		if production is not None:
+			return enhancer(partial(create_async_store, production=production))(reducer, preloaded_state)
+		return enhancer(create_async_store)(reducer, preloaded_state)
+	
+	store = create_store(reducer, preloaded_state, production=production)
+	
+	async def dispatch(action=None):
+		return store['dispatch'](action)
+	
+	async def dispatch_batch(actions=None):
+		return store['dispatch_batch'](actions)
+	
+	async def replace_reducer(next_reducer=None):
+		store['replace_reducer'](next_reducer)
+	
+	async def inject_reducer(key=None, reducer=None):
+		store['inject_reducer'](key, reducer)
+	
+	async def remove_reducer(key=None):
+		store['remove_reducer'](key)
+	
+	def subscribe(listener=None, selector=None, with_change=False):
+		if not hasattr(listener, '__call__'):
+			raise Exception('Expected listener to be a function')
+		
+		def schedule_listener(*args):
+			loop = asyncio.get_running_loop()
+			if asyncio.iscoroutinefunction(listener):
+				loop.create_task(listener(*args))
+			else:
+				loop.call_soon(listener, *args)
+		return store['subscribe'](schedule_listener, selector, with_change)
+	
+	return {
+		'dispatch': dispatch,
+		'dispatch_batch': dispatch_batch,
+		'subscribe': subscribe,
+		'get_state': store['get_state'],
+		'replace_reducer': replace_reducer,
+		'inject_reducer': inject_reducer,
+		'remove_reducer': remove_reducer
+	}
@@ -0,0 +1,339 @@
+from bisect import bisect_left, insort
+from collections.abc import Mapping
+from .persistent import PersistentMap
+
+class NoId(object):
+	"""Marks both ends of the linked list of ids. Pickling it refers back to
+	the module's NO_ID, so unpickled states still recognize it."""
+	__slots__ = ()
+	
+	def __reduce__(self):
+		return 'NO_ID'
+	
+	def __repr__(self):
+		return 'NO_ID'
+
+NO_ID = NoId()
+EMPTY_GROUP = PersistentMap()
+MAX_CHUNK_SIZE = 64
+
+class SortedEntries(object):
+	"""The (sort key, id) entries of a sorted slice, split into sorted chunks
+	of at most MAX_CHUNK_SIZE entries. `maxes` holds the last entry of each
+	chunk, to find the chunk an entry belongs to by binary search."""
+	__slots__ = ('chunks', 'maxes')
+	
+	def __init__(self, chunks=(), maxes=()):
+		self.chunks = chunks
+		self.maxes = maxes
+
+class EntityState(Mapping):
+	"""The immutable state of a normalized entity slice.
+	
+	It reads like a dict with an `ids` tuple in insertion order and an
+	`entities` PersistentMap from id to entity, plus `sorted_ids` when the
+	adapter sorts and `indexes` when it has secondary indexes. Insertion order
+	is kept as a persistent doubly linked list of ids, so adding or removing an
+	entity never scans the slice; `ids` and `sorted_ids` are only built when
+	they are first read, and then cached.
+	"""
+	__slots__ = ('entities', 'links', 'first', 'last', 'sorted', 'indexes', '_ids', '_sorted_ids')
+	
+	def __init__(self, entities, links, first, last, sorted, indexes):
+		self.entities = entities
+		self.links = links
+		self.first = first
+		self.last = last
+		self.sorted = sorted
+		self.indexes = indexes
+		self._ids = None
+		self._sorted_ids = None
+	
+	@property
+	def ids(self):
+		if self._ids is None:
+			ids = []
+			entity_id = self.first
+			while entity_id is not NO_ID:
+				ids.append(entity_id)
+				entity_id = self.links[entity_id][1]
+			self._ids = tuple(ids)
+		return self._ids
+	
+	@property
+	def sorted_ids(self):
+		if self._sorted_ids is None:
+			self._sorted_ids = tuple(entity_id for chunk in self.sorted.chunks for sort_key, entity_id in chunk)
+		return self._sorted_ids
+	
+	def __getitem__(self, key):
+		if key == 'ids':
+			return self.ids
+		if key == 'entities':
+			return self.entities
+		if key == 'sorted_ids' and self.sorted is not None:
+			return self.sorted_ids
+		if key == 'indexes' and self.indexes is not None:
+			return self.indexes
+		raise KeyError(key)
+	
+	def __iter__(self):
+		yield 'ids'
+		yield 'entities'
+		if self.sorted is not None:
+			yield 'sorted_ids'
+		if self.indexes is not None:
+			yield 'indexes'
+	
+	def __len__(self):
+		return 2 + (self.sorted is not None) + (self.indexes is not None)
+	
+	def __repr__(self):
+		return 'EntityState({})'.format(dict(self.items()))
+
+class EntityDraft(object):
+	"""Collects the changes of one adapter call, so that a batch copies the
+	list of sorted chunks and the index dict at most once."""
+	def __init__(self, state, select_id, sort_key, index_keys):
+		self.state = state
+		self.select_id = select_id
+		self.sort_key = sort_key
+		self.index_keys = index_keys
+		self.entities = state.entities
+		self.links = state.links
+		self.first = state.first
+		self.last = state.last
+		self.sorted = state.sorted
+		self.indexes = state.indexes
+		self.changed = False
+	
+	def sorted_chunks(self):
+		if self.sorted is self.state.sorted:
+			self.sorted = SortedEntries(list(self.sorted.chunks), list(self.sorted.maxes))
+		return self.sorted.chunks, self.sorted.maxes
+	
+	def add_sorted(self, entry):
+		chunks, maxes = self.sorted_chunks()
+		if not chunks:
+			chunks.append((entry,))
+			maxes.append(entry)
+			return
+		index = min(bisect_left(maxes, entry), len(chunks) - 1)
+		chunk = list(chunks[index])
+		insort(chunk, entry)
+		if len(chunk) > MAX_CHUNK_SIZE:
+			half = len(chunk) // 2
+			chunks[index:index + 1] = [tuple(chunk[:half]), tuple(chunk[half:])]
+			maxes[index:index + 1] = [chunk[half - 1], chunk[-1]]
+		else:
+			chunks[index] = tuple(chunk)
+			maxes[index] = chunk[-1]
+	
+	def remove_sorted(self, entry):
+		chunks, maxes = self.sorted_chunks()
+		index = bisect_left(maxes, entry)
+		chunk = list(chunks[index])
+		del chunk[bisect_left(chunk, entry)]
+		if chunk:
+			chunks[index] = tuple(chunk)
+			maxes[index] = chunk[-1]
+		else:
+			del chunks[index]
+			del maxes[index]
+	
+	def index_maps(self):
+		if self.indexes is self.state.indexes:
+			self.indexes = dict(self.indexes)
+		return self.indexes
+	
+	def add_to_index(self, name, key, entity_id):
+		indexes = self.index_maps()
+		indexes[name] = indexes[name].set(key, indexes[name].get(key, EMPTY_GROUP).set(entity_id, True))
+	
+	def remove_from_index(self, name, key, entity_id):
+		indexes = self.index_maps()
+		group = indexes[name][key].remove(entity_id)
+		indexes[name] = indexes[name].set(key, group) if len(group) else indexes[name].remove(key)
+	
+	def insert(self, entity):
+		entity_id = self.select_id(entity)
+		if entity_id in self.entities:
+			return False
+		self.entities = self.entities.set(entity_id, entity)
+		if self.last is NO_ID:
+			self.first = entity_id
+		else:
+			self.links = self.links.set(self.last, (self.links[self.last][0], entity_id))
+		self.links = self.links.set(entity_id, (self.last, NO_ID))
+		self.last = entity_id
+		if self.sort_key is not None:
+			self.add_sorted((self.sort_key(entity), entity_id))
+		for name, index_key in self.index_keys.items():
+			self.add_to_index(name, index_key(entity), entity_id)
+		self.changed = True
+		return True
+	
+	def replace(self, entity_id, entity):
+		previous = self.entities[entity_id]
+		if previous is entity:
+			return
+		self.entities = self.entities.set(entity_id, entity)
+		if self.sort_key is not None:
+			previous_key, key = self.sort_key(previous), self.sort_key(entity)
+			if previous_key != key:
+				self.remove_sorted((previous_key, entity_id))
+				self.add_sorted((key, entity_id))
+		for name, index_key in self.index_keys.items():
+			previous_key, key = index_key(previous), index_key(entity)
+			if previous_key != key:
+				self.remove_from_index(name, previous_key, entity_id)
+				self.add_to_index(name, key, entity_id)
+		self.changed = True
+	
+	def delete(self, entity_id):
+		if entity_id not in self.entities:
+			return
+		previous = self.entities[entity_id]
+		self.entities = self.entities.remove(entity_id)
+		previous_id, next_id = self.links[entity_id]
+		self.links = self.links.remove(entity_id)
+		if previous_id is NO_ID:
+			self.first = next_id
+		else:
+			self.links = self.links.set(previous_id, (self.links[previous_id][0], next_id))
+		if next_id is NO_ID:
+			self.last = previous_id
+		else:
+			self.links = self.links.set(next_id, (previous_id, self.links[next_id][1]))
+		if self.sort_key is not None:
+			self.remove_sorted((self.sort_key(previous), entity_id))
+		for name, index_key in self.index_keys.items():
+			self.remove_from_index(name, index_key(previous), entity_id)
+		self.changed = True
+	
+	def finish(self):
+		if not self.changed:
+			return self.state
+		entries = self.sorted
+		if entries is not self.state.sorted:
+			entries = SortedEntries(tuple(entries.chunks), tuple(entries.maxes))
+		return EntityState(self.entities, self.links, self.first, self.last, entries, self.indexes)
+
+"""
+ * Creates an adapter for a normalized slice of entities, such as todos by id.
+ *
+ * The adapter's update functions take the slice state and return the next
+ * one, or the very same state when nothing changed, so they can be called
+ * straight from a slice reducer used with `combine_reducers`:
+ *
+ *		todos = create_entity_adapter(sort_key=lambda todo: todo['text'])
+ *
+ *		def todos_reducer(state=None, action=None):
+ *			if state is None:
+ *				state = todos['get_initial_state']()
+ *			if action.get('type') == 'ADD_TODO':
+ *				return todos['add_one'](state, action['todo'])
+ *			return state
+ *
+ * Looking up, adding, updating and removing an entity by id take O(log32 n)
+ * time, which is effectively constant. With a `sort_key`, the sorted order is
+ * kept in chunks of at most 64 entries, so each change also copies the chunk
+ * it falls in, and each call copies the list of chunks, about n / 32 entries,
+ * instead of a full sort or a copy of every sorted id. Secondary indexes only
+ * move the ids of entities whose index key changed. `ids` and `sorted_ids` are
+ * built in O(n) time the first time they are read from a state, then cached,
+ * so selectors memoized on them hit until the slice changes.
+ *
+ * @param {Function} [select_id] Returns the id of an entity. Defaults to
+ * `entity['id']`.
+ * @param {Function} [sort_key] Returns the key to keep `sorted_ids` ordered by.
+ * Ties are ordered by id.
+ * @param {Object} [indexes] Maps index names to functions returning the index
+ * key of an entity. `select_ids_by(state, name, key)` returns the ids of the
+ * entities with that key.
+ * @returns {Object} The adapter functions: get_initial_state, add_one,
+ * add_many, set_all, update_one, update_many, upsert_one, upsert_many,
+ * remove_one, remove_many, remove_all, select_by_id, select_ids, select_all,
+ * select_total and select_ids_by.
+"""
+def create_entity_adapter(select_id=None, sort_key=None, indexes=None):
+	if select_id is None:
+		select_id = lambda entity: entity['id']
+	index_keys = dict(indexes or {})
+	empty_state = EntityState(
+		PersistentMap(),
+		PersistentMap(),
+		NO_ID,
+		NO_ID,
+		SortedEntries() if sort_key is not None else None,
+		dict((name, PersistentMap()) for name in index_keys) if index_keys else None
+	)
+	
+	def draft(state):
+		if not isinstance(state, EntityState):
+			raise Exception('Expected the state to be created by get_initial_state')
+		return EntityDraft(state, select_id, sort_key, index_keys)
+	
+	def add_many(state, entities):
+		changes = draft(state)
+		for entity in entities:
+			changes.insert(entity)
+		return changes.finish()
+	
+	def update_many(state, updates):
+		changes = draft(state)
+		for entity_id, entity_changes in updates:
+			if entity_id in changes.entities:
+				changes.replace(entity_id, dict(changes.entities[entity_id], **entity_changes))
+		return changes.finish()
+	
+	def upsert_many(state, entities):
+		changes = draft(state)
+		for entity in entities:
+			entity_id = select_id(entity)
+			if entity_id in changes.entities:
+				changes.replace(entity_id, dict(changes.entities[entity_id], **entity))
+			else:
+				changes.insert(entity)
+		return changes.finish()
+	
+	def remove_many(state, ids):
+		changes = draft(state)
+		for entity_id in ids:
+			changes.delete(entity_id)
+		return changes.finish()
+	
+	def remove_all(state):
+		return state if len(state.entities) == 0 else empty_state
+	
+	def set_all(state, entities):
+		return add_many(empty_state, entities)
+	
+	def get_initial_state(entities=None):
+		return add_many(empty_state, entities or ())
+	
+	def select_all(state):
+		ids = state.sorted_ids if sort_key is not None else state.ids
+		return [state.entities[entity_id] for entity_id in ids]
+	
+	def select_ids_by(state, name, key):
+		return tuple(state.indexes[name].get(key, EMPTY_GROUP).keys())
+	
+	return {
+		'get_initial_state': get_initial_state,
+		'add_one': lambda state, entity: add_many(state, (entity,)),
+		'add_many': add_many,
+		'set_all': set_all,
+		'update_one': lambda state, entity_id, changes: update_many(state, ((entity_id, changes),)),
+		'update_many': update_many,
+		'upsert_one': lambda state, entity: upsert_many(state, (entity,)),
+		'upsert_many': upsert_many,
+		'remove_one': lambda state, entity_id: remove_many(state, (entity_id,)),
+		'remove_many': remove_many,
+		'remove_all': remove_all,
+		'select_by_id': lambda state, entity_id: state.entities.get(entity_id),
+		'select_ids': lambda state: state.sorted_ids if sort_key is not None else state.ids,
+		'select_all': select_all,
+		'select_total': lambda state: len(state.entities),
+		'select_ids_by': select_ids_by
+	}
@@ -0,0 +1,76 @@
+from collections import OrderedDict
+
+"""
+ * Creates a memoized selector that derives data from the state tree. The input
+ * selectors are called with the same arguments as the selector, and their
+ * results are passed to the combiner. The combiner only runs again when one of
+ * the input results is a different object than last time, so deriving data is
+ * as cheap as the input selectors as long as reducers keep unchanged state
+ * referentially equal.
+ *
+ * Parameterized selectors, e.g. `selector(state, todo_id)`, keep one cache
+ * entry per argument tuple in a least recently used cache of `cache_size`
+ * entries. The arguments must be hashable to be cached.
+ *
+ * @param {...Function} funcs The input selectors, followed by the combiner. The
+ * input selectors may also be passed as a single list.
+ * @param {int} [cache_size] The number of entries to keep, or None for an
+ * unbounded cache. Defaults to 1.
+ * @returns {Function} The memoized selector. Its `cache_info()` returns the cache
+ * hit and miss statistics and `clear_cache()` empties the cache.
+"""
+def create_selector(*funcs, cache_size=1):
+	if len(funcs) == 2 and type(funcs[0]) in (list, tuple):
+		funcs = tuple(funcs[0]) + (funcs[1],)
+	if len(funcs) < 2:
+		raise Exception('create_selector expects at least one input selector followed by a combiner')
+	for func in funcs:
+		if not hasattr(func, '__call__'):
+			raise Exception('create_selector expects all input selectors and the combiner to be functions, instead received {}.'.format(type(func)))
+	if cache_size is not None and cache_size < 1:
+		raise Exception('Expected cache_size to be at least 1 or None, instead received {}.'.format(cache_size))
+	
+	input_selectors = funcs[:-1]
+	combiner = funcs[-1]
+	cache = OrderedDict()
+	stats = { 'hits': 0, 'misses': 0 }
+	
+	def selector(state, *args):
+		values = tuple(input_selector(state, *args) for input_selector in input_selectors)
+		try:
+			entry = cache.get(args)
+		except TypeError:
+			# Unhashable arguments can't be cached
+			stats['misses'] += 1
+			return combiner(*values)
+		
+		if entry is not None and all(cached is value for cached, value in zip(entry[0], values)):
+			stats['hits'] += 1
+			cache.move_to_end(args)
+			return entry[1]
+		
+		stats['misses'] += 1
+		result = combiner(*values)
+		cache[args] = (values, result)
+		cache.move_to_end(args)
+		if cache_size is not None and len(cache) > cache_size:
+			cache.popitem(last=False)
+		return result
+	
+	def cache_info():
+		return {
+			'hits': stats['hits'],
+			'misses': stats['misses'],
+			'size': len(cache),
+			'max_size': cache_size
+		}
+	
+	def clear_cache():
+		cache.clear()
+		stats['hits'] = 0
+		stats['misses'] = 0
+	
+	selector.cache_info = cache_info
+	selector.clear_cache = clear_cache
+	selector.combiner = combiner
+	return selector
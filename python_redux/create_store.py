@@ -1,7 +1,74 @@
+from functools import partial
+from inspect import unwrap
+from .combine_reducers import assert_reducer_sanity, combine_reducers
+from .persistent import PersistentMap
+from .production_mode import is_production
+
 ACTION_TYPES = {
 	'INIT': '@@redux/INIT'
 }
 
+class ListenerNode(object):
+	"""A subscription in the store's doubly linked listener list. `added` and
+	`removed` are the listener list versions at which it was subscribed and
+	unsubscribed, which lets a notification in progress keep its snapshot of
+	the list without copying it.
+	"""
+	__slots__ = ('listener', 'added', 'removed', 'previous', 'next')
+	
+	def __init__(self, listener, added):
+		self.listener = listener
+		self.added = added
+		self.removed = None
+		self.previous = None
+		self.next = None
+
+def assert_plain_action(action):
+	if not type(action) == dict:
+		raise Exception('Actions must be plain dictionaries.  Consider adding middleware to change this')
+	if action.get('type') is None:
+		raise Exception('Actions may not have an undefined "type" property.\n Have you misspelled a constants?')
+
+NO_KEY = object()
+STATE_MAP_TYPES = (dict, PersistentMap)
+
+def get_in(state, path):
+	for key in path:
+		try:
+			state = state[key]
+		except (KeyError, IndexError, TypeError):
+			return None
+	return state
+
+def diff_keys(previous_state, next_state):
+	if previous_state is next_state:
+		return frozenset()
+	if not isinstance(previous_state, STATE_MAP_TYPES) or not isinstance(next_state, STATE_MAP_TYPES):
+		return None
+	changed_keys = set(key for key in next_state if previous_state.get(key, NO_KEY) is not next_state[key])
+	changed_keys.update(key for key in previous_state if key not in next_state)
+	return frozenset(changed_keys)
+
+def resolve_selector(selector):
+	if selector is None:
+		return None, NO_KEY
+	if hasattr(selector, '__call__'):
+		return selector, NO_KEY
+	if type(selector) in (list, tuple):
+		path = tuple(selector)
+		if len(path) == 0:
+			return lambda state: state, NO_KEY
+		return lambda state: get_in(state, path), path[0]
+	return lambda state: get_in(state, (selector,)), selector
+
+def rewrap_reducer(reducer, combination):
+	if reducer is unwrap(reducer):
+		return combination
+	rewrap = getattr(reducer, 'rewrap', None)
+	if not hasattr(rewrap, '__call__'):
+		raise Exception('The root reducer is wrapped by a function without a `rewrap` method, so it can not be rebuilt')
+	return rewrap(rewrap_reducer(reducer.__wrapped__, combination))
+
 """
  * Creates a Redux store that holds the state tree.
  * The only way to change the data in the store is to call `dispatch()` on it.
@@ -24,10 +91,18 @@ ACTION_TYPES = {
  * time travel, persistence, etc. The only store enhancer that ships with Redux
  * is `applyMiddleware()`.
  *
+ * @param {bool} [production] Overrides `set_production_mode` for this store.
+ * A production store does not check that dispatched actions are plain
+ * dictionaries with a type. The setting is passed on through the enhancers.
+ *
+ * @param {Function} [scheduler] Decides when listeners are notified of a
+ * change, such as `coalesce` or `debounce(0.05)`. Listeners are notified
+ * within `dispatch()` by default. It is passed on through the enhancers.
+ *
  * @returns {Store} A Redux store that lets you read the state, dispatch actions
  * and subscribe to changes.
 """
-def create_store(reducer=None, preloaded_state=None, enhancer=None):
+def create_store(reducer=None, preloaded_state=None, enhancer=None, production=None, scheduler=None):
 	if hasattr(preloaded_state, '__call__') and enhancer is None:
 		enhancer = preloaded_state
 		preloaded_state = None
@@ -35,21 +110,93 @@ def create_store(reducer=None, preloaded_state=None, enhancer=None):
 	if enhancer is not None:
 		if not hasattr(enhancer, '__call__'):
 			raise Exception('Expected the enhancer to be a function')
+		if production is not None or scheduler is not None:
+			return enhancer(partial(create_store, production=production, scheduler=scheduler))(reducer, preloaded_state)
 		return enhancer(create_store)(reducer, preloaded_state)
 	
 	if not hasattr(reducer, '__call__'):
 		raise Exception('Expected the reducer to be a function')
+	if scheduler is not None and not hasattr(scheduler, '__call__'):
+		raise Exception('Expected the scheduler to be a function')
 		
+	check_actions = not is_production(production)
 	current_reducer = reducer
 	current_state = preloaded_state
-	current_listeners = []
-	next_listeners = current_listeners
+	listeners_head = ListenerNode(None, 0)
+	listeners_tail = listeners_head
+	listeners_version = 0
+	notifying = 0
+	removed_while_notifying = []
 	is_dispatching = False
+	last_action = None
+	last_change = None
+	
+	def unlink_listener(node):
+		nonlocal listeners_tail
+		node.previous.next = node.next
+		if node.next is not None:
+			node.next.previous = node.previous
+		else:
+			listeners_tail = node.previous
 	
-	def ensure_can_mutate_next_listeners():
-		nonlocal next_listeners, current_listeners
-		if next_listeners == current_listeners:
-			next_listeners = [c for c in current_listeners]
+	def get_changed_keys(previous_state, next_state):
+		nonlocal last_change
+		if last_change is not None and last_change[0] is previous_state and last_change[1] is next_state:
+			return last_change[2]
+		reported_change = getattr(unwrap(current_reducer), 'last_change', None)
+		if reported_change is not None and reported_change[0] is previous_state and reported_change[1] is next_state:
+			last_change = reported_change
+		else:
+			last_change = (previous_state, next_state, diff_keys(previous_state, next_state))
+		return last_change[2]
+	
+	def create_scoped_listener(listener, selector, with_change):
+		select, key = resolve_selector(selector)
+		last_state = current_state
+		last_selected = select(last_state) if select is not None else None
+		
+		def scoped_listener():
+			nonlocal last_state, last_selected
+			state = current_state
+			previous_state = last_state
+			if select is not None:
+				if state is previous_state:
+					return
+				last_state = state
+				if key is not NO_KEY:
+					changed_keys = get_changed_keys(previous_state, state)
+					if changed_keys is not None and key not in changed_keys:
+						return
+				selected = select(state)
+				if selected is last_selected:
+					return
+				last_selected = selected
+			last_state = state
+			if with_change:
+				listener(previous_state, state, last_action, get_changed_keys(previous_state, state))
+			else:
+				listener()
+		return scoped_listener
+	
+	def notify_listeners():
+		nonlocal notifying
+		# Only listeners subscribed, and not yet unsubscribed, by now are notified
+		snapshot = listeners_version
+		notifying += 1
+		try:
+			node = listeners_head.next
+			while node is not None:
+				if node.added <= snapshot and (node.removed is None or node.removed > snapshot):
+					node.listener()
+				node = node.next
+		finally:
+			notifying -= 1
+			if notifying == 0 and removed_while_notifying:
+				for removed in removed_while_notifying:
+					unlink_listener(removed)
+				del removed_while_notifying[:]
+	
+	schedule_notification = scheduler(notify_listeners) if scheduler is not None else notify_listeners
 	
 	"""
 	 * Reads the state tree managed by the store.
@@ -80,26 +227,44 @@ def create_store(reducer=None, preloaded_state=None, enhancer=None):
 	 * registered before the `dispatch()` started will be called with the latest
 	 * state by the time it exits.
 	 *
+	 * A listener can be scoped to part of the state tree by passing a `selector`:
+	 * a top level key, a key path given as a list or tuple, or a function of the
+	 * state. A scoped listener is only called when the selected value is a
+	 * different object than the last time it was called, and is skipped without
+	 * running the selector when the root state did not change.
+	 *
 	 * @param {Function} listener A callback to be invoked on every dispatch.
+	 * @param {any} [selector] The key, key path or selector function to watch.
+	 * @param {bool} [with_change] Call the listener with `(previous_state,
+	 * next_state, action, changed_keys)`, where `previous_state` is the state it
+	 * last saw, `action` is the latest action dispatched and `changed_keys` is a
+	 * frozenset of changed top level keys, or None if they can't be determined.
 	 * @returns {Function} A function to remove this change listener.
 	"""
-	def subscribe(listener=None):
-		nonlocal next_listeners
+	def subscribe(listener=None, selector=None, with_change=False):
+		nonlocal listeners_tail, listeners_version
 		if not hasattr(listener, '__call__'):
 			raise Exception('Expected listener to be a function')
+		if selector is not None or with_change:
+			listener = create_scoped_listener(listener, selector, with_change)
 		
-		is_subscribed = True
-		ensure_can_mutate_next_listeners()
-		next_listeners.append(listener)
+		listeners_version += 1
+		node = ListenerNode(listener, listeners_version)
+		node.previous = listeners_tail
+		listeners_tail.next = node
+		listeners_tail = node
 		
 		def unsubscribe():
-			nonlocal is_subscribed
-			if not is_subscribed:
+			nonlocal listeners_version
+			if node.removed is not None:
 				return
-			is_subscribed = False
-			ensure_can_mutate_next_listeners()
-			index = next_listeners.index(listener)
-			del next_listeners[index]
+			listeners_version += 1
+			node.removed = listeners_version
+			# Listeners being notified may still be walking over this node
+			if notifying:
+				removed_while_notifying.append(node)
+			else:
+				unlink_listener(node)
 		
 		return unsubscribe
 	
@@ -129,25 +294,60 @@ def create_store(reducer=None, preloaded_state=None, enhancer=None):
 	 * return something else (for example, a Promise you can await).
 	"""
 	def dispatch(action=None):
-		nonlocal is_dispatching, current_state, current_listeners, next_listeners
-		if not type(action) == dict:
-			raise Exception('Actions must be plain dictionaries.  Consider adding middleware to change this')
-		if action.get('type') is None:
-			raise Exception('Actions may not have an undefined "type" property.\n Have you misspelled a constants?')
+		nonlocal is_dispatching, current_state, last_action
+		if check_actions:
+			assert_plain_action(action)
 		if is_dispatching:
 			raise Exception('Reducers may not dispatch actions')
 		
 		try:
 			is_dispatching = True
 			current_state = current_reducer(current_state, action)
+			last_action = action
 		finally:
 			is_dispatching = False
 		
-		listeners = current_listeners = next_listeners
-		for l in listeners:
-			l()
+		schedule_notification()
 		return action	
 	
+	"""
+	 * Dispatches a sequence of actions as a single state change.
+	 *
+	 * Every action is folded through the reducer in order, under a single
+	 * dispatch guard, and the change listeners are notified once with the final
+	 * state. If the reducer raises part way through, the state is left untouched.
+	 * Dispatching an empty sequence does nothing. Listeners subscribed with
+	 * `with_change` receive the last action of the batch.
+	 *
+	 * @param {Iterable} actions The plain object actions to dispatch.
+	 * @returns {List} The actions that were dispatched.
+	"""
+	def dispatch_batch(actions=None):
+		nonlocal is_dispatching, current_state, last_action
+		if actions is None or type(actions) == dict:
+			raise Exception('Expected actions to be a sequence of plain dictionaries')
+		actions = list(actions)
+		if check_actions:
+			for action in actions:
+				assert_plain_action(action)
+		if is_dispatching:
+			raise Exception('Reducers may not dispatch actions')
+		if len(actions) == 0:
+			return actions
+		
+		try:
+			is_dispatching = True
+			state = current_state
+			for action in actions:
+				state = current_reducer(state, action)
+			current_state = state
+			last_action = actions[-1]
+		finally:
+			is_dispatching = False
+		
+		schedule_notification()
+		return actions
+	
 	"""
 	 * Replaces the reducer currently used by the store to calculate the state.
 	 *
@@ -165,6 +365,96 @@ def create_store(reducer=None, preloaded_state=None, enhancer=None):
 		current_reducer = next_reducer
 		dispatch({ 'type': ACTION_TYPES['INIT'] })
 	
+	def get_combination():
+		combination = unwrap(current_reducer)
+		if getattr(combination, 'reducers', None) is None or getattr(combination, 'options', None) is None:
+			raise Exception('Expected the root reducer to be created with combine_reducers')
+		return combination
+	
+	def install_slices(combination, slice_reducers, key, next_state):
+		nonlocal current_reducer, current_state, last_action, last_change
+		next_combination = combine_reducers(slice_reducers, **dict(combination.options, sanity_check='off'))
+		next_combination.options = dict(combination.options)
+		current_reducer = rewrap_reducer(current_reducer, next_combination)
+		
+		previous_state = current_state
+		current_state = next_state
+		last_action = { 'type': ACTION_TYPES['INIT'] }
+		last_change = (previous_state, next_state, frozenset([key]) if next_state is not previous_state else frozenset())
+		schedule_notification()
+	
+	"""
+	 * Adds a slice reducer to a root reducer created with `combine_reducers`,
+	 * or replaces the reducer of an existing slice.
+	 *
+	 * Unlike `replace_reducer()`, no action is dispatched: only the new reducer
+	 * is sanity checked and initialized, the other slices keep their state, and
+	 * listeners are notified with `key` as the only changed key. Enhancers that
+	 * wrap the root reducer set `__wrapped__` to the reducer they wrap and a
+	 * `rewrap` method returning the same wrapper around a rebuilt reducer.
+	 *
+	 * @param {any} key The key of the slice in the state tree.
+	 * @param {Function} reducer The reducer for the slice.
+	 * @returns {void}
+	"""
+	def inject_reducer(key=None, reducer=None):
+		if not hasattr(reducer, '__call__'):
+			raise Exception('Expected reducer to be a function')
+		if is_dispatching:
+			raise Exception('Reducers may not inject reducers')
+		combination = get_combination()
+		sanity_check = combination.options.get('sanity_check')
+		if sanity_check != 'off':
+			assert_reducer_sanity({ key: reducer }, sanity_check == 'once')
+		
+		state = current_state
+		if not isinstance(state, STATE_MAP_TYPES):
+			raise Exception('Expected the state to be a dict or a PersistentMap')
+		state_for_key = reducer(state.get(key), { 'type': ACTION_TYPES['INIT'] })
+		if state_for_key is None:
+			raise Exception('Reducer "{}" returned None during initialization'.format(key))
+		
+		if key in state and state[key] is state_for_key:
+			next_state = state
+		elif type(state) == PersistentMap:
+			next_state = state.set(key, state_for_key)
+		else:
+			next_state = dict(state)
+			next_state[key] = state_for_key
+		
+		slice_reducers = dict(combination.reducers)
+		slice_reducers[key] = reducer
+		install_slices(combination, slice_reducers, key, next_state)
+	
+	"""
+	 * Removes a slice reducer from a root reducer created with
+	 * `combine_reducers`, and its slice from the state tree, without dispatching
+	 * an action. Listeners are notified with `key` as the only changed key.
+	 * Removing a key without a reducer does nothing.
+	 *
+	 * @param {any} key The key of the slice to remove.
+	 * @returns {void}
+	"""
+	def remove_reducer(key=None):
+		if is_dispatching:
+			raise Exception('Reducers may not remove reducers')
+		combination = get_combination()
+		if key not in combination.reducers:
+			return
+		
+		state = current_state
+		if type(state) == PersistentMap:
+			next_state = state.remove(key)
+		elif isinstance(state, dict) and key in state:
+			next_state = dict(state)
+			del next_state[key]
+		else:
+			next_state = state
+		
+		slice_reducers = dict(combination.reducers)
+		del slice_reducers[key]
+		install_slices(combination, slice_reducers, key, next_state)
+	
 	# TODO: Figure out how to add the observables
 	
 	# When a store is created, an "INIT" action is dispatched so that every
@@ -175,6 +465,9 @@ def create_store(reducer=None, preloaded_state=None, enhancer=None):
 	return {
 		'dispatch': dispatch,
 		'subscribe': subscribe,
+		'dispatch_batch': dispatch_batch,
 		'get_state': get_state,
-		'replace_reducer': replace_reducer
+		'replace_reducer': replace_reducer,
+		'inject_reducer': inject_reducer,
+		'remove_reducer': remove_reducer
 	}
\ No newline at end of file
@@ -0,0 +1,200 @@
+import time
+from collections import deque
+from concurrent.futures import Future
+from threading import Condition, Thread, current_thread
+
+QUEUE_POLICIES = ('block', 'drop_oldest', 'drop_newest', 'merge')
+
+class QueuedAction(object):
+	"""An action waiting in the dispatch queue, the future of its dispatch, when it
+	was enqueued and its merge key."""
+	__slots__ = ('action', 'future', 'enqueued_at', 'key')
+	
+	def __init__(self, action, future, enqueued_at, key):
+		self.action = action
+		self.future = future
+		self.enqueued_at = enqueued_at
+		self.key = key
+
+"""
+ * Creates a store enhancer that puts a bounded queue in front of `dispatch`,
+ * so that many producer threads can feed one store without outrunning its
+ * reducers.
+ *
+ * The store gets an `enqueue(action)` method, which returns a
+ * `concurrent.futures.Future` resolved with the result of `dispatch(action)`,
+ * or failed with the exception it raised. A single consumer thread dispatches
+ * the queued actions in order, so reducers and listeners run on that thread.
+ * Dispatching directly from other threads at the same time needs
+ * `thread_safe`.
+ *
+ * When the queue is full, the policy decides what happens:
+ *
+ *	- 'block' waits for room, up to `timeout` seconds, then raises.
+ *	- 'drop_oldest' cancels the future of the oldest queued action to make room.
+ *	- 'drop_newest' cancels the future of the new action instead of queueing it.
+ *	- 'merge' folds the new action into the queued action with the same
+ *	  `key(action)`, if any, with `merge(queued_action, action)`, or replaces
+ *	  it when no merge function is given. Both producers get the same future.
+ *	  Actions without a queued match wait for room like 'block'.
+ *
+ * `get_queue_metrics()` reports the current and peak queue depth, how many
+ * actions were enqueued, applied, dropped and merged, and the last, average
+ * and longest seconds actions waited in the queue. `close_queue(wait=True)`
+ * stops accepting actions and lets the consumer finish the queue.
+ *
+ * @param {int} [max_size] The maximum number of queued actions.
+ * @param {String} [policy] One of 'block', 'drop_oldest', 'drop_newest' or
+ * 'merge'.
+ * @param {Function} [key] Returns the merge key of an action, for 'merge'.
+ * Actions with a None key are never merged.
+ * @param {Function} [merge] Combines a queued action with a newer one.
+ * @param {float} [timeout] How long 'block' waits for room, or None for ever.
+ * @param {int} [max_batch] Dispatch up to this many queued actions at once
+ * with `dispatch_batch`, so listeners are notified once per batch. The
+ * futures of a batch are resolved with their own action once the whole batch
+ * is reduced, and if the batch raises, every future of the batch fails.
+ * @returns {Function} A store enhancer.
+"""
+def dispatch_queue(max_size=1000, policy='block', key=None, merge=None, timeout=None, max_batch=1):
+	if policy not in QUEUE_POLICIES:
+		raise Exception('Expected policy to be one of {}, instead received {}.'.format(', '.join(QUEUE_POLICIES), policy))
+	if max_size < 1:
+		raise Exception('Expected max_size to be at least 1, instead received {}.'.format(max_size))
+	if max_batch < 1:
+		raise Exception('Expected max_batch to be at least 1, instead received {}.'.format(max_batch))
+	if policy == 'merge' and not hasattr(key, '__call__'):
+		raise Exception('Expected key to be a function for the merge policy')
+	
+	def enhancer(create_store):
+		def inner(reducer, preloaded_state=None, enhancer=None):
+			store = create_store(reducer, preloaded_state, enhancer)
+			condition = Condition()
+			queue = deque()
+			queued_by_key = {}
+			closed = False
+			metrics = {
+				'depth': 0,
+				'peak_depth': 0,
+				'enqueued': 0,
+				'applied': 0,
+				'dropped': 0,
+				'merged': 0,
+				'last_wait_seconds': 0.0,
+				'max_wait_seconds': 0.0
+			}
+			waits = { 'count': 0, 'total_seconds': 0.0 }
+			
+			def dropped(future):
+				future.cancel()
+				metrics['dropped'] += 1
+				return future
+			
+			def take(count):
+				items = []
+				while queue and len(items) < count:
+					item = queue.popleft()
+					if item.key is not None and queued_by_key.get(item.key) is item:
+						del queued_by_key[item.key]
+					# Futures cancelled by their producer are skipped
+					if item.future.set_running_or_notify_cancel():
+						items.append(item)
+				metrics['depth'] = len(queue)
+				condition.notify_all()
+				return items
+			
+			def record_waits(items):
+				now = time.monotonic()
+				for item in items:
+					waited = now - item.enqueued_at
+					metrics['last_wait_seconds'] = waited
+					metrics['max_wait_seconds'] = max(metrics['max_wait_seconds'], waited)
+					waits['count'] += 1
+					waits['total_seconds'] += waited
+			
+			def consume():
+				while True:
+					with condition:
+						while not queue and not closed:
+							condition.wait()
+						if not queue:
+							return
+						items = take(max_batch)
+						record_waits(items)
+					if not items:
+						continue
+					try:
+						if len(items) == 1:
+							items[0].future.set_result(store['dispatch'](items[0].action))
+						else:
+							# Middleware may drop or replace actions of the batch, so its
+							# results can't be matched back to the queued actions
+							store['dispatch_batch']([item.action for item in items])
+							for item in items:
+								item.future.set_result(item.action)
+					except Exception as error:
+						for item in items:
+							if not item.future.done():
+								item.future.set_exception(error)
+					with condition:
+						metrics['applied'] += len(items)
+			
+			consumer = Thread(target=consume, daemon=True)
+			consumer.start()
+			
+			def enqueue(action=None):
+				future = Future()
+				with condition:
+					if closed:
+						raise Exception('Expected the dispatch queue to be open')
+					action_key = key(action) if policy == 'merge' else None
+					if action_key is not None and action_key in queued_by_key:
+						queued = queued_by_key[action_key]
+						queued.action = merge(queued.action, action) if merge is not None else action
+						metrics['merged'] += 1
+						return queued.future
+					if len(queue) >= max_size:
+						if policy == 'drop_newest':
+							return dropped(future)
+						if policy == 'drop_oldest':
+							oldest = queue.popleft()
+							if oldest.key is not None and queued_by_key.get(oldest.key) is oldest:
+								del queued_by_key[oldest.key]
+							dropped(oldest.future)
+						elif current_thread() is consumer:
+							raise Exception('Listeners may not wait for room in the dispatch queue they are notified from')
+						elif not condition.wait_for(lambda: len(queue) < max_size or closed, timeout):
+							raise Exception('Timed out waiting for room in the dispatch queue')
+						if closed:
+							raise Exception('Expected the dispatch queue to be open')
+					item = QueuedAction(action, future, time.monotonic(), action_key)
+					queue.append(item)
+					if action_key is not None:
+						queued_by_key[action_key] = item
+					metrics['enqueued'] += 1
+					metrics['depth'] = len(queue)
+					metrics['peak_depth'] = max(metrics['peak_depth'], len(queue))
+					condition.notify_all()
+				return future
+			
+			def get_queue_metrics():
+				with condition:
+					result = dict(metrics)
+					result['average_wait_seconds'] = waits['total_seconds'] / waits['count'] if waits['count'] else 0.0
+				return result
+			
+			def close_queue(wait=True):
+				nonlocal closed
+				with condition:
+					closed = True
+					condition.notify_all()
+				if wait:
+					consumer.join()
+			
+			store_to_return = store.copy()
+			store_to_return['enqueue'] = enqueue
+			store_to_return['get_queue_metrics'] = get_queue_metrics
+			store_to_return['close_queue'] = close_queue
+			return store_to_return
+		return inner
+	return enhancer
@@ -0,0 +1,230 @@
+import mmap
+import os
+import pickle
+import struct
+import zlib
+
+ACTION_TYPES = {
+	'INIT': '@@redux/INIT'
+}
+
+PRIVATE_ACTION_PREFIX = '@@redux/'
+JOURNAL_FILE = 'journal'
+SNAPSHOT_FILE = 'snapshot'
+SNAPSHOT_MAGIC = b'PYREDUX1'
+
+# Every journal record is a header followed by the serialized action
+RECORD_HEADER = struct.Struct('<IIQ') # payload length, payload crc32, sequence number
+SNAPSHOT_HEADER = struct.Struct('<8sQ') # magic, sequence number of the last action included
+
+def is_journaled_action(action):
+	action_type = action.get('type')
+	return not (isinstance(action_type, str) and action_type.startswith(PRIVATE_ACTION_PREFIX))
+
+def read_snapshot(path, loads):
+	with open(path, 'rb') as f:
+		data = f.read()
+	magic, sequence = SNAPSHOT_HEADER.unpack_from(data)
+	if magic != SNAPSHOT_MAGIC:
+		raise Exception('{} is not a python_redux snapshot'.format(path))
+	return loads(data[SNAPSHOT_HEADER.size:]), sequence
+
+def write_snapshot(path, state, sequence, dumps):
+	temporary_path = path + '.tmp'
+	with open(temporary_path, 'wb') as f:
+		f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, sequence))
+		f.write(dumps(state))
+		f.flush()
+		os.fsync(f.fileno())
+	os.replace(temporary_path, path)
+
+def read_journal(path, loads):
+	"""Yields `(sequence, action)` for every intact record of the journal through
+	a memory map, and finally the offset just past the last intact record. A
+	record torn by a crash ends the journal.
+	"""
+	with open(path, 'rb') as f:
+		size = os.fstat(f.fileno()).st_size
+		if size == 0:
+			yield 0
+			return
+		with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as journal:
+			offset = 0
+			while offset + RECORD_HEADER.size <= size:
+				length, crc, sequence = RECORD_HEADER.unpack_from(journal, offset)
+				start = offset + RECORD_HEADER.size
+				if start + length > size:
+					break
+				payload = journal[start:start + length]
+				if zlib.crc32(payload) != crc:
+					break
+				yield sequence, loads(payload)
+				offset = start + length
+			yield offset
+
+def recover(directory, reducer, preloaded_state, loads):
+	"""Rebuilds the state from the last snapshot and the journal tail. Returns the
+	state, the sequence number of the last action applied and the number of
+	actions replayed from the journal.
+	"""
+	state = preloaded_state
+	sequence = 0
+	replayed = 0
+	snapshot_path = os.path.join(directory, SNAPSHOT_FILE)
+	journal_path = os.path.join(directory, JOURNAL_FILE)
+	
+	if os.path.exists(snapshot_path):
+		state, sequence = read_snapshot(snapshot_path, loads)
+	
+	if os.path.exists(journal_path):
+		records = read_journal(journal_path, loads)
+		for record in records:
+			if type(record) == int:
+				valid_size = record
+				records.close()
+				break
+			record_sequence, action = record
+			# Records up to the snapshot may survive a crash right after snapshotting
+			if record_sequence <= sequence:
+				continue
+			if replayed == 0 and not os.path.exists(snapshot_path):
+				state = reducer(state, { 'type': ACTION_TYPES['INIT'] })
+			state = reducer(state, action)
+			sequence = record_sequence
+			replayed += 1
+		if valid_size < os.path.getsize(journal_path):
+			os.truncate(journal_path, valid_size)
+	
+	return state, sequence, replayed
+
+def journal(directory, snapshot_every=1000, fsync_every=1, dumps=pickle.dumps, loads=pickle.loads):
+	"""Creates a store enhancer that makes the store durable.
+	
+	Every action reduced by the store is appended to a compact binary journal in
+	`directory`, and every `snapshot_every` actions the whole state is written
+	to a snapshot and the journal is started afresh. When a store is created on
+	an existing directory, the last snapshot is loaded and the journal tail is
+	replayed through the reducer from a memory map, so recovery never replays
+	more than `snapshot_every` actions. The recovered state is used in place of
+	`preloaded_state`.
+	
+	Actions are journaled once they are reduced, in the order they are reduced,
+	including nested dispatches from listeners. A failed `dispatch_batch` is not
+	journaled. Private `@@redux/*` actions are never journaled.
+	
+	The store gets three extra methods: `snapshot()` writes a snapshot now,
+	`flush_journal()` forces the journal to disk and `close_journal()` flushes
+	and closes it. Closing it again does nothing.
+	
+	Place it after `apply_middleware` in the enhancer composition so that only
+	plain actions reach the journal.
+	
+	@param {String} directory The directory holding the journal and snapshot.
+	@param {int} [snapshot_every] The number of actions between snapshots.
+	@param {int} [fsync_every] Fsync the journal after this many actions, or
+	None to leave it to the operating system. It is always flushed to the
+	operating system at the end of a dispatch.
+	@param {Function} [dumps] Serializes actions and state to bytes.
+	@param {Function} [loads] Deserializes actions and state from bytes.
+	@returns {Function} A store enhancer.
+	"""
+	if snapshot_every is not None and snapshot_every < 1:
+		raise Exception('Expected snapshot_every to be at least 1 or None, instead received {}.'.format(snapshot_every))
+	
+	def enhancer(create_store):
+		def inner(reducer, preloaded_state=None, enhancer=None):
+			os.makedirs(directory, exist_ok=True)
+			state, sequence, replayed = recover(directory, reducer, preloaded_state, loads)
+			journal_path = os.path.join(directory, JOURNAL_FILE)
+			journal_file = open(journal_path, 'ab')
+			counters = { 'sequence': sequence, 'since_snapshot': replayed, 'since_fsync': 0 }
+			batch = None
+			
+			def append(action):
+				counters['sequence'] += 1
+				counters['since_snapshot'] += 1
+				counters['since_fsync'] += 1
+				payload = dumps(action)
+				journal_file.write(RECORD_HEADER.pack(len(payload), zlib.crc32(payload), counters['sequence']))
+				journal_file.write(payload)
+			
+			def journaled(reducer):
+				def journaled_reducer(state, action):
+					nonlocal batch
+					next_state = reducer(state, action)
+					if is_journaled_action(action):
+						if batch is None:
+							append(action)
+						else:
+							# A batch is only committed once all of its actions are reduced
+							batch['actions'].append(action)
+							if len(batch['actions']) == batch['size']:
+								for batched_action in batch['actions']:
+									append(batched_action)
+								batch = None
+					return next_state
+				journaled_reducer.__wrapped__ = reducer
+				journaled_reducer.rewrap = journaled
+				return journaled_reducer
+			
+			store = create_store(journaled(reducer), state, enhancer)
+			
+			def flush_journal():
+				journal_file.flush()
+				os.fsync(journal_file.fileno())
+				counters['since_fsync'] = 0
+			
+			def snapshot():
+				nonlocal journal_file
+				journal_file.flush()
+				write_snapshot(os.path.join(directory, SNAPSHOT_FILE), store['get_state'](), counters['sequence'], dumps)
+				journal_file.close()
+				journal_file = open(journal_path, 'wb')
+				counters['since_snapshot'] = 0
+				counters['since_fsync'] = 0
+			
+			def close_journal():
+				if journal_file.closed:
+					return
+				flush_journal()
+				journal_file.close()
+			
+			def after_dispatch():
+				journal_file.flush()
+				if fsync_every is not None and counters['since_fsync'] >= fsync_every:
+					flush_journal()
+				if snapshot_every is not None and counters['since_snapshot'] >= snapshot_every:
+					snapshot()
+			
+			def dispatch(action=None):
+				result = store['dispatch'](action)
+				after_dispatch()
+				return result
+			
+			def dispatch_batch(actions=None):
+				nonlocal batch
+				if actions is not None and type(actions) != dict:
+					actions = list(actions)
+					batch = { 'size': len([a for a in actions if type(a) == dict and is_journaled_action(a)]), 'actions': [] }
+				try:
+					result = store['dispatch_batch'](actions)
+				finally:
+					batch = None
+				after_dispatch()
+				return result
+			
+			def replace_reducer(next_reducer=None):
+				if not hasattr(next_reducer, '__call__'):
+					raise Exception('Expected next_reducer to be a function')
+				store['replace_reducer'](journaled(next_reducer))
+			
+			store_to_return = store.copy()
+			store_to_return['dispatch'] = dispatch
+			store_to_return['dispatch_batch'] = dispatch_batch
+			store_to_return['replace_reducer'] = replace_reducer
+			store_to_return['snapshot'] = snapshot
+			store_to_return['flush_journal'] = flush_journal
+			store_to_return['close_journal'] = close_journal
+			return store_to_return
+		return inner
+	return enhancer
@@ -0,0 +1,210 @@
+from .persistent import PersistentMap, PersistentVector, changed_trie_end, shared_prefix_length
+
+"""
+ * Structural diffs of the state tree, as JSON-Patch style operations.
+ *
+ * A patch is a list of operations, each a dictionary with an `op` of 'add',
+ * 'remove' or 'replace', a `path` tuple of keys and list indexes leading from
+ * the root to the changed value, and the new `value` for 'add' and 'replace'.
+ * Reducers return the very same object for anything they did not change, so
+ * an unchanged subtree is skipped with a single identity check and the size of
+ * a patch only depends on what changed.
+"""
+
+MAP_TYPES = (dict, PersistentMap)
+SEQUENCE_TYPES = (list, PersistentVector)
+
+def diff_maps(patch, path, previous, next, keys):
+	if keys is None:
+		for key in next:
+			if key in previous:
+				diff_into(patch, path + (key,), previous[key], next[key])
+			else:
+				patch.append({ 'op': 'add', 'path': path + (key,), 'value': next[key] })
+		for key in previous:
+			if key not in next:
+				patch.append({ 'op': 'remove', 'path': path + (key,) })
+		return
+	for key in keys:
+		if key in next:
+			if key in previous:
+				diff_into(patch, path + (key,), previous[key], next[key])
+			else:
+				patch.append({ 'op': 'add', 'path': path + (key,), 'value': next[key] })
+		elif key in previous:
+			patch.append({ 'op': 'remove', 'path': path + (key,) })
+
+def diff_sequences(patch, path, previous, next):
+	previous_end = len(previous)
+	next_end = len(next)
+	start = 0
+	is_vector = type(next) == PersistentVector
+	# Vectors skip the trie nodes they still share instead of comparing every item
+	if is_vector:
+		start = shared_prefix_length(previous, next)
+	while start < previous_end and start < next_end and previous[start] is next[start]:
+		start += 1
+	if is_vector and previous_end == next_end:
+		tail_offset = next._tail_offset()
+		if previous._tail is next._tail:
+			next_end = max(start, tail_offset)
+		while next_end > max(start, tail_offset) and previous[next_end - 1] is next[next_end - 1]:
+			next_end -= 1
+		if next_end == tail_offset:
+			next_end = max(start, changed_trie_end(previous, next))
+		previous_end = next_end
+	while previous_end > start and next_end > start and previous[previous_end - 1] is next[next_end - 1]:
+		previous_end -= 1
+		next_end -= 1
+	
+	overlap_end = min(previous_end, next_end)
+	for index in range(start, overlap_end):
+		diff_into(patch, path + (index,), previous[index], next[index])
+	for index in range(overlap_end, next_end):
+		patch.append({ 'op': 'add', 'path': path + (index,), 'value': next[index] })
+	for index in reversed(range(overlap_end, previous_end)):
+		patch.append({ 'op': 'remove', 'path': path + (index,) })
+
+def diff_into(patch, path, previous, next, keys=None):
+	if previous is next:
+		return
+	if type(previous) != type(next):
+		patch.append({ 'op': 'replace', 'path': path, 'value': next })
+	elif isinstance(next, MAP_TYPES):
+		diff_maps(patch, path, previous, next, keys)
+	elif isinstance(next, SEQUENCE_TYPES):
+		diff_sequences(patch, path, previous, next)
+	else:
+		patch.append({ 'op': 'replace', 'path': path, 'value': next })
+
+"""
+ * Computes the patch that turns one state tree into another.
+ *
+ * @param {any} previous_state The state before the change.
+ * @param {any} next_state The state after the change.
+ * @param {Iterable} [changed_keys] The top level keys that may have changed, as
+ * reported by `combine_reducers` or a listener subscribed `with_change`. Other
+ * top level keys are not looked at.
+ * @returns {List} The patch operations, empty if nothing changed.
+"""
+def diff_state(previous_state, next_state, changed_keys=None):
+	patch = []
+	diff_into(patch, (), previous_state, next_state, changed_keys)
+	return patch
+
+def copy_node(node, owned):
+	if id(node) in owned or type(node) in (PersistentMap, PersistentVector):
+		return node
+	if type(node) == dict:
+		node = dict(node)
+	elif type(node) == list:
+		node = list(node)
+	else:
+		raise Exception('Can not patch a value of type {}'.format(type(node).__name__))
+	owned.add(id(node))
+	return node
+
+def set_child(node, key, value, owned):
+	node = copy_node(node, owned)
+	if type(node) in (PersistentMap, PersistentVector):
+		return node.set(key, value)
+	node[key] = value
+	return node
+
+def add_child(node, key, value, owned):
+	node = copy_node(node, owned)
+	if type(node) == PersistentMap:
+		return node.set(key, value)
+	if type(node) == PersistentVector:
+		if key == len(node):
+			return node.append(value)
+		items = list(node)
+		items.insert(key, value)
+		return PersistentVector(items)
+	if type(node) == list:
+		node.insert(key, value)
+	else:
+		node[key] = value
+	return node
+
+def remove_child(node, key, owned):
+	node = copy_node(node, owned)
+	if type(node) == PersistentMap:
+		return node.remove(key)
+	if type(node) == PersistentVector:
+		if key == len(node) - 1:
+			return node.pop()
+		items = list(node)
+		del items[key]
+		return PersistentVector(items)
+	del node[key]
+	return node
+
+def apply_operation(node, op, path, value, owned):
+	if len(path) == 0:
+		if op == 'remove':
+			raise Exception('Can not remove the root of the state tree')
+		return value
+	key = path[0]
+	if len(path) > 1:
+		return set_child(node, key, apply_operation(node[key], op, path[1:], value, owned), owned)
+	if op == 'replace':
+		return set_child(node, key, value, owned)
+	if op == 'add':
+		return add_child(node, key, value, owned)
+	if op == 'remove':
+		return remove_child(node, key, owned)
+	raise Exception('Unknown patch operation "{}"'.format(op))
+
+"""
+ * Applies a patch made by `diff_state` to a state tree. The given state is not
+ * modified: the containers on the patched paths are copied, once per patch,
+ * and everything else is shared with it.
+ *
+ * @param {any} state The state tree the patch was computed from.
+ * @param {List} patch The patch operations.
+ * @returns {any} The patched state tree.
+"""
+def apply_patch(state, patch):
+	owned = set()
+	for operation in patch:
+		state = apply_operation(state, operation['op'], operation['path'], operation.get('value'), owned)
+	return state
+
+"""
+ * A store enhancer that streams the changes of the state tree as patches.
+ *
+ * The store gets a `subscribe_patches(listener)` method. After every dispatch
+ * that changes the state, the listener is called with the patch from the state
+ * it last saw and the latest action dispatched. Applying the patches in order
+ * to a copy of `get_state()`, taken when subscribing, rebuilds the state.
+ *
+ * @param {Function} create_store The store creator to enhance.
+ * @returns {Function} A store creator whose stores stream patches.
+"""
+def patch_stream(create_store):
+	def inner(reducer, preloaded_state=None, enhancer=None):
+		store = create_store(reducer, preloaded_state, enhancer)
+		last_diff = None
+		
+		def get_patch(previous_state, next_state, changed_keys):
+			nonlocal last_diff
+			# Patch listeners that saw the same states share the same diff
+			if last_diff is None or last_diff[0] is not previous_state or last_diff[1] is not next_state:
+				last_diff = (previous_state, next_state, diff_state(previous_state, next_state, changed_keys))
+			return last_diff[2]
+		
+		def subscribe_patches(listener=None):
+			if not hasattr(listener, '__call__'):
+				raise Exception('Expected listener to be a function')
+			
+			def on_change(previous_state, next_state, action, changed_keys):
+				patch = get_patch(previous_state, next_state, changed_keys)
+				if patch:
+					listener(patch, action)
+			return store['subscribe'](on_change, (), with_change=True)
+		
+		store_to_return = store.copy()
+		store_to_return['subscribe_patches'] = subscribe_patches
+		return store_to_return
+	return inner
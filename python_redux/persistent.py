@@ -0,0 +1,464 @@
+from collections.abc import Mapping, Sequence
+
+"""
+ * Persistent (immutable) collections for the state tree.
+ *
+ * Updating a plain dict or list the Redux way copies the whole collection, so
+ * every dispatch costs O(n) on a large slice. The collections below are never
+ * modified in place either, but an update only copies the O(log32 n) nodes on
+ * the path to the changed entry and shares everything else with the previous
+ * version. Updates that store the very same object return the collection
+ * itself, so identity change detection in `combine_reducers` keeps working.
+"""
+
+BITS = 5
+WIDTH = 1 << BITS
+MASK = WIDTH - 1
+HASH_MASK = 0xFFFFFFFF
+
+NOT_FOUND = object()
+
+def bit_count(bitmap):
+	return bin(bitmap).count('1')
+
+def hash_key(key):
+	return hash(key) & HASH_MASK
+
+class BitmapNode(object):
+	"""A hash array mapped trie node. `entries` holds one item per bit set in
+	`bitmap`, either a `(hash, key, value)` leaf tuple or a child node.
+	"""
+	__slots__ = ('bitmap', 'entries')
+
+	def __init__(self, bitmap, entries):
+		self.bitmap = bitmap
+		self.entries = entries
+
+class CollisionNode(object):
+	"""Holds the leaves of keys whose 32 bit hashes are identical."""
+	__slots__ = ('hash', 'entries')
+
+	def __init__(self, key_hash, entries):
+		self.hash = key_hash
+		self.entries = entries
+
+EMPTY_NODE = BitmapNode(0, ())
+
+def same_key(a, b):
+	return a is b or a == b
+
+def node_get(node, key_hash, shift, key):
+	while True:
+		if type(node) is CollisionNode:
+			for leaf in node.entries:
+				if same_key(leaf[1], key):
+					return leaf[2]
+			return NOT_FOUND
+		bit = 1 << ((key_hash >> shift) & MASK)
+		if not node.bitmap & bit:
+			return NOT_FOUND
+		entry = node.entries[bit_count(node.bitmap & (bit - 1))]
+		if type(entry) is tuple:
+			return entry[2] if same_key(entry[1], key) else NOT_FOUND
+		node = entry
+		shift += BITS
+
+def merge_leaves(shift, a, b):
+	if a[0] == b[0]:
+		return CollisionNode(a[0], (a, b))
+	node, added = node_set(EMPTY_NODE, a[0], shift, a[1], a[2])
+	node, added = node_set(node, b[0], shift, b[1], b[2])
+	return node
+
+def node_set(node, key_hash, shift, key, value):
+	"""Returns `(node, added)`. The node itself is returned if nothing changed."""
+	if type(node) is CollisionNode:
+		if key_hash != node.hash:
+			# Nest the collision node below a bitmap node that can tell them apart
+			parent = BitmapNode(1 << ((node.hash >> shift) & MASK), (node,))
+			return node_set(parent, key_hash, shift, key, value)
+		for i, leaf in enumerate(node.entries):
+			if same_key(leaf[1], key):
+				if leaf[2] is value:
+					return node, False
+				entries = node.entries[:i] + ((key_hash, key, value),) + node.entries[i + 1:]
+				return CollisionNode(key_hash, entries), False
+		return CollisionNode(key_hash, node.entries + ((key_hash, key, value),)), True
+
+	bit = 1 << ((key_hash >> shift) & MASK)
+	index = bit_count(node.bitmap & (bit - 1))
+	if not node.bitmap & bit:
+		entries = node.entries[:index] + ((key_hash, key, value),) + node.entries[index:]
+		return BitmapNode(node.bitmap | bit, entries), True
+
+	entry = node.entries[index]
+	if type(entry) is tuple:
+		if same_key(entry[1], key):
+			if entry[2] is value:
+				return node, False
+			child = (key_hash, key, value)
+			added = False
+		else:
+			child = merge_leaves(shift + BITS, entry, (key_hash, key, value))
+			added = True
+	else:
+		child, added = node_set(entry, key_hash, shift + BITS, key, value)
+		if child is entry:
+			return node, False
+	entries = node.entries[:index] + (child,) + node.entries[index + 1:]
+	return BitmapNode(node.bitmap, entries), added
+
+def compact(node):
+	"""Replaces a child node holding a single leaf with the leaf itself."""
+	if node is None:
+		return None
+	if len(node.entries) == 1 and type(node.entries[0]) is tuple:
+		return node.entries[0]
+	return node
+
+def node_remove(node, key_hash, shift, key):
+	"""Returns the node without `key`, None if it ended up empty, or the node
+	itself if `key` was not found.
+	"""
+	if type(node) is CollisionNode:
+		for i, leaf in enumerate(node.entries):
+			if same_key(leaf[1], key):
+				entries = node.entries[:i] + node.entries[i + 1:]
+				return CollisionNode(node.hash, entries) if entries else None
+		return node
+
+	bit = 1 << ((key_hash >> shift) & MASK)
+	if not node.bitmap & bit:
+		return node
+	index = bit_count(node.bitmap & (bit - 1))
+	entry = node.entries[index]
+	if type(entry) is tuple:
+		if not same_key(entry[1], key):
+			return node
+		child = None
+	else:
+		child = node_remove(entry, key_hash, shift + BITS, key)
+		if child is entry:
+			return node
+		child = compact(child)
+
+	if child is None:
+		if node.bitmap == bit:
+			return None
+		return BitmapNode(node.bitmap ^ bit, node.entries[:index] + node.entries[index + 1:])
+	return BitmapNode(node.bitmap, node.entries[:index] + (child,) + node.entries[index + 1:])
+
+def node_leaves(node):
+	for entry in node.entries:
+		if type(entry) is tuple:
+			yield entry
+		else:
+			yield from node_leaves(entry)
+
+class PersistentMap(Mapping):
+	"""An immutable mapping backed by a hash array mapped trie.
+
+	`set`, `remove` and `update` return a new map that shares structure with
+	this one, or this very map if nothing changed. Keys must be hashable.
+
+		state = PersistentMap(counter=0)
+		next_state = state.set('counter', 1)
+	"""
+	__slots__ = ('_root', '_count')
+
+	def __init__(self, items=None, **kwargs):
+		self._root = EMPTY_NODE
+		self._count = 0
+		if items is not None or kwargs:
+			root, count = self._root, 0
+			for key, value in iter_items(items, kwargs):
+				root, added = node_set(root, hash_key(key), 0, key, value)
+				count += added
+			self._root = root
+			self._count = count
+
+	@classmethod
+	def _create(cls, root, count):
+		instance = cls.__new__(cls)
+		instance._root = root
+		instance._count = count
+		return instance
+
+	def __getitem__(self, key):
+		value = node_get(self._root, hash_key(key), 0, key)
+		if value is NOT_FOUND:
+			raise KeyError(key)
+		return value
+
+	def get(self, key, default=None):
+		value = node_get(self._root, hash_key(key), 0, key)
+		return default if value is NOT_FOUND else value
+
+	def __contains__(self, key):
+		return node_get(self._root, hash_key(key), 0, key) is not NOT_FOUND
+
+	def __len__(self):
+		return self._count
+
+	def __iter__(self):
+		for leaf in node_leaves(self._root):
+			yield leaf[1]
+
+	def iter_items(self):
+		for leaf in node_leaves(self._root):
+			yield leaf[1], leaf[2]
+
+	def set(self, key, value):
+		root, added = node_set(self._root, hash_key(key), 0, key, value)
+		if root is self._root:
+			return self
+		return PersistentMap._create(root, self._count + added)
+
+	def remove(self, key):
+		root = node_remove(self._root, hash_key(key), 0, key)
+		if root is self._root:
+			return self
+		return PersistentMap._create(EMPTY_NODE if root is None else root, self._count - 1)
+
+	def update(self, items=None, **kwargs):
+		result = self
+		for key, value in iter_items(items, kwargs):
+			result = result.set(key, value)
+		return result
+
+	def __eq__(self, other):
+		if self is other:
+			return True
+		if not isinstance(other, Mapping):
+			return NotImplemented
+		if len(self) != len(other):
+			return False
+		for key, value in self.iter_items():
+			other_value = other.get(key, NOT_FOUND)
+			if other_value is not value and other_value != value:
+				return False
+		return True
+
+	__hash__ = None
+
+	def __repr__(self):
+		return 'PersistentMap({{{}}})'.format(', '.join('{!r}: {!r}'.format(key, value) for key, value in self.iter_items()))
+
+def iter_items(items, kwargs):
+	if items is not None:
+		if isinstance(items, PersistentMap):
+			yield from items.iter_items()
+		elif isinstance(items, Mapping):
+			for key in items:
+				yield key, items[key]
+		else:
+			yield from items
+	yield from kwargs.items()
+
+def new_path(level, node):
+	while level > 0:
+		node = (node,)
+		level -= BITS
+	return node
+
+class PersistentVector(Sequence):
+	"""An immutable sequence backed by a 32-way trie with a tail buffer.
+
+	Indexing, `set`, `append` and `pop` are O(log32 n), and `append` and `pop`
+	are amortized O(1) since they usually only touch the tail. Every update
+	returns a new vector that shares structure with this one, or this very
+	vector if nothing changed.
+
+		todos = PersistentVector()
+		todos = todos.append({ 'id': 1, 'text': 'Hello' })
+	"""
+	__slots__ = ('_count', '_shift', '_root', '_tail')
+
+	def __init__(self, items=None):
+		self._count = 0
+		self._shift = BITS
+		self._root = ()
+		self._tail = ()
+		if items is not None:
+			vector = self.extend(items)
+			self._count, self._shift, self._root, self._tail = vector._count, vector._shift, vector._root, vector._tail
+
+	@classmethod
+	def _create(cls, count, shift, root, tail):
+		instance = cls.__new__(cls)
+		instance._count = count
+		instance._shift = shift
+		instance._root = root
+		instance._tail = tail
+		return instance
+
+	def _tail_offset(self):
+		if self._count < WIDTH:
+			return 0
+		return ((self._count - 1) >> BITS) << BITS
+
+	def _leaf_for(self, index):
+		if index >= self._tail_offset():
+			return self._tail
+		node = self._root
+		level = self._shift
+		while level > 0:
+			node = node[(index >> level) & MASK]
+			level -= BITS
+		return node
+
+	def _check_index(self, index):
+		if index < 0:
+			index += self._count
+		if index < 0 or index >= self._count:
+			raise IndexError('PersistentVector index out of range')
+		return index
+
+	def __getitem__(self, index):
+		if isinstance(index, slice):
+			return PersistentVector(self[i] for i in range(*index.indices(self._count)))
+		index = self._check_index(index)
+		return self._leaf_for(index)[index & MASK]
+
+	def __len__(self):
+		return self._count
+
+	def __iter__(self):
+		for start in range(0, self._count, WIDTH):
+			yield from self._leaf_for(start)
+
+	def set(self, index, value):
+		index = self._check_index(index)
+		leaf = self._leaf_for(index)
+		if leaf[index & MASK] is value:
+			return self
+		if index >= self._tail_offset():
+			offset = index & MASK
+			tail = self._tail[:offset] + (value,) + self._tail[offset + 1:]
+			return PersistentVector._create(self._count, self._shift, self._root, tail)
+		root = self._set_in(self._shift, self._root, index, value)
+		return PersistentVector._create(self._count, self._shift, root, self._tail)
+
+	def _set_in(self, level, node, index, value):
+		if level == 0:
+			offset = index & MASK
+			return node[:offset] + (value,) + node[offset + 1:]
+		offset = (index >> level) & MASK
+		child = self._set_in(level - BITS, node[offset], index, value)
+		return node[:offset] + (child,) + node[offset + 1:]
+
+	def append(self, value):
+		if len(self._tail) < WIDTH:
+			return PersistentVector._create(self._count + 1, self._shift, self._root, self._tail + (value,))
+		shift = self._shift
+		if (self._count >> BITS) > (1 << self._shift):
+			root = (self._root, new_path(self._shift, self._tail))
+			shift += BITS
+		else:
+			root = self._push_tail(self._shift, self._root, self._tail)
+		return PersistentVector._create(self._count + 1, shift, root, (value,))
+
+	def _push_tail(self, level, parent, tail):
+		offset = ((self._count - 1) >> level) & MASK
+		if level == BITS:
+			child = tail
+		elif offset < len(parent):
+			child = self._push_tail(level - BITS, parent[offset], tail)
+		else:
+			child = new_path(level - BITS, tail)
+		if offset < len(parent):
+			return parent[:offset] + (child,) + parent[offset + 1:]
+		return parent + (child,)
+
+	def extend(self, items):
+		result = self
+		for item in items:
+			result = result.append(item)
+		return result
+
+	def pop(self):
+		if self._count == 0:
+			raise IndexError('pop from empty PersistentVector')
+		if self._count == 1:
+			return EMPTY_VECTOR
+		if len(self._tail) > 1:
+			return PersistentVector._create(self._count - 1, self._shift, self._root, self._tail[:-1])
+		tail = self._leaf_for(self._count - 2)
+		root = self._pop_tail(self._shift, self._root)
+		shift = self._shift
+		if root is None:
+			root = ()
+		if shift > BITS and len(root) == 1:
+			root = root[0]
+			shift -= BITS
+		return PersistentVector._create(self._count - 1, shift, root, tail)
+
+	def _pop_tail(self, level, node):
+		offset = ((self._count - 2) >> level) & MASK
+		if level > BITS:
+			child = self._pop_tail(level - BITS, node[offset])
+			if child is None:
+				return None if offset == 0 else node[:offset]
+			return node[:offset] + (child,) + node[offset + 1:]
+		return None if offset == 0 else node[:offset]
+
+	def __eq__(self, other):
+		if self is other:
+			return True
+		if not isinstance(other, Sequence) or isinstance(other, (str, bytes)):
+			return NotImplemented
+		if len(self) != len(other):
+			return False
+		for a, b in zip(self, other):
+			if a is not b and a != b:
+				return False
+		return True
+
+	__hash__ = None
+
+	def __repr__(self):
+		return 'PersistentVector([{}])'.format(', '.join(repr(item) for item in self))
+
+EMPTY_VECTOR = PersistentVector()
+
+def shared_prefix_length(previous, next):
+	"""Counts the leading items of two vectors held by the trie nodes they share,
+	descending only into the nodes that differ. The tails are not looked at.
+	"""
+	if previous._shift != next._shift:
+		return 0
+	end = min(previous._tail_offset(), next._tail_offset())
+	a, b = previous._root, next._root
+	level = previous._shift
+	offset = 0
+	while a is not b:
+		count = min(len(a), len(b))
+		i = 0
+		while i < count and a[i] is b[i]:
+			i += 1
+		offset += i << level
+		if i == count or level == 0:
+			return min(offset, end)
+		a, b = a[i], b[i]
+		level -= BITS
+	return end
+
+def changed_trie_end(previous, next):
+	"""Returns the index after the last item held by trie nodes that differ
+	between two vectors of the same length, or 0 if the tries are shared.
+	"""
+	a, b = previous._root, next._root
+	level = previous._shift
+	offset = 0
+	while a is not b:
+		i = min(len(a), len(b))
+		while i > 0 and a[i - 1] is b[i - 1]:
+			i -= 1
+		if i == 0:
+			return offset
+		if level == 0:
+			return offset + i
+		offset += (i - 1) << level
+		a, b = a[i - 1], b[i - 1]
+		level -= BITS
+	return offset
@@ -0,0 +1,23 @@
+PRODUCTION_MODE = { 'enabled': False }
+
+"""
+ * Turns production mode on or off for every store and combined reducer created
+ * afterwards, unless they are given their own `production` argument.
+ *
+ * In production mode `dispatch()` no longer checks that actions are plain
+ * dictionaries with a type, `combine_reducers` skips its sanity checks by
+ * default and only warns about an unexpected state shape for the first INIT
+ * action. Development mode, the default, keeps every check for debugging.
+ *
+ * @param {bool} [enabled] Whether production mode is on.
+ * @returns {bool} Whether production mode was on before.
+"""
+def set_production_mode(enabled=True):
+	previous = PRODUCTION_MODE['enabled']
+	PRODUCTION_MODE['enabled'] = bool(enabled)
+	return previous
+
+def is_production(production=None):
+	if production is None:
+		return PRODUCTION_MODE['enabled']
+	return bool(production)
@@ -0,0 +1,314 @@
+import json
+import random
+import threading
+import time
+from .combine_reducers import combine_reducers
+
+ROOT_REDUCER = '@root'
+SUB_BUCKET_BITS = 3
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+
+def bucket_of(nanoseconds):
+	"""Maps a duration to a log-linear histogram bucket, about 12% wide."""
+	nanoseconds = max(int(nanoseconds), 0)
+	exponent = nanoseconds.bit_length() - 1
+	if exponent < SUB_BUCKET_BITS:
+		return nanoseconds
+	return exponent * SUB_BUCKETS + ((nanoseconds >> (exponent - SUB_BUCKET_BITS)) & (SUB_BUCKETS - 1))
+
+def bucket_value(bucket):
+	"""Returns the midpoint of a bucket in seconds."""
+	if bucket < SUB_BUCKETS:
+		return bucket / 1e9
+	exponent, sub_bucket = divmod(bucket, SUB_BUCKETS)
+	width = 1 << (exponent - SUB_BUCKET_BITS)
+	return ((SUB_BUCKETS + sub_bucket) * width + width / 2) / 1e9
+
+def percentile(histogram, count, fraction):
+	target = max(1, int(count * fraction + 0.5))
+	seen = 0
+	for bucket in sorted(histogram):
+		seen += histogram[bucket]
+		if seen >= target:
+			return bucket_value(bucket)
+	return None
+
+def new_stats():
+	return { 'calls': 0, 'sampled': 0, 'self_time': 0.0, 'total_time': 0.0, 'max': 0.0, 'histogram': {} }
+
+def copy_stats(stats):
+	return dict(stats, histogram=dict(stats['histogram']))
+
+def summarize(stats):
+	sampled = stats['sampled']
+	return {
+		'calls': stats['calls'],
+		'sampled': sampled,
+		'mean': stats['self_time'] / sampled if sampled else None,
+		'inclusive_mean': stats['total_time'] / sampled if sampled else None,
+		'p50': percentile(stats['histogram'], sampled, 0.5) if sampled else None,
+		'p99': percentile(stats['histogram'], sampled, 0.99) if sampled else None,
+		'max': stats['max'] if sampled else None
+	}
+
+def action_type_of(action):
+	if type(action) == dict:
+		return str(action.get('type'))
+	return type(action).__name__
+
+def name_of(func):
+	name = getattr(func, '__qualname__', None) or getattr(func, '__name__', None)
+	if name is None:
+		return repr(func)
+	module = getattr(func, '__module__', None)
+	return '{}.{}'.format(module, name) if module else name
+
+class ThreadState(object):
+	"""What the profiler tracks for each thread: the nesting depth of
+	instrumented calls, whether the current dispatch is sampled, the child times
+	of the sampled calls in progress, the calls counted while unsampled and the
+	type of the last action seen."""
+	__slots__ = ('suspended', 'depth', 'sampled', 'frames', 'counts', 'action', 'action_type')
+	
+	def __init__(self):
+		self.suspended = False
+		self.depth = 0
+		self.sampled = False
+		self.frames = []
+		self.counts = {}
+		self.action = None
+		self.action_type = action_type_of(None)
+
+def create_profiler(sample_rate=1.0, clock=time.perf_counter):
+	"""Creates a profiler that records call counts and latency histograms for
+	the reducers, listeners and middleware of a store.
+	
+	`profiler['enhancer']` is a store enhancer that instruments the root
+	reducer, every slice reducer of a `combine_reducers` tree (named by their
+	dotted key path), every listener registered through `subscribe` and
+	`dispatch` itself. Middleware lives outside the store, so it is instrumented
+	by wrapping it with `profiler['middleware']` before passing it to
+	`apply_middleware`:
+	
+		profiler = create_profiler(sample_rate=0.01)
+		store = create_store(reducer, compose(
+			apply_middleware(*profiler['middleware'](thunk, logger)),
+			profiler['enhancer']
+		))
+		print(profiler['to_json']())
+	
+	Latencies are self times: time spent in nested instrumented components,
+	such as the slice reducers called by the root reducer or the rest of the
+	middleware chain, is not counted against the caller. Every call is counted,
+	but only a `sample_rate` fraction of dispatches are timed, and the decision
+	is made once per dispatch so that all of its components are sampled
+	together.
+	
+	`profiler['snapshot']()` returns a plain dict of `calls`, `sampled`, `mean`,
+	`inclusive_mean`, `p50`, `p99` and `max` (in seconds) per component kind and
+	name, with the same figures per action type under `by_action_type`.
+	`profiler['to_json']()` returns it as JSON and `profiler['reset']()` clears it.
+	
+	@param {float} [sample_rate] The fraction of dispatches to time.
+	@param {Function} [clock] Returns the current time in seconds.
+	@returns {Object} The profiler.
+	"""
+	if not 0 <= sample_rate <= 1:
+		raise Exception('Expected sample_rate to be between 0 and 1, instead received {}.'.format(sample_rate))
+	
+	lock = threading.Lock()
+	local = threading.local()
+	stats = {}
+	# Unsampled calls are only counted, in a dict per thread, without the lock
+	thread_counts = []
+	
+	def stats_for(stats, kind, name, action_type):
+		component = stats.get((kind, name))
+		if component is None:
+			component = stats[(kind, name)] = (new_stats(), {})
+		by_action_type = component[1].get(action_type)
+		if by_action_type is None:
+			by_action_type = component[1][action_type] = new_stats()
+		return component[0], by_action_type
+	
+	def record(kind, name, action_type, elapsed, self_time):
+		with lock:
+			for entry in stats_for(stats, kind, name, action_type):
+				entry['calls'] += 1
+				entry['sampled'] += 1
+				entry['self_time'] += self_time
+				entry['total_time'] += elapsed
+				if self_time > entry['max']:
+					entry['max'] = self_time
+				bucket = bucket_of(self_time * 1e9)
+				entry['histogram'][bucket] = entry['histogram'].get(bucket, 0) + 1
+	
+	def thread_state():
+		try:
+			return local.state
+		except AttributeError:
+			state = local.state = ThreadState()
+			with lock:
+				thread_counts.append(state.counts)
+			return state
+	
+	def measure(kind, name, func, get_action):
+		def measured(*args, **kwargs):
+			try:
+				state = local.state
+			except AttributeError:
+				state = thread_state()
+			if state.suspended:
+				return func(*args, **kwargs)
+			if state.depth == 0:
+				state.sampled = sample_rate >= 1 or random.random() < sample_rate
+			action = get_action(args)
+			if action is not state.action:
+				state.action = action
+				state.action_type = action_type_of(action)
+			if not state.sampled:
+				counts = state.counts
+				key = (kind, name, state.action_type)
+				counts[key] = counts.get(key, 0) + 1
+				state.depth += 1
+				try:
+					return func(*args, **kwargs)
+				finally:
+					state.depth -= 1
+			
+			action_type = state.action_type
+			frames = state.frames
+			state.depth += 1
+			frames.append(0.0)
+			start = clock()
+			try:
+				return func(*args, **kwargs)
+			finally:
+				elapsed = clock() - start
+				child_time = frames.pop()
+				state.depth -= 1
+				if frames:
+					frames[-1] += elapsed
+				record(kind, name, action_type, elapsed, elapsed - child_time)
+		measured.__wrapped__ = func
+		return measured
+	
+	def current_action(args):
+		return getattr(local, 'action', None)
+	
+	def instrument_reducer(reducer, name=ROOT_REDUCER, prefix=''):
+		slice_reducers = getattr(reducer, 'reducers', None)
+		options = getattr(reducer, 'options', None)
+		if slice_reducers is not None and options is not None:
+			instrumented = dict(
+				(key, instrument_reducer(slice_reducers[key], prefix + str(key), prefix + str(key) + '.'))
+				for key in slice_reducers
+			)
+			# Don't record the sanity checks run while rebuilding the combination
+			state = thread_state()
+			state.suspended = True
+			try:
+				reducer = combine_reducers(instrumented, **options)
+			finally:
+				state.suspended = False
+		return measure_reducer(reducer, name)
+	
+	def measure_reducer(reducer, name):
+		measured = measure('reducer', name, reducer, lambda args: args[1] if len(args) > 1 else None)
+		if hasattr(reducer, 'action_types'):
+			measured.action_types = reducer.action_types
+		if getattr(reducer, 'parallel', False):
+			measured.parallel = True
+		measured.rewrap = lambda rebuilt: measure_reducer(rebuilt, name)
+		return measured
+	
+	def with_action(dispatch, get_action):
+		def dispatch_with_action(*args, **kwargs):
+			previous_action = getattr(local, 'action', None)
+			local.action = get_action(args)
+			try:
+				return dispatch(*args, **kwargs)
+			finally:
+				local.action = previous_action
+		return dispatch_with_action
+	
+	def last_action_of_batch(args):
+		actions = args[0] if args else None
+		if type(actions) in (list, tuple) and actions:
+			return actions[-1]
+		return None
+	
+	def enhancer(create_store):
+		def inner(reducer, preloaded_state=None, enhancer=None):
+			store = create_store(instrument_reducer(reducer), preloaded_state, enhancer)
+			
+			def subscribe(listener=None, *args, **kwargs):
+				if not hasattr(listener, '__call__'):
+					raise Exception('Expected listener to be a function')
+				return store['subscribe'](measure('listener', name_of(listener), listener, current_action), *args, **kwargs)
+			
+			def replace_reducer(next_reducer=None):
+				if not hasattr(next_reducer, '__call__'):
+					raise Exception('Expected next_reducer to be a function')
+				store['replace_reducer'](instrument_reducer(next_reducer))
+			
+			def inject_reducer(key=None, reducer=None):
+				if not hasattr(reducer, '__call__'):
+					raise Exception('Expected reducer to be a function')
+				store['inject_reducer'](key, instrument_reducer(reducer, str(key), str(key) + '.'))
+			
+			first_argument = lambda args: args[0] if args else None
+			store_to_return = store.copy()
+			store_to_return['dispatch'] = with_action(measure('dispatch', 'dispatch', store['dispatch'], first_argument), first_argument)
+			if 'dispatch_batch' in store:
+				store_to_return['dispatch_batch'] = with_action(measure('dispatch', 'dispatch_batch', store['dispatch_batch'], last_action_of_batch), last_action_of_batch)
+			store_to_return['subscribe'] = subscribe
+			store_to_return['replace_reducer'] = replace_reducer
+			if 'inject_reducer' in store:
+				store_to_return['inject_reducer'] = inject_reducer
+			return store_to_return
+		return inner
+	
+	def instrument_middleware(*middlewares):
+		def instrument(middleware):
+			name = name_of(middleware)
+			def measured_middleware(middleware_api):
+				apply = middleware(middleware_api)
+				return lambda next: measure('middleware', name, apply(next), lambda args: args[0] if args else None)
+			if hasattr(middleware, 'action_types'):
+				measured_middleware.action_types = middleware.action_types
+			return measured_middleware
+		return [instrument(middleware) for middleware in middlewares]
+	
+	def snapshot():
+		with lock:
+			copies = dict((key, (copy_stats(total), dict((action_type, copy_stats(entry)) for action_type, entry in by_action_type.items())))
+				for key, (total, by_action_type) in stats.items())
+			counts = [counts.copy() for counts in thread_counts]
+		for thread_count in counts:
+			for (kind, name, action_type), calls in thread_count.items():
+				for entry in stats_for(copies, kind, name, action_type):
+					entry['calls'] += calls
+		result = { 'sample_rate': sample_rate, 'components': {} }
+		for (kind, name), (total, by_action_type) in copies.items():
+			summary = summarize(total)
+			summary['by_action_type'] = dict((action_type, summarize(entry)) for action_type, entry in by_action_type.items())
+			result['components'].setdefault(kind, {})[name] = summary
+		return result
+	
+	def to_json(**kwargs):
+		return json.dumps(snapshot(), **kwargs)
+	
+	def reset():
+		with lock:
+			stats.clear()
+			for counts in thread_counts:
+				counts.clear()
+	
+	return {
+		'enhancer': enhancer,
+		'middleware': instrument_middleware,
+		'snapshot': snapshot,
+		'to_json': to_json,
+		'reset': reset
+	}
@@ -0,0 +1,145 @@
+import time
+from threading import Thread
+from .create_store import create_store
+from .patch import apply_patch, diff_state
+from .thread_safe import thread_safe
+
+REPLICA_ACTION_TYPES = {
+	'SNAPSHOT': '@@redux/REPLICA_SNAPSHOT'
+}
+
+"""
+ * A store enhancer that feeds read replicas of the store, typically living in
+ * other processes, so that read load can be spread over several cores.
+ *
+ * The store gets an `add_replica(connection)` method, where `connection` is one
+ * end of a `multiprocessing.Pipe()` or anything else with `send()`. The replica
+ * is first sent a snapshot of the state, then a patch (see `diff_state`)
+ * after every dispatch that changes the state, so replicas never run the
+ * reducers. Messages are sent from the dispatching thread, so a replica that
+ * falls far behind eventually blocks `dispatch()`. Actions and state must be
+ * picklable to cross a process boundary. A replica whose connection is closed
+ * is dropped.
+ *
+ * @param {Function} create_store The store creator to enhance.
+ * @returns {Function} A store creator whose stores feed replicas.
+"""
+def replication(create_store):
+	def inner(reducer, preloaded_state=None, enhancer=None):
+		store = create_store(reducer, preloaded_state, enhancer)
+		connections = []
+		sequence = 0
+		
+		def send(connection, message):
+			try:
+				connection.send(message)
+			except (BrokenPipeError, EOFError, OSError):
+				remove_connection(connection)
+		
+		def remove_connection(connection):
+			if connection in connections:
+				connections.remove(connection)
+		
+		def on_change(previous_state, next_state, action, changed_keys):
+			nonlocal sequence
+			if not connections:
+				return
+			patch = diff_state(previous_state, next_state, changed_keys)
+			if not patch:
+				return
+			sequence += 1
+			message = ('patch', sequence, patch, action, time.time())
+			for connection in list(connections):
+				send(connection, message)
+		
+		store['subscribe'](on_change, (), with_change=True)
+		
+		def add_replica(connection=None):
+			if not hasattr(getattr(connection, 'send', None), '__call__'):
+				raise Exception('Expected connection to have a send method')
+			connections.append(connection)
+			send(connection, ('snapshot', sequence, store['get_state'](), None, time.time()))
+			return lambda: remove_connection(connection)
+		
+		store_to_return = store.copy()
+		store_to_return['add_replica'] = add_replica
+		return store_to_return
+	return inner
+
+"""
+ * Creates a read-only replica of a store enhanced with `replication`, fed
+ * through `connection`, the other end of the pipe given to `add_replica`.
+ *
+ * The replica has `get_state` and `subscribe`, with the same selectors and
+ * `with_change` argument as a store, and listeners are given the action that
+ * was dispatched to the primary. `lag()` reports the sequence number of the
+ * last update applied, how many updates were applied and how many seconds
+ * passed between the primary sending it and the replica applying it.
+ *
+ * By default a daemon thread applies updates as they arrive and notifies the
+ * listeners from that thread. With `background=False` updates are only applied
+ * when calling `poll(timeout)`, which returns the number of updates applied.
+ *
+ * @param {Connection} connection The receiving end of the replication pipe.
+ * @param {bool} [background] Whether to apply updates from a daemon thread.
+ * @returns {Replica} A read-only store following the primary.
+"""
+def create_replica(connection=None, background=True):
+	if not hasattr(getattr(connection, 'recv', None), '__call__'):
+		raise Exception('Expected connection to have a recv method')
+	
+	replicated_state = None
+	metrics = { 'sequence': None, 'updates': 0, 'seconds': 0.0 }
+	
+	def replica_reducer(state=None, action=None):
+		return replicated_state
+	
+	store = create_store(replica_reducer, thread_safe, production=True)
+	
+	def apply(message):
+		nonlocal replicated_state
+		kind, sequence, payload, action, sent_at = message
+		if kind == 'snapshot':
+			replicated_state = payload
+			action = { 'type': REPLICA_ACTION_TYPES['SNAPSHOT'] }
+		else:
+			replicated_state = apply_patch(replicated_state, payload)
+		store['dispatch'](action)
+		metrics['sequence'] = sequence
+		metrics['updates'] += 1
+		metrics['seconds'] = max(0.0, time.time() - sent_at)
+	
+	def poll(timeout=0):
+		applied = 0
+		while connection.poll(timeout if applied == 0 else 0):
+			try:
+				apply(connection.recv())
+			except EOFError:
+				break
+			applied += 1
+		return applied
+	
+	def receive_forever():
+		while True:
+			try:
+				message = connection.recv()
+			except (EOFError, OSError):
+				return
+			apply(message)
+	
+	def lag():
+		return dict(metrics)
+	
+	def close():
+		connection.close()
+	
+	if background:
+		Thread(target=receive_forever, daemon=True).start()
+	
+	return {
+		'get_state': store['get_state'],
+		'subscribe': store['subscribe'],
+		'poll': poll,
+		'lag': lag,
+		'close': close
+	}
@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import time
+from threading import Condition, Thread
+
+"""
+ * Notification schedulers decide when a store calls its listeners after its
+ * state changed, and are given to `create_store(..., scheduler=...)`.
+ *
+ * A scheduler is a function that receives the store's `notify` function, which
+ * calls every listener, and returns the function the store calls instead of
+ * `notify` after each change. However late a notification is delivered,
+ * listeners read the state the store has at that time, so they always see the
+ * latest state, even if they no longer see every intermediate one.
+"""
+
+"""
+ * Notifies the listeners right after every change, within `dispatch()`. This
+ * is what stores do without a scheduler.
+"""
+def immediate(notify):
+	return notify
+
+"""
+ * Coalesces the notifications of actions dispatched while listeners are being
+ * notified, typically by listeners themselves, into a single extra round of
+ * notifications once the outermost round is done, instead of one nested round
+ * for each of them.
+"""
+def coalesce(notify):
+	notifying = False
+	pending = False
+	
+	def schedule():
+		nonlocal notifying, pending
+		if notifying:
+			pending = True
+			return
+		notifying = True
+		try:
+			pending = True
+			while pending:
+				pending = False
+				notify()
+		finally:
+			notifying = False
+			pending = False
+	return schedule
+
+def notify_on_timer(notify, next_due):
+	"""Returns a scheduler calling `notify` from a daemon thread once the time
+	returned by `next_due(now, due)` has come, where `due` is the time already
+	scheduled or None. The thread is started with the first notification."""
+	condition = Condition()
+	due = None
+	thread = None
+	
+	def run():
+		nonlocal due
+		while True:
+			with condition:
+				while due is None:
+					condition.wait()
+				remaining = due - time.monotonic()
+				if remaining > 0:
+					condition.wait(remaining)
+					continue
+				due = None
+			try:
+				notify()
+			except Exception:
+				logging.exception('A store listener raised an exception on the notification thread')
+	
+	def schedule():
+		nonlocal due, thread
+		with condition:
+			due = next_due(time.monotonic(), due)
+			if thread is None:
+				thread = Thread(target=run, daemon=True)
+				thread.start()
+			condition.notify()
+	return schedule
+
+"""
+ * Creates a scheduler that notifies the listeners, from a timer thread, once
+ * no change happened for `seconds`.
+ *
+ * @param {float} seconds How long the state has to stay unchanged.
+ * @param {float} [max_wait] The longest a notification may be delayed by a
+ * continuous burst of changes, or None to wait for the burst to end.
+ * @returns {Function} A notification scheduler.
+"""
+def debounce(seconds, max_wait=None):
+	def scheduler(notify):
+		first_change = None
+		
+		def next_due(now, due):
+			nonlocal first_change
+			if due is None:
+				first_change = now
+			if max_wait is None:
+				return now + seconds
+			return min(now + seconds, first_change + max_wait)
+		return notify_on_timer(notify, next_due)
+	return scheduler
+
+"""
+ * Creates a scheduler that notifies the listeners, from a timer thread, at
+ * most once every `seconds`: the first change starts a window and the
+ * listeners are notified when it ends.
+ *
+ * @param {float} seconds The length of a window.
+ * @returns {Function} A notification scheduler.
+"""
+def throttle(seconds):
+	def scheduler(notify):
+		return notify_on_timer(notify, lambda now, due: now + seconds if due is None else due)
+	return scheduler
+
+"""
+ * Creates a scheduler that notifies the listeners once on the next iteration
+ * of an asyncio event loop, however many changes happen before it. Changes
+ * made outside of a running loop, when none is given, notify immediately.
+ *
+ * @param {AbstractEventLoop} [loop] The event loop to notify on. Defaults to
+ * the loop running when the change happens.
+ * @returns {Function} A notification scheduler.
+"""
+def next_tick(loop=None):
+	def scheduler(notify):
+		pending = False
+		
+		def run():
+			nonlocal pending
+			pending = False
+			notify()
+		
+		def schedule():
+			nonlocal pending
+			if pending:
+				return
+			target = loop
+			if target is None:
+				try:
+					target = asyncio.get_running_loop()
+				except RuntimeError:
+					notify()
+					return
+			pending = True
+			target.call_soon_threadsafe(run)
+		return schedule
+	return scheduler
@@ -0,0 +1,41 @@
+from threading import RLock
+
+"""
+ * A store enhancer that makes the store safe to use from many threads.
+ *
+ * Everything that writes to the store (`dispatch`, `dispatch_batch`,
+ * `subscribe`, unsubscribing, `replace_reducer`, ...) is serialized through a
+ * single reentrant lock, so actions dispatched from different threads are
+ * reduced one after another and listeners see every state in order. The lock
+ * is reentrant, so listeners may still dispatch from the notifying thread.
+ *
+ * `get_state()` never takes the lock. The store publishes each new state by
+ * rebinding a single reference, so readers always get a complete snapshot;
+ * like the rest of Redux this relies on reducers never mutating state in place.
+ *
+ * @param {Function} create_store The store creator to enhance.
+ * @returns {Function} A store creator whose stores are thread safe.
+"""
+def thread_safe(create_store):
+	def inner(reducer, preloaded_state=None, enhancer=None):
+		store = create_store(reducer, preloaded_state, enhancer)
+		lock = RLock()
+		
+		def serialized(func):
+			def serialized_func(*args, **kwargs):
+				with lock:
+					return func(*args, **kwargs)
+			return serialized_func
+		
+		def subscribe(*args, **kwargs):
+			with lock:
+				unsubscribe = store['subscribe'](*args, **kwargs)
+			return serialized(unsubscribe)
+		
+		store_to_return = store.copy()
+		for key in store:
+			if key != 'get_state' and hasattr(store[key], '__call__'):
+				store_to_return[key] = serialized(store[key])
+		store_to_return['subscribe'] = subscribe
+		return store_to_return
+	return inner
@@ -0,0 +1,193 @@
+import sys
+from collections import deque
+from .patch import diff_state
+from .persistent import PersistentMap, PersistentVector
+
+HISTORY_ACTION_TYPES = {
+	'JUMP': '@@redux/HISTORY_JUMP'
+}
+
+PRIVATE_ACTION_PREFIX = '@@redux/'
+CONTAINER_TYPES = (list, tuple, set, frozenset, PersistentVector)
+
+def group_by_type(action):
+	return action.get('type')
+
+class HistoryEntry(object):
+	"""A state in the undo history, the action that led to it and the estimated
+	bytes it holds on its own."""
+	__slots__ = ('state', 'action', 'size')
+	
+	def __init__(self, state, action, size):
+		self.state = state
+		self.action = action
+		self.size = size
+
+def estimate_size(value, seen):
+	if id(value) in seen:
+		return 0
+	seen.add(id(value))
+	size = sys.getsizeof(value)
+	if isinstance(value, (dict, PersistentMap)):
+		for key, item in value.items():
+			size += estimate_size(key, seen) + estimate_size(item, seen)
+	elif isinstance(value, CONTAINER_TYPES):
+		for item in value:
+			size += estimate_size(item, seen)
+	return size
+
+def estimate_delta_size(previous_state, next_state, changed_keys):
+	"""Estimates the bytes a snapshot does not share with the previous one, from
+	the values replaced or added between them."""
+	seen = set()
+	size = 0
+	for operation in diff_state(previous_state, next_state, changed_keys):
+		if 'value' in operation:
+			size += estimate_size(operation['value'], seen)
+	return size
+
+"""
+ * Creates a store enhancer that keeps an undo history of the state.
+ *
+ * The history is a bounded buffer of the states the store went through, which
+ * share everything they did not change with each other, so an entry only costs
+ * the parts of the state tree its action replaced. Consecutive actions of the
+ * same group, by default the same type, are merged into a single entry, so
+ * undoing a burst of key strokes or drags takes one step.
+ *
+ * The store gets `undo()` and `redo()`, which return whether there was a step
+ * to take, `jump(index)` to move to any entry of the history, and
+ * `get_history()` returning the current `index`, the `actions` that led to each
+ * entry (None for the oldest one) and the estimated `bytes` held. Moving
+ * through the history dispatches a private action, so listeners are notified
+ * as usual. A new action dispatched after undoing drops the entries that could
+ * have been redone. Replacing or injecting reducers clears the history.
+ *
+ * @param {int} [limit] The maximum number of undo steps to keep, or None.
+ * @param {int} [max_bytes] The maximum estimated bytes the history may hold on
+ * top of the current state, or None. The oldest entries are dropped first.
+ * @param {Function} [group_by] Returns the group of an action. Consecutive
+ * actions of the same group, other than None, share one entry. Pass None to
+ * keep an entry for every action.
+ * @returns {Function} A store enhancer.
+"""
+def undo_history(limit=100, max_bytes=None, group_by=group_by_type):
+	if limit is not None and limit < 1:
+		raise Exception('Expected limit to be at least 1 or None, instead received {}.'.format(limit))
+	if max_bytes is not None and max_bytes < 0:
+		raise Exception('Expected max_bytes to be at least 0 or None, instead received {}.'.format(max_bytes))
+	
+	def enhancer(create_store):
+		def inner(reducer, preloaded_state=None, enhancer=None):
+			entries = deque()
+			index = 0
+			total_size = 0
+			merge_group = None
+			
+			def with_history(reducer):
+				def history_reducer(state, action):
+					if action.get('type') == HISTORY_ACTION_TYPES['JUMP']:
+						return entries[action['index']].state
+					return reducer(state, action)
+				history_reducer.__wrapped__ = reducer
+				history_reducer.rewrap = with_history
+				return history_reducer
+			
+			store = create_store(with_history(reducer), preloaded_state, enhancer)
+			entries.append(HistoryEntry(store['get_state'](), None, 0))
+			
+			def clear_history(state):
+				nonlocal index, total_size, merge_group
+				entries.clear()
+				entries.append(HistoryEntry(state, None, 0))
+				index = 0
+				total_size = 0
+				merge_group = None
+			
+			def drop_oldest():
+				nonlocal index, total_size
+				entries.popleft()
+				total_size -= entries[0].size
+				entries[0].size = 0
+				entries[0].action = None
+				index -= 1
+			
+			def record(previous_state, next_state, action, changed_keys):
+				nonlocal index, total_size, merge_group
+				action_type = action.get('type') if type(action) == dict else None
+				if action_type == HISTORY_ACTION_TYPES['JUMP']:
+					return
+				if isinstance(action_type, str) and action_type.startswith(PRIVATE_ACTION_PREFIX):
+					clear_history(next_state)
+					return
+				while len(entries) > index + 1:
+					total_size -= entries.pop().size
+				
+				group = group_by(action) if group_by is not None else None
+				last = entries[-1]
+				if group is not None and group == merge_group and index > 0:
+					# The merged entry replaces the last one, measured from the entry before it
+					total_size -= last.size
+					last.state = next_state
+					last.action = action
+					if max_bytes is not None:
+						last.size = estimate_delta_size(entries[-2].state, next_state, None)
+					total_size += last.size
+				else:
+					size = estimate_delta_size(last.state, next_state, changed_keys) if max_bytes is not None else 0
+					entries.append(HistoryEntry(next_state, action, size))
+					total_size += size
+					index += 1
+				merge_group = group
+				
+				while limit is not None and len(entries) > limit + 1:
+					drop_oldest()
+				while max_bytes is not None and total_size > max_bytes and len(entries) > 1:
+					drop_oldest()
+			
+			store['subscribe'](record, (), with_change=True)
+			
+			def jump(to_index=None):
+				nonlocal index, merge_group
+				if type(to_index) != int or not 0 <= to_index < len(entries):
+					raise Exception('Expected an index of the history between 0 and {}, instead received {}.'.format(len(entries) - 1, to_index))
+				if to_index == index:
+					return
+				# Set first, so that actions dispatched by listeners are recorded after it
+				index = to_index
+				merge_group = None
+				store['dispatch']({ 'type': HISTORY_ACTION_TYPES['JUMP'], 'index': to_index })
+			
+			def undo():
+				if index == 0:
+					return False
+				jump(index - 1)
+				return True
+			
+			def redo():
+				if index == len(entries) - 1:
+					return False
+				jump(index + 1)
+				return True
+			
+			def get_history():
+				return {
+					'index': index,
+					'actions': tuple(entry.action for entry in entries),
+					'bytes': total_size
+				}
+			
+			def replace_reducer(next_reducer=None):
+				if not hasattr(next_reducer, '__call__'):
+					raise Exception('Expected next_reducer to be a function')
+				store['replace_reducer'](with_history(next_reducer))
+			
+			store_to_return = store.copy()
+			store_to_return['replace_reducer'] = replace_reducer
+			store_to_return['undo'] = undo
+			store_to_return['redo'] = redo
+			store_to_return['jump'] = jump
+			store_to_return['get_history'] = get_history
+			return store_to_return
+		return inner
+	return enhancer
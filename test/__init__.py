@@ -1,7 +1,23 @@
+from .test_apply_async_middleware import TestApplyAsyncMiddleware
 from .test_apply_middleware import TestApplyMiddleware
 from .test_bind_action_creators import TestBindActionCreators
+from .test_coalescing_middleware import TestCoalescingMiddleware
+from .test_columnar import TestColumnar
 from .test_combine_reducers import TestCombineReducers
 from .test_compose import TestComposeMethod
+from .test_create_async_store import TestCreateAsyncStore
+from .test_create_entity_adapter import TestCreateEntityAdapter
+from .test_create_selector import TestCreateSelector
 from .test_create_store import TestCreateStoreMethod
+from .test_dispatch_queue import TestDispatchQueue
+from .test_journal import TestJournal
+from .test_patch import TestPatch
+from .test_persistent import TestPersistentMap, TestPersistentVector, TestPersistentState
+from .test_production_mode import TestProductionMode
+from .test_profiler import TestProfiler
+from .test_replica import TestReplica
+from .test_schedulers import TestSchedulers
+from .test_thread_safe import TestThreadSafe
+from .test_undo_history import TestUndoHistory
 
-__all__ = ['TestApplyMiddleware', 'TestBindActionCreators', 'TestCombineReducers', 'TestComposeMethod', 'TestCreateStoreMethod']
\ No newline at end of file
+__all__ = ['TestApplyAsyncMiddleware', 'TestApplyMiddleware', 'TestBindActionCreators', 'TestCoalescingMiddleware', 'TestColumnar', 'TestCombineReducers', 'TestComposeMethod', 'TestCreateAsyncStore', 'TestCreateEntityAdapter', 'TestCreateSelector', 'TestCreateStoreMethod', 'TestDispatchQueue', 'TestJournal', 'TestPatch', 'TestPersistentMap', 'TestPersistentVector', 'TestPersistentState', 'TestProductionMode', 'TestProfiler', 'TestReplica', 'TestSchedulers', 'TestThreadSafe', 'TestUndoHistory']
\ No newline at end of file
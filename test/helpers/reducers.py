@@ -28,6 +28,13 @@ def todos_reverse(state=None, action={}):
 	else:
 		return state
 
+def counter(state=None, action={}):
+	if state is None:
+		state = 0
+	if action.get('type') == 'increment':
+		return state + 1
+	return state
+
 def dispatch_in_middle_of_reducer(state=None, action={}):
 	if state is None:
 		state = []
@@ -48,6 +55,7 @@ def error_throwing_reducer(state=None, action={}):
 reducers = {
 	'todos': todos,
 	'todos_reverse': todos_reverse,
+	'counter': counter,
 	'dispatch_in_middle_of_reducer': dispatch_in_middle_of_reducer,
 	'error_throwing_reducer': error_throwing_reducer
 }
\ No newline at end of file
@@ -0,0 +1,112 @@
+import asyncio
+import unittest
+import unittest.mock as mock
+from python_redux import create_async_store, apply_async_middleware, async_thunk
+from test.helpers.reducers import reducers
+from test.helpers.action_creators import add_todo
+from test.test_create_async_store import run
+
+class TestApplyAsyncMiddleware(unittest.TestCase):
+	def test_wraps_dispatch_method_with_async_middleware_once(self):
+		spy = mock.MagicMock()
+		def test(store):
+			spy(store)
+			def apply(next):
+				async def apply_action(action):
+					await asyncio.sleep(0)
+					return await next(action)
+				return apply_action
+			return apply
+		
+		store = create_async_store(reducers['todos'], apply_async_middleware(test, async_thunk))
+		async def dispatch_all():
+			await store['dispatch'](add_todo('Use Redux'))
+			await store['dispatch'](add_todo('Flux FTW!'))
+		run(dispatch_all())
+		
+		self.assertEqual(spy.call_count, 1)
+		args, kwargs = spy.call_args
+		self.assertEqual(sorted(list(args[0].keys())), sorted(['get_state', 'dispatch']))
+		self.assertEqual(store['get_state'](), [dict(id=1, text='Use Redux'), dict(id=2, text='Flux FTW!')])
+	
+	def test_runs_middleware_in_composition_order(self):
+		order = []
+		def tag(name):
+			def middleware(store):
+				def apply(next):
+					async def apply_action(action):
+						order.append(name)
+						return await next(action)
+					return apply_action
+				return apply
+			return middleware
+		
+		store = create_async_store(reducers['todos'], apply_async_middleware(tag('a'), tag('b'), tag('c')))
+		run(store['dispatch'](add_todo('Hello')))
+		self.assertEqual(order, ['a', 'b', 'c'])
+	
+	def test_awaits_async_thunks(self):
+		store = create_async_store(reducers['todos'], apply_async_middleware(async_thunk))
+		async def fetch_todo(dispatch, get_state):
+			await asyncio.sleep(0)
+			await dispatch(add_todo('Fetched'))
+			return len(get_state())
+		
+		self.assertEqual(run(store['dispatch'](fetch_todo)), 1)
+		self.assertEqual(store['get_state'](), [dict(id=1, text='Fetched')])
+	
+	def test_passes_each_action_of_a_batch_through_middleware(self):
+		seen = []
+		def spy(store):
+			def apply(next):
+				async def apply_action(action):
+					seen.append(action)
+					return await next(action)
+				return apply_action
+			return apply
+		
+		store = create_async_store(reducers['todos'], apply_async_middleware(spy))
+		run(store['dispatch_batch']([add_todo('Hello'), add_todo('World')]))
+		self.assertEqual(len(seen), 2)
+		self.assertEqual(len(store['get_state']()), 2)
+	
+	def test_keeps_overlapping_batches_apart(self):
+		def slow_text(store):
+			def apply(next):
+				async def apply_action(action):
+					await asyncio.sleep(0.01 if action.get('text') == 'slow' else 0)
+					return await next(action)
+				return apply_action
+			return apply
+		
+		store = create_async_store(reducers['todos'], apply_async_middleware(slow_text))
+		batches = []
+		store['subscribe'](lambda: batches.append([todo['text'] for todo in store['get_state']()]))
+		async def dispatch_both():
+			await asyncio.gather(
+				store['dispatch_batch']([add_todo('fast'), add_todo('slow')]),
+				store['dispatch_batch']([add_todo('a'), add_todo('b')])
+			)
+			await asyncio.sleep(0)
+		run(dispatch_both())
+		self.assertEqual(batches, [['a', 'b'], ['a', 'b', 'fast', 'slow']])
+	
+	def test_dispatches_actions_passed_on_after_their_batch_alone(self):
+		held = []
+		def hold(store):
+			def apply(next):
+				async def apply_action(action):
+					held.append((next, action))
+				return apply_action
+			return apply
+		
+		store = create_async_store(reducers['todos'], apply_async_middleware(hold))
+		async def dispatch_later():
+			await store['dispatch_batch']([add_todo('Hello')])
+			for next, action in held:
+				await next(action)
+		run(dispatch_later())
+		self.assertEqual(store['get_state'](), [dict(id=1, text='Hello')])
+
+if __name__ == '__main__':
+	unittest.main()
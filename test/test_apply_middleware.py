@@ -1,8 +1,8 @@
 import unittest
 import unittest.mock as mock
-from python_redux import create_store, apply_middleware
+from python_redux import create_store, apply_middleware, handles
 from test.helpers.reducers import reducers
-from test.helpers.action_creators import add_todo, add_todo_if_empty
+from test.helpers.action_creators import add_todo, add_todo_if_empty, unknown_action
 from test.helpers.middleware import thunk
 
 class TestApplyMiddleware(unittest.TestCase):
@@ -24,6 +24,58 @@ class TestApplyMiddleware(unittest.TestCase):
 		self.assertEqual(sorted(list(args[0].keys())), sorted(['get_state', 'dispatch']))
 		
 		self.assertEqual(store['get_state'](), [dict(id=1, text='Use Redux'), dict(id=2, text='Flux FTW!')])
+
+	def test_passes_each_action_of_a_batch_through_middleware(self):
+		seen = []
+		def spy(store):
+			def apply(next):
+				def apply_action(action):
+					seen.append(action)
+					return next(action)
+				return apply_action
+			return apply
+		
+		store = apply_middleware(spy, thunk)(create_store)(reducers['todos'])
+		listener = mock.MagicMock()
+		store['subscribe'](listener)
+		
+		store['dispatch_batch']([add_todo('Use Redux'), add_todo_if_empty('Ignored'), add_todo('Flux FTW!')])
+		self.assertEqual(len(seen), 3)
+		self.assertEqual(len(listener.call_args_list), 1)
+		self.assertEqual(store['get_state'](), [dict(id=1, text='Use Redux'), dict(id=2, text='Flux FTW!')])
+	
+	def test_skips_middleware_for_action_types_it_does_not_handle(self):
+		seen = []
+		def spy(name):
+			def middleware(store):
+				return lambda next: lambda action: [seen.append(name), next(action)][1]
+			return middleware
+		
+		store = apply_middleware(
+			handles('ADD_TODO')(spy('add_todo')),
+			spy('every'),
+			handles('UNKNOWN_ACTION', 'ADD_TODO')(spy('unknown')),
+			thunk
+		)(create_store)(reducers['todos'])
+		
+		store['dispatch'](add_todo('Use Redux'))
+		self.assertEqual(seen, ['add_todo', 'every', 'unknown'])
+		
+		del seen[:]
+		store['dispatch'](unknown_action())
+		store['dispatch'](add_todo_if_empty('Ignored'))
+		store['dispatch']({ 'type': 'OTHER' })
+		self.assertEqual(seen, ['every', 'unknown', 'every', 'every'])
+		
+		del seen[:]
+		store['dispatch_batch']([add_todo('Flux FTW!'), unknown_action()])
+		self.assertEqual(seen, ['add_todo', 'every', 'unknown', 'every', 'unknown'])
+		self.assertEqual(store['get_state'](), [dict(id=1, text='Use Redux'), dict(id=2, text='Flux FTW!')])
+	
+	def test_returns_the_store_unchanged_without_middleware(self):
+		store = create_store(reducers['todos'])
+		enhanced = apply_middleware()(lambda reducer, preloaded_state=None, enhancer=None: store)(reducers['todos'])
+		self.assertIs(enhanced['dispatch'], store['dispatch'])
 		
 if __name__ == '__main__':
 	unittest.main()
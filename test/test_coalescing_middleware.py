@@ -0,0 +1,120 @@
+import threading
+import unittest
+from python_redux import apply_middleware, coalescing_middleware, compose, create_store, flush_coalesced, thread_safe
+from test.helpers.reducers import reducers
+from test.helpers.action_creators import add_todo
+
+def move(id, x):
+	return { 'type': 'MOVE', 'id': id, 'x': x }
+
+def positions(state=None, action=None):
+	if state is None:
+		state = {}
+	if action.get('type') == 'MOVE':
+		return dict(state, **{ str(action['id']): action['x'] })
+	return state
+
+class TestCoalescingMiddleware(unittest.TestCase):
+	def create(self, reducer=positions, before=(), **options):
+		reduced = []
+		
+		def recording_reducer(state=None, action=None):
+			if action.get('type') == 'MOVE':
+				reduced.append(action)
+			return reducer(state, action)
+		middleware = coalescing_middleware(key=lambda action: action.get('id'), **options)
+		return create_store(recording_reducer, apply_middleware(*before, middleware)), reduced
+	
+	def test_forwards_the_last_action_per_key_on_flush(self):
+		store, reduced = self.create()
+		for x in range(10):
+			store['dispatch'](move(1, x))
+			store['dispatch'](move(2, -x))
+		self.assertEqual(reduced, [])
+		self.assertEqual(store['dispatch'](flush_coalesced()), [move(1, 9), move(2, -9)])
+		self.assertEqual(reduced, [move(1, 9), move(2, -9)])
+		self.assertEqual(store['get_state'](), { '1': 9, '2': -9 })
+		self.assertEqual(store['dispatch'](flush_coalesced()), [])
+	
+	def test_earlier_middleware_only_sees_the_original_actions(self):
+		seen = []
+		def recorder(store):
+			return lambda next: lambda action: seen.append(action['type']) or next(action)
+		store, reduced = self.create(before=[recorder], merge=lambda buffered, action: dict(action, x=buffered['x'] + action['x']))
+		store['dispatch'](move(1, 1))
+		store['dispatch'](move(1, 2))
+		store['dispatch'](flush_coalesced())
+		self.assertEqual(seen, ['MOVE', 'MOVE', '@@redux/COALESCE_FLUSH'])
+		self.assertEqual(reduced, [move(1, 3)])
+	
+	def test_flushes_every_coalescing_middleware_of_the_chain(self):
+		def count(state=None, action=None):
+			if state is None:
+				state = {}
+			if action.get('type') in ('move', 'tick'):
+				return dict(state, **{ action['type']: state.get(action['type'], 0) + 1 })
+			return state
+		moves = coalescing_middleware(key=lambda action: 1 if action.get('type') == 'move' else None)
+		ticks = coalescing_middleware(key=lambda action: 1 if action.get('type') == 'tick' else None)
+		store = create_store(count, apply_middleware(moves, ticks))
+		store['dispatch']({ 'type': 'move' })
+		store['dispatch']({ 'type': 'tick' })
+		self.assertEqual(store['get_state'](), {})
+		store['dispatch'](flush_coalesced())
+		self.assertEqual(store['get_state'](), { 'move': 1, 'tick': 1 })
+	
+	def test_merges_with_the_merge_function(self):
+		merge = lambda buffered, action: dict(action, x=buffered['x'] + action['x'])
+		store, reduced = self.create(merge=merge)
+		for x in [1, 2, 3]:
+			store['dispatch'](move(1, x))
+		store['dispatch'](flush_coalesced())
+		self.assertEqual(store['get_state'](), { '1': 6 })
+		self.assertEqual(len(reduced), 1)
+	
+	def test_passes_actions_without_a_key_through(self):
+		store, reduced = self.create(reducers['todos'])
+		store['dispatch'](add_todo('Hello'))
+		self.assertEqual(store['get_state'](), [dict(id=1, text='Hello')])
+	
+	def test_flushes_after_the_window(self):
+		store = create_store(positions, compose(apply_middleware(coalescing_middleware(key=lambda action: action.get('id'), window=0.02)), thread_safe))
+		changed = threading.Event()
+		store['subscribe'](changed.set)
+		for window in range(2):
+			changed.clear()
+			for x in range(5):
+				store['dispatch'](move(window, x))
+			self.assertNotIn(str(window), store['get_state']())
+			self.assertTrue(changed.wait(2))
+			self.assertEqual(store['get_state']()[str(window)], 4)
+		self.assertEqual(store['dispatch'](flush_coalesced()), [])
+	
+	def test_only_sees_the_given_action_types(self):
+		middleware = coalescing_middleware(key=lambda action: action.get('id'), action_types=['MOVE'])
+		self.assertEqual(middleware.action_types, frozenset(['MOVE', '@@redux/COALESCE_FLUSH']))
+		store = create_store(positions, apply_middleware(middleware))
+		store['dispatch'](move(1, 1))
+		store['dispatch']({ 'type': 'RESIZE', 'id': 1 })
+		self.assertEqual(store['get_state'](), {})
+		store['dispatch'](flush_coalesced())
+		self.assertEqual(store['get_state'](), { '1': 1 })
+	
+	def test_buffers_actions_dispatched_in_a_batch(self):
+		store, reduced = self.create()
+		store['dispatch_batch']([move(1, 1), move(1, 2)])
+		self.assertEqual(reduced, [])
+		store['dispatch_batch']([move(1, 3), flush_coalesced()])
+		self.assertEqual(reduced, [move(1, 3)])
+		
+		store['dispatch_batch']([move(2, 1)])
+		store['dispatch'](flush_coalesced())
+		self.assertEqual(reduced, [move(1, 3), move(2, 1)])
+		self.assertEqual(store['get_state'](), { '1': 3, '2': 1 })
+	
+	def test_throws_if_key_is_not_a_function(self):
+		with self.assertRaises(Exception):
+			coalescing_middleware()
+
+if __name__ == '__main__':
+	unittest.main()
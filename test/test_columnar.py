@@ -0,0 +1,65 @@
+import unittest
+from python_redux import Table, column_add, column_append, column_set, combine_reducers, create_store, table_batch, table_reducer
+from python_redux.columnar import numpy
+
+def create_accounts():
+	return table_reducer(Table(balance=numpy.zeros(4, dtype=numpy.int64), owner=numpy.arange(4)), {
+		'DEPOSIT': column_add('balance', index='account', value='amount'),
+		'SET_OWNER': column_set('owner', index='account', value='owner'),
+		'OPEN': column_append('account')
+	})
+
+@unittest.skipIf(numpy is None, 'numpy is not installed')
+class TestColumnar(unittest.TestCase):
+	def test_tables_are_immutable_and_share_unchanged_columns(self):
+		table = Table.from_rows([dict(x=1, y=2.5), dict(x=3, y=4.5)], dict(x=numpy.int64, y=numpy.float64))
+		self.assertEqual(len(table), 2)
+		self.assertEqual(table.row(1), dict(x=3, y=4.5))
+		with self.assertRaises(ValueError):
+			table['x'][0] = 10
+		
+		updated = table.set_columns(x=[5, 6])
+		self.assertIs(updated['y'], table['y'])
+		self.assertEqual(list(table['x']), [1, 3])
+		self.assertEqual(list(updated.rows()), [dict(x=5, y=2.5), dict(x=6, y=4.5)])
+		with self.assertRaises(Exception):
+			table.set_columns(x=[1])
+		with self.assertRaises(Exception):
+			Table(x=[1, 2], y=[1])
+	
+	def test_reduces_single_actions_as_a_combine_reducers_slice(self):
+		store = create_store(combine_reducers(dict(accounts=create_accounts())))
+		accounts = store['get_state']()['accounts']
+		
+		store['dispatch']({ 'type': 'UNRELATED' })
+		self.assertIs(store['get_state']()['accounts'], accounts)
+		
+		store['dispatch']({ 'type': 'DEPOSIT', 'account': 2, 'amount': 10 })
+		state = store['get_state']()
+		self.assertIsNot(state['accounts'], accounts)
+		self.assertIs(state['accounts']['owner'], accounts['owner'])
+		self.assertEqual(list(state['accounts']['balance']), [0, 0, 10, 0])
+	
+	def test_applies_batches_with_vectorized_operations(self):
+		store = create_store(combine_reducers(dict(accounts=create_accounts())))
+		store['dispatch'](table_batch([
+			{ 'type': 'DEPOSIT', 'account': 1, 'amount': 5 },
+			{ 'type': 'DEPOSIT', 'account': 1, 'amount': 7 },
+			{ 'type': 'SET_OWNER', 'account': 0, 'owner': 8 },
+			{ 'type': 'SET_OWNER', 'account': 0, 'owner': 9 },
+			{ 'type': 'IGNORED' },
+			{ 'type': 'OPEN', 'account': dict(balance=3, owner=4) },
+			{ 'type': 'DEPOSIT', 'account': 4, 'amount': 1 }
+		]))
+		accounts = store['get_state']()['accounts']
+		self.assertEqual(len(accounts), 5)
+		self.assertEqual(list(accounts['balance']), [0, 12, 0, 0, 4])
+		self.assertEqual(list(accounts['owner']), [9, 1, 2, 3, 4])
+	
+	def test_declares_handled_action_types(self):
+		self.assertEqual(create_accounts().action_types, frozenset(['DEPOSIT', 'SET_OWNER', 'OPEN', 'TABLE_BATCH']))
+		with self.assertRaises(Exception):
+			table_reducer({}, {})
+
+if __name__ == '__main__':
+	unittest.main()
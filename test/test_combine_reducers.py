@@ -1,12 +1,21 @@
 import unittest
 import unittest.mock as mock
 import re
-from python_redux import combine_reducers, create_store
+import operator
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from python_redux import combine_reducers, create_store, handles, parallel, set_sanity_check_default
 
 ACTION_TYPES = {
 	'INIT': '@@redux/INIT'
 }
 
+@parallel
+def parallel_counter(state=None, action=None):
+	if state is None:
+		return 0
+	return state + 1 if action.get('type') == 'increment' else state
+
 class TestCombineReducers(unittest.TestCase):
 	def test_returns_reducer_that_maps_state_keys_to_given_reducers(self):
 		def counter(state=None, action={}):
@@ -234,7 +243,214 @@ class TestCombineReducers(unittest.TestCase):
 		reducer(dict(baz=5, **state), {})
 		reducer(dict(baz=5, **state), {})
 		self.assertEqual(len(logging.call_args_list), 2)		
-				
+
+	def test_only_calls_reducers_that_handle_the_action_type(self):
+		calls = []
+		@handles('increment')
+		def counter(state=None, action=None):
+			calls.append('counter')
+			if state is None:
+				state = 0
+			if action.get('type') == 'increment':
+				return state + 1
+			return state
+		
+		@handles('push')
+		def stack(state=None, action=None):
+			calls.append('stack')
+			if state is None:
+				state = []
+			if action.get('type') == 'push':
+				return list(state) + [action.get('value')]
+			return state
+		
+		def log(state=None, action=None):
+			calls.append('log')
+			if state is None:
+				state = 0
+			return state + 1
+		
+		store = create_store(combine_reducers(dict(counter=counter, stack=stack, log=log)))
+		del calls[:]
+		store['dispatch']({ 'type': 'increment' })
+		self.assertEqual(calls, ['counter', 'log'])
+		
+		del calls[:]
+		store['dispatch']({ 'type': 'push', 'value': 'a' })
+		self.assertEqual(calls, ['stack', 'log'])
+		
+		del calls[:]
+		store['dispatch']({ 'type': 'unknown' })
+		self.assertEqual(calls, ['log'])
+		self.assertEqual(store['get_state'](), { 'counter': 1, 'stack': ['a'], 'log': 4 })
+	
+	def test_routed_reducers_receive_private_actions_and_fill_missing_keys(self):
+		@handles('increment')
+		def counter(state=None, action=None):
+			if state is None:
+				state = 0
+			if action.get('type') == 'increment':
+				return state + 1
+			return state
+		
+		@handles('push')
+		def stack(state=None, action=None):
+			if state is None:
+				state = []
+			if action.get('type') == 'push':
+				return list(state) + [action.get('value')]
+			return state
+		
+		reducer = combine_reducers(dict(counter=counter, stack=stack))
+		self.assertEqual(reducer(None, { 'type': ACTION_TYPES['INIT'] }), { 'counter': 0, 'stack': [] })
+		self.assertEqual(reducer({}, { 'type': 'increment' }), { 'counter': 1, 'stack': [] })
+	
+	def test_routed_reducer_maintains_referential_equality(self):
+		@handles('increment')
+		def counter(state=None, action=None):
+			if state is None:
+				state = 0
+			if action.get('type') == 'increment':
+				return state + 1
+			return state
+		
+		reducer = combine_reducers(dict(counter=counter))
+		initial_state = reducer(None, { 'type': ACTION_TYPES['INIT'] })
+		self.assertTrue(reducer(initial_state, { 'type': 'FOO' }) is initial_state)
+		self.assertFalse(reducer(initial_state, { 'type': 'increment' }) is initial_state)
+	
+	def test_nested_combination_exposes_handled_action_types(self):
+		@handles('a')
+		def a(state=None, action=None):
+			return 0 if state is None else state
+		@handles('b')
+		def b(state=None, action=None):
+			return 0 if state is None else state
+		
+		self.assertEqual(combine_reducers(dict(a=a, b=b)).action_types, frozenset(['a', 'b']))
+		self.assertFalse(hasattr(combine_reducers(dict(a=a, c=lambda state, action: state or 0)), 'action_types'))
+
+	def test_detects_changes_by_identity_by_default(self):
+		def copying(state=None, action=None):
+			return [] if state is None else list(state)
+		
+		reducer = combine_reducers({ 'copying': copying })
+		initial_state = reducer(None, { 'type': ACTION_TYPES['INIT'] })
+		next_state = reducer(initial_state, { 'type': 'FOO' })
+		self.assertFalse(next_state is initial_state)
+		self.assertEqual(next_state, initial_state)
+	
+	def test_accepts_a_custom_equality_comparator(self):
+		def copying(state=None, action=None):
+			return [] if state is None else list(state)
+		
+		reducer = combine_reducers({ 'copying': copying }, is_equal=operator.eq)
+		initial_state = reducer(None, { 'type': ACTION_TYPES['INIT'] })
+		self.assertTrue(reducer(initial_state, { 'type': 'FOO' }) is initial_state)
+
+	def test_reports_changed_keys(self):
+		def counter(state=None, action=None):
+			if state is None:
+				state = 0
+			if action.get('type') == 'increment':
+				return state + 1
+			return state
+		
+		@handles('push')
+		def stack(state=None, action=None):
+			if state is None:
+				state = []
+			if action.get('type') == 'push':
+				return list(state) + [action.get('value')]
+			return state
+		
+		reducer = combine_reducers(dict(counter=counter, stack=stack))
+		self.assertEqual(reducer.last_change, None)
+		s1 = reducer(None, { 'type': ACTION_TYPES['INIT'] })
+		s2 = reducer(s1, { 'type': 'increment' })
+		self.assertEqual(reducer.last_change, (s1, s2, frozenset(['counter'])))
+		s3 = reducer(s2, { 'type': 'push', 'value': 'a' })
+		self.assertEqual(reducer.last_change, (s2, s3, frozenset(['stack'])))
+	
+	def test_defers_sanity_check_to_first_call_when_lazy(self):
+		calls = []
+		def counter(state=None, action=None):
+			calls.append(action.get('type'))
+			return state
+		
+		reducer = combine_reducers({ 'counter': counter }, sanity_check='lazy')
+		self.assertEqual(calls, [])
+		with self.assertRaises(Exception) as e:
+			reducer({})
+		self.assertTrue('"counter"' in str(e.exception) and 'initialization' in str(e.exception))
+		self.assertEqual(calls, [ACTION_TYPES['INIT']])
+	
+	def test_checks_each_reducer_function_once_per_process(self):
+		calls = []
+		def counter(state=None, action=None):
+			calls.append(action.get('type'))
+			return 0 if state is None else state
+		
+		combine_reducers({ 'a': counter }, sanity_check='once')
+		self.assertEqual(len(calls), 2)
+		reducer = combine_reducers({ 'a': counter, 'b': counter }, sanity_check='once')
+		self.assertEqual(len(calls), 2)
+		
+		combine_reducers({ 'a': counter })
+		self.assertEqual(len(calls), 4)
+	
+	def test_skips_sanity_check_when_off(self):
+		def counter(state=None, action=None):
+			return state
+		
+		previous = set_sanity_check_default('off')
+		try:
+			reducer = combine_reducers({ 'counter': counter })
+		finally:
+			set_sanity_check_default(previous)
+		self.assertEqual(reducer.options['sanity_check'], 'off')
+		with self.assertRaises(Exception) as e:
+			reducer({}, { 'type': 'increment' })
+		self.assertTrue('"counter" returned None' in str(e.exception))
+		
+		with self.assertRaises(Exception):
+			combine_reducers({ 'counter': counter }, sanity_check='sometimes')
+	
+	def test_runs_parallel_slices_on_the_executor(self):
+		threads = {}
+		def tracked(key, is_parallel):
+			def reducer(state=None, action=None):
+				threads[key] = threading.current_thread()
+				if action.get('type') == 'fail_' + key:
+					return None
+				return (state or 0) + 1
+			return parallel(reducer) if is_parallel else reducer
+		
+		with ThreadPoolExecutor(2) as executor:
+			reducer = combine_reducers(dict(
+				a=tracked('a', True),
+				b=tracked('b', False),
+				c=tracked('c', True)
+			), executor=executor)
+			state = reducer(None, { 'type': 'increment' })
+			self.assertEqual(list(state.keys()), ['a', 'b', 'c'])
+			self.assertEqual(state, dict(a=1, b=1, c=1))
+			self.assertIs(threads['b'], threading.current_thread())
+			self.assertIsNot(threads['a'], threading.current_thread())
+			self.assertIsNot(threads['c'], threading.current_thread())
+			self.assertEqual(reducer.last_change[2], frozenset(['a', 'b', 'c']))
+			
+			with self.assertRaises(Exception) as e:
+				reducer(state, { 'type': 'fail_c' })
+			self.assertTrue('reducer "c" returned None' in str(e.exception))
+	
+	def test_runs_parallel_slices_on_a_process_pool(self):
+		with ProcessPoolExecutor(1) as executor:
+			reducer = combine_reducers(dict(a=parallel_counter, b=parallel_counter), executor=executor)
+			state = reducer(None, { 'type': ACTION_TYPES['INIT'] })
+			self.assertEqual(reducer(state, { 'type': 'increment' }), dict(a=1, b=1))
+			self.assertIs(reducer(state, { 'type': 'unknown' }), state)
+
 if __name__ == '__main__':
 	unittest.main()
 				
@@ -0,0 +1,72 @@
+import asyncio
+import unittest
+import unittest.mock as mock
+from python_redux import create_async_store, combine_reducers
+from test.helpers.reducers import reducers
+from test.helpers.action_creators import add_todo, unknown_action
+
+def run(coroutine):
+	loop = asyncio.new_event_loop()
+	try:
+		return loop.run_until_complete(coroutine)
+	finally:
+		loop.close()
+
+class TestCreateAsyncStore(unittest.TestCase):
+	def test_exposes_public_API(self):
+		store = create_async_store(combine_reducers(reducers))
+		self.assertEqual(sorted(store.keys()), ['dispatch', 'dispatch_batch', 'get_state', 'inject_reducer', 'remove_reducer', 'replace_reducer', 'subscribe'])
+	
+	def test_dispatch_is_awaitable(self):
+		store = create_async_store(reducers['todos'])
+		async def test():
+			action = await store['dispatch'](add_todo('Hello'))
+			self.assertEqual(action, add_todo('Hello'))
+			await store['dispatch_batch']([add_todo('World'), unknown_action()])
+		run(test())
+		self.assertEqual(store['get_state'](), [dict(id=1, text='Hello'), dict(id=2, text='World')])
+	
+	def test_schedules_listeners_on_the_loop(self):
+		store = create_async_store(reducers['todos'])
+		listener = mock.MagicMock()
+		seen = []
+		async def async_listener(previous_state, next_state, action, changed_keys):
+			seen.append(next_state)
+		store['subscribe'](listener)
+		store['subscribe'](async_listener, with_change=True)
+		
+		async def test():
+			await store['dispatch'](add_todo('Hello'))
+			self.assertEqual(len(listener.call_args_list), 0)
+			await asyncio.sleep(0)
+			self.assertEqual(len(listener.call_args_list), 1)
+			self.assertEqual(seen, [[dict(id=1, text='Hello')]])
+		run(test())
+	
+	def test_replace_reducer_is_awaitable(self):
+		store = create_async_store(reducers['todos'])
+		async def test():
+			await store['dispatch'](add_todo('Hello'))
+			await store['replace_reducer'](reducers['todos_reverse'])
+			await store['dispatch'](add_todo('World'))
+		run(test())
+		self.assertEqual(store['get_state'](), [dict(id=2, text='World'), dict(id=1, text='Hello')])
+	
+	def test_throws_if_listener_is_not_a_function(self):
+		store = create_async_store(reducers['todos'])
+		with self.assertRaises(Exception):
+			store['subscribe']()
+		with self.assertRaises(Exception):
+			store['subscribe']('')
+	
+	def test_accepts_enhancer_as_second_argument(self):
+		def spy_enhancer(create_async_store):
+			def enhancer(*args):
+				self.assertEqual(args, (reducers['todos'], None))
+				return create_async_store(*args)
+			return enhancer
+		store = create_async_store(reducers['todos'], spy_enhancer)
+		self.assertEqual(store['get_state'](), [])
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,134 @@
+import pickle
+import unittest
+from python_redux import combine_reducers, create_entity_adapter, create_store
+
+def todo(id, text, owner='ann'):
+	return dict(id=id, text=text, owner=owner)
+
+class TestCreateEntityAdapter(unittest.TestCase):
+	def test_keeps_normalized_ids_and_entities(self):
+		adapter = create_entity_adapter()
+		state = adapter['get_initial_state']()
+		self.assertEqual(dict(state), { 'ids': (), 'entities': {} })
+		
+		state = adapter['add_many'](state, [todo(1, 'a'), todo(2, 'b'), todo(3, 'c')])
+		self.assertEqual(state['ids'], (1, 2, 3))
+		self.assertEqual(adapter['select_by_id'](state, 2), todo(2, 'b'))
+		self.assertEqual(adapter['select_total'](state), 3)
+		
+		state = adapter['remove_one'](state, 2)
+		self.assertEqual(state['ids'], (1, 3))
+		state = adapter['add_one'](state, todo(4, 'd'))
+		state = adapter['remove_many'](state, [1, 4])
+		self.assertEqual(state['ids'], (3,))
+		state = adapter['add_one'](state, todo(5, 'e'))
+		self.assertEqual(adapter['select_all'](state), [todo(3, 'c'), todo(5, 'e')])
+		self.assertEqual(adapter['remove_all'](state)['ids'], ())
+	
+	def test_returns_the_same_state_when_nothing_changed(self):
+		adapter = create_entity_adapter()
+		state = adapter['get_initial_state']([todo(1, 'a')])
+		self.assertIs(adapter['add_one'](state, todo(1, 'changed')), state)
+		self.assertIs(adapter['update_one'](state, 2, { 'text': 'b' }), state)
+		self.assertIs(adapter['remove_one'](state, 2), state)
+		self.assertIs(adapter['add_many'](state, []), state)
+		
+		updated = adapter['update_one'](state, 1, { 'text': 'b' })
+		self.assertIsNot(updated, state)
+		self.assertEqual(updated['entities'][1], todo(1, 'b'))
+		self.assertEqual(state['entities'][1], todo(1, 'a'))
+	
+	def test_upserts_in_a_batch(self):
+		adapter = create_entity_adapter()
+		state = adapter['get_initial_state']([todo(1, 'a'), todo(2, 'b')])
+		state = adapter['upsert_many'](state, [{ 'id': 2, 'text': 'B' }, todo(3, 'c')])
+		self.assertEqual(state['ids'], (1, 2, 3))
+		self.assertEqual(state['entities'][2], todo(2, 'B'))
+		state = adapter['upsert_one'](state, todo(0, 'z'))
+		self.assertEqual(state['ids'], (1, 2, 3, 0))
+		state = adapter['set_all'](state, [todo(9, 'x')])
+		self.assertEqual(state['ids'], (9,))
+	
+	def test_maintains_sorted_ids(self):
+		adapter = create_entity_adapter(sort_key=lambda entity: entity['text'])
+		state = adapter['get_initial_state']([todo(1, 'c'), todo(2, 'a'), todo(3, 'b')])
+		self.assertEqual(state['ids'], (1, 2, 3))
+		self.assertEqual(state['sorted_ids'], (2, 3, 1))
+		self.assertEqual(adapter['select_ids'](state), (2, 3, 1))
+		
+		state = adapter['update_one'](state, 2, { 'text': 'd' })
+		self.assertEqual(state['sorted_ids'], (3, 1, 2))
+		state = adapter['upsert_many'](state, [todo(4, 'b'), { 'id': 1, 'text': 'a' }])
+		self.assertEqual(state['sorted_ids'], (1, 3, 4, 2))
+		state = adapter['remove_one'](state, 3)
+		self.assertEqual(state['sorted_ids'], (1, 4, 2))
+		self.assertEqual([entity['text'] for entity in adapter['select_all'](state)], ['a', 'b', 'd'])
+	
+	def test_keeps_a_large_sorted_order(self):
+		adapter = create_entity_adapter(sort_key=lambda entity: entity['text'])
+		texts = [str((index * 7919) % 1000) for index in range(1000)]
+		state = adapter['get_initial_state']([todo(index, text) for index, text in enumerate(texts)])
+		for index in range(0, 1000, 3):
+			state = adapter['update_one'](state, index, { 'text': texts[index] + 'x' })
+			texts[index] += 'x'
+		state = adapter['remove_many'](state, range(0, 1000, 2))
+		expected = sorted((text, index) for index, text in enumerate(texts) if index % 2)
+		self.assertEqual(state['sorted_ids'], tuple(index for text, index in expected))
+		self.assertIs(adapter['select_ids'](state), state['sorted_ids'])
+	
+	def test_survives_pickling(self):
+		adapter = create_entity_adapter(sort_key=lambda entity: entity['text'], indexes={ 'owner': lambda entity: entity['owner'] })
+		state = pickle.loads(pickle.dumps(adapter['get_initial_state']([todo(1, 'b'), todo(2, 'a', 'bob')])))
+		self.assertEqual(state['ids'], (1, 2))
+		self.assertEqual(state['sorted_ids'], (2, 1))
+		state = adapter['add_one'](state, todo(3, 'c'))
+		state = adapter['remove_one'](state, 1)
+		self.assertEqual(state['ids'], (2, 3))
+		self.assertEqual(state['sorted_ids'], (2, 3))
+		self.assertEqual(adapter['select_ids_by'](state, 'owner', 'ann'), (3,))
+	
+	def test_maintains_secondary_indexes(self):
+		adapter = create_entity_adapter(indexes={ 'owner': lambda entity: entity['owner'] })
+		state = adapter['get_initial_state']([todo(1, 'a'), todo(2, 'b', 'bob'), todo(3, 'c')])
+		self.assertEqual(sorted(adapter['select_ids_by'](state, 'owner', 'ann')), [1, 3])
+		self.assertEqual(adapter['select_ids_by'](state, 'owner', 'bob'), (2,))
+		
+		unchanged_index = state['indexes']['owner']
+		state = adapter['update_one'](state, 1, { 'text': 'A' })
+		self.assertIs(state['indexes']['owner'], unchanged_index)
+		
+		state = adapter['update_one'](state, 2, { 'owner': 'ann' })
+		self.assertEqual(sorted(adapter['select_ids_by'](state, 'owner', 'ann')), [1, 2, 3])
+		self.assertNotIn('bob', state['indexes']['owner'])
+		state = adapter['remove_many'](state, [1, 3])
+		self.assertEqual(adapter['select_ids_by'](state, 'owner', 'ann'), (2,))
+		self.assertEqual(adapter['select_ids_by'](state, 'owner', 'carl'), ())
+	
+	def test_works_as_a_combine_reducers_slice(self):
+		adapter = create_entity_adapter()
+		
+		def todos(state=None, action=None):
+			if state is None:
+				state = adapter['get_initial_state']()
+			if action.get('type') == 'ADD_TODO':
+				return adapter['add_one'](state, action['todo'])
+			if action.get('type') == 'REMOVE_TODO':
+				return adapter['remove_one'](state, action['id'])
+			return state
+		
+		store = create_store(combine_reducers({ 'todos': todos }))
+		first_state = store['get_state']()
+		store['dispatch']({ 'type': 'REMOVE_TODO', 'id': 1 })
+		self.assertIs(store['get_state'](), first_state)
+		
+		store['dispatch']({ 'type': 'ADD_TODO', 'todo': todo(1, 'Hello') })
+		self.assertEqual(store['get_state']()['todos']['ids'], (1,))
+		self.assertEqual(adapter['select_by_id'](store['get_state']()['todos'], 1), todo(1, 'Hello'))
+	
+	def test_throws_if_state_is_not_from_the_adapter(self):
+		adapter = create_entity_adapter()
+		with self.assertRaises(Exception):
+			adapter['add_one']({ 'ids': [], 'entities': {} }, todo(1, 'a'))
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import unittest.mock as mock
+from python_redux import create_selector, create_store, combine_reducers
+from test.helpers.reducers import reducers
+from test.helpers.action_creators import add_todo, unknown_action
+
+class TestCreateSelector(unittest.TestCase):
+	def test_only_recomputes_when_inputs_change(self):
+		combiner = mock.MagicMock(side_effect=lambda todos: len(todos))
+		select_count = create_selector(lambda state: state['todos'], combiner)
+		store = create_store(combine_reducers(reducers))
+		
+		self.assertEqual(select_count(store['get_state']()), 0)
+		store['dispatch'](unknown_action())
+		self.assertEqual(select_count(store['get_state']()), 0)
+		self.assertEqual(len(combiner.call_args_list), 1)
+		
+		store['dispatch'](add_todo('Hello'))
+		self.assertEqual(select_count(store['get_state']()), 1)
+		self.assertEqual(len(combiner.call_args_list), 2)
+		self.assertEqual(select_count.cache_info(), { 'hits': 1, 'misses': 2, 'size': 1, 'max_size': 1 })
+	
+	def test_caches_on_identity_of_inputs(self):
+		combiner = mock.MagicMock(side_effect=lambda a, b: a + b)
+		selector = create_selector([lambda state: state['a'], lambda state: state['b']], combiner)
+		a = [1]
+		
+		self.assertEqual(selector({ 'a': a, 'b': [2] }), [1, 2])
+		self.assertEqual(selector({ 'a': a, 'b': [2] }), [1, 2])
+		self.assertEqual(len(combiner.call_args_list), 2)
+		
+		b = [2]
+		selector({ 'a': a, 'b': b })
+		selector({ 'a': a, 'b': b, 'c': 3 })
+		self.assertEqual(len(combiner.call_args_list), 3)
+	
+	def test_keeps_lru_cache_per_argument_tuple(self):
+		combiner = mock.MagicMock(side_effect=lambda todos, todo_id: [t for t in todos if t['id'] == todo_id])
+		select_todo = create_selector(
+			lambda state, todo_id: state,
+			lambda state, todo_id: todo_id,
+			combiner,
+			cache_size=2
+		)
+		state = [dict(id=1, text='a'), dict(id=2, text='b'), dict(id=3, text='c')]
+		
+		select_todo(state, 1)
+		select_todo(state, 2)
+		select_todo(state, 1)
+		select_todo(state, 2)
+		self.assertEqual(len(combiner.call_args_list), 2)
+		
+		select_todo(state, 3)
+		select_todo(state, 2)
+		select_todo(state, 1)
+		self.assertEqual(len(combiner.call_args_list), 4)
+		self.assertEqual(select_todo.cache_info(), { 'hits': 3, 'misses': 4, 'size': 2, 'max_size': 2 })
+		
+		select_todo.clear_cache()
+		self.assertEqual(select_todo.cache_info(), { 'hits': 0, 'misses': 0, 'size': 0, 'max_size': 2 })
+	
+	def test_does_not_cache_unhashable_arguments(self):
+		combiner = mock.MagicMock(side_effect=lambda state, keys: [state[k] for k in keys])
+		selector = create_selector(lambda state, keys: state, lambda state, keys: keys, combiner)
+		
+		self.assertEqual(selector({ 'a': 1 }, ['a']), [1])
+		self.assertEqual(selector({ 'a': 1 }, ['a']), [1])
+		self.assertEqual(selector.cache_info()['misses'], 2)
+	
+	def test_throws_if_arguments_are_invalid(self):
+		with self.assertRaises(Exception):
+			create_selector(lambda state: state)
+		with self.assertRaises(Exception):
+			create_selector('state', lambda state: state)
+		with self.assertRaises(Exception):
+			create_selector(lambda state: state, lambda x: x, cache_size=0)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -1,7 +1,7 @@
 import unittest
 import unittest.mock as mock
 
-from python_redux import create_store, combine_reducers
+from python_redux import create_store, combine_reducers, PersistentMap
 from test.helpers.action_creators import add_todo, dispatch_in_middle, throw_error, unknown_action
 from test.helpers.reducers import reducers
 
@@ -10,11 +10,14 @@ class TestCreateStoreMethod(unittest.TestCase):
 		store = create_store(combine_reducers(reducers))
 		methods = store.keys()
 		
-		self.assertEqual(len(methods), 4)
+		self.assertEqual(len(methods), 7)
 		self.assertTrue('subscribe' in methods)
 		self.assertTrue('dispatch' in methods)
+		self.assertTrue('dispatch_batch' in methods)
 		self.assertTrue('get_state' in methods)
 		self.assertTrue('replace_reducer' in methods)
+		self.assertTrue('inject_reducer' in methods)
+		self.assertTrue('remove_reducer' in methods)
 	
 	def test_throws_if_reducer_is_not_a_function(self):
 		with self.assertRaises(Exception):
@@ -251,6 +254,19 @@ class TestCreateStoreMethod(unittest.TestCase):
 		store['dispatch'](unknown_action())
 		self.assertEqual(len(listener.call_args_list), 1)
 	
+	def test_keeps_subscription_order_when_unsubscribing_out_of_order(self):
+		store = create_store(reducers['todos'])
+		calls = []
+		unsubscribes = [store['subscribe'](lambda i=i: calls.append(i)) for i in range(6)]
+		
+		unsubscribes[3]()
+		unsubscribes[0]()
+		unsubscribes[5]()
+		store['subscribe'](lambda: calls.append(6))
+		
+		store['dispatch'](unknown_action())
+		self.assertEqual(calls, [1, 2, 4, 6])
+	
 	def test_supports_removing_a_subscription_within_a_subscription(self):
 		store = create_store(reducers['todos'])
 		listener_a = mock.MagicMock()
@@ -521,8 +537,178 @@ class TestCreateStoreMethod(unittest.TestCase):
 			store['subscribe']('')
 		with self.assertRaises(Exception):
 			store['subscribe'](None)
-			
-			
+
+	def test_dispatch_batch_reduces_all_actions_and_notifies_once(self):
+		store = create_store(reducers['todos'])
+		listener = mock.MagicMock()
+		store['subscribe'](listener)
+		
+		actions = [add_todo('Hello'), unknown_action(), add_todo('World')]
+		self.assertEqual(store['dispatch_batch'](actions), actions)
+		self.assertEqual(len(listener.call_args_list), 1)
+		self.assertEqual(store['get_state'](), [
+			{
+				'id': 1,
+				'text': 'Hello'
+			},
+			{
+				'id': 2,
+				'text': 'World'
+			}
+		])
+		
+		store['dispatch_batch']([])
+		self.assertEqual(len(listener.call_args_list), 1)
+	
+	def test_dispatch_batch_leaves_state_untouched_if_reducer_throws(self):
+		store = create_store(combine_reducers(reducers))
+		listener = mock.MagicMock()
+		store['subscribe'](listener)
+		state = store['get_state']()
+		
+		with self.assertRaises(Exception):
+			store['dispatch_batch']([add_todo('Hello'), throw_error()])
+		self.assertTrue(store['get_state']() is state)
+		self.assertEqual(len(listener.call_args_list), 0)
+		
+		store['dispatch_batch']([add_todo('Hello')])
+		self.assertEqual(store['get_state']()['todos'], [{ 'id': 1, 'text': 'Hello' }])
+	
+	def test_dispatch_batch_only_accepts_plain_objects(self):
+		store = create_store(reducers['todos'])
+		for non_sequence in [None, add_todo('Hello')]:
+			with self.assertRaises(Exception):
+				store['dispatch_batch'](non_sequence)
+		with self.assertRaises(Exception):
+			store['dispatch_batch']([add_todo('Hello'), 42])
+		with self.assertRaises(Exception):
+			store['dispatch_batch']([{ 'type': None }])
+		self.assertEqual(store['get_state'](), [])
+	
+	def test_does_not_allow_dispatch_batch_from_within_reducer(self):
+		store = create_store(reducers['dispatch_in_middle_of_reducer'])
+		with self.assertRaises(Exception) as e:
+			store['dispatch'](dispatch_in_middle(lambda: store['dispatch_batch']([unknown_action()])))
+		self.assertTrue('may not dispatch' in str(e.exception))
+
+	def test_scoped_listeners_only_run_when_their_slice_changes(self):
+		store = create_store(combine_reducers(reducers))
+		todos_listener = mock.MagicMock()
+		path_listener = mock.MagicMock()
+		selector_listener = mock.MagicMock()
+		other_listener = mock.MagicMock()
+		
+		store['subscribe'](todos_listener, 'todos')
+		store['subscribe'](path_listener, ['todos', 0, 'text'])
+		store['subscribe'](selector_listener, lambda state: state['todos_reverse'])
+		store['subscribe'](other_listener, 'error_throwing_reducer')
+		
+		store['dispatch'](unknown_action())
+		self.assertEqual(len(todos_listener.call_args_list), 0)
+		self.assertEqual(len(path_listener.call_args_list), 0)
+		
+		store['dispatch'](add_todo('Hello'))
+		self.assertEqual(len(todos_listener.call_args_list), 1)
+		self.assertEqual(len(path_listener.call_args_list), 1)
+		self.assertEqual(len(selector_listener.call_args_list), 1)
+		
+		store['dispatch'](add_todo('World'))
+		self.assertEqual(len(todos_listener.call_args_list), 2)
+		self.assertEqual(len(path_listener.call_args_list), 1)
+		self.assertEqual(len(selector_listener.call_args_list), 2)
+		self.assertEqual(len(other_listener.call_args_list), 0)
+	
+	def test_skips_scoped_listeners_if_root_state_did_not_change(self):
+		store = create_store(reducers['todos'])
+		selector = mock.MagicMock(side_effect=lambda state: state)
+		listener = mock.MagicMock()
+		store['subscribe'](listener, selector)
+		self.assertEqual(len(selector.call_args_list), 1)
+		
+		store['dispatch'](unknown_action())
+		self.assertEqual(len(selector.call_args_list), 1)
+		self.assertEqual(len(listener.call_args_list), 0)
+		
+		store['subscribe'](listener, ())
+		store['dispatch'](add_todo('Hello'))
+		self.assertEqual(len(listener.call_args_list), 2)
+	
+	def test_passes_change_to_listeners_subscribed_with_change(self):
+		store = create_store(combine_reducers(reducers))
+		listener = mock.MagicMock()
+		store['subscribe'](listener, with_change=True)
+		state = store['get_state']()
+		
+		store['dispatch'](unknown_action())
+		self.assertEqual(listener.call_args, mock.call(state, state, unknown_action(), frozenset()))
+		
+		action = add_todo('Hello')
+		store['dispatch'](action)
+		self.assertEqual(listener.call_args, mock.call(state, store['get_state'](), action, frozenset(['todos', 'todos_reverse'])))
+		
+		store['replace_reducer'](lambda state, action: dict(state, extra=1))
+		args, kwargs = listener.call_args
+		self.assertEqual(args[3], frozenset(['extra']))
+	
+	def test_scoped_listener_can_unsubscribe(self):
+		store = create_store(reducers['todos'])
+		listener = mock.MagicMock()
+		unsubscribe = store['subscribe'](listener, (), with_change=True)
+		unsubscribe()
+		store['dispatch'](add_todo('Hello'))
+		self.assertEqual(len(listener.call_args_list), 0)
+	
+	def test_injects_reducer_without_reinitializing_other_slices(self):
+		calls = []
+		def todos(state=None, action=None):
+			calls.append(action['type'])
+			return reducers['todos'](state, action)
+		
+		store = create_store(combine_reducers({ 'todos': todos }))
+		store['dispatch'](add_todo('Hello'))
+		todos_state = store['get_state']()['todos']
+		listener = mock.MagicMock()
+		store['subscribe'](listener, with_change=True)
+		del calls[:]
+		
+		store['inject_reducer']('todos_reverse', reducers['todos_reverse'])
+		self.assertEqual(calls, [])
+		self.assertIs(store['get_state']()['todos'], todos_state)
+		self.assertEqual(store['get_state']()['todos_reverse'], [])
+		args, kwargs = listener.call_args
+		self.assertEqual(args[3], frozenset(['todos_reverse']))
+		
+		store['dispatch'](add_todo('World'))
+		self.assertEqual(store['get_state']()['todos_reverse'], [dict(id=1, text='World')])
+		self.assertEqual(len(store['get_state']()['todos']), 2)
+	
+	def test_removes_reducer_and_its_slice(self):
+		store = create_store(combine_reducers({ 'todos': reducers['todos'], 'todos_reverse': reducers['todos_reverse'] }), PersistentMap())
+		store['dispatch'](add_todo('Hello'))
+		listener = mock.MagicMock()
+		store['subscribe'](listener, with_change=True)
+		
+		store['remove_reducer']('todos_reverse')
+		self.assertEqual(type(store['get_state']()), PersistentMap)
+		self.assertEqual(list(store['get_state']().keys()), ['todos'])
+		args, kwargs = listener.call_args
+		self.assertEqual(args[3], frozenset(['todos_reverse']))
+		
+		store['remove_reducer']('missing')
+		self.assertEqual(len(listener.call_args_list), 1)
+		store['dispatch'](add_todo('World'))
+		self.assertEqual(list(store['get_state']().keys()), ['todos'])
+	
+	def test_sanity_checks_injected_reducer(self):
+		store = create_store(combine_reducers({ 'todos': reducers['todos'] }))
+		with self.assertRaises(Exception):
+			store['inject_reducer']('broken', lambda state, action: None)
+		with self.assertRaises(Exception):
+			store['inject_reducer']('broken', None)
+		with self.assertRaises(Exception):
+			create_store(reducers['todos'])['inject_reducer']('todos_reverse', reducers['todos_reverse'])
+		self.assertEqual(list(store['get_state']().keys()), ['todos'])
+		
 		
 if __name__ == '__main__':
 	unittest.main() 
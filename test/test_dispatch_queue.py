@@ -0,0 +1,146 @@
+import threading
+import unittest
+from concurrent.futures import CancelledError
+from python_redux import apply_middleware, compose, create_store, dispatch_queue
+from test.helpers.reducers import reducers
+from test.helpers.action_creators import add_todo, throw_error
+
+class TestDispatchQueue(unittest.TestCase):
+	def create(self, **options):
+		# The reducer holds the consumer on 'hold' actions until the gate opens
+		self.reducing = threading.Event()
+		self.gate = threading.Event()
+		todos = reducers['todos']
+		
+		def reducer(state=None, action=None):
+			if action.get('type') == 'hold':
+				self.reducing.set()
+				self.gate.wait(5)
+			if action.get('type') == 'THROW_ERROR':
+				raise Exception('Error thrown in reducer')
+			return todos(state, action)
+		store = create_store(reducer, dispatch_queue(**options))
+		self.addCleanup(self.gate.set)
+		return store
+	
+	def hold_consumer(self, store):
+		store['enqueue']({ 'type': 'hold' })
+		self.assertTrue(self.reducing.wait(5))
+	
+	def test_applies_actions_in_order_and_resolves_futures(self):
+		store = self.create()
+		futures = [store['enqueue'](add_todo(text)) for text in ['a', 'b', 'c']]
+		self.assertEqual(futures[-1].result(5), add_todo('c'))
+		self.assertEqual([todo['text'] for todo in store['get_state']()], ['a', 'b', 'c'])
+		
+		failed = store['enqueue'](throw_error())
+		with self.assertRaises(Exception):
+			failed.result(5)
+		store['close_queue']()
+		metrics = store['get_queue_metrics']()
+		self.assertEqual(metrics['enqueued'], 4)
+		self.assertEqual(metrics['applied'], 4)
+		self.assertEqual(metrics['depth'], 0)
+		self.assertGreaterEqual(metrics['max_wait_seconds'], metrics['average_wait_seconds'])
+		with self.assertRaises(Exception):
+			store['enqueue'](add_todo('d'))
+	
+	def test_block_waits_for_room(self):
+		store = self.create(max_size=1, timeout=0.05)
+		self.hold_consumer(store)
+		store['enqueue'](add_todo('a'))
+		with self.assertRaises(Exception):
+			store['enqueue'](add_todo('b'))
+		
+		timer = threading.Timer(0.05, self.gate.set)
+		timer.start()
+		store['close_queue']()
+		timer.join()
+		self.assertEqual(store['get_queue_metrics']()['peak_depth'], 1)
+	
+	def test_drops_oldest_or_newest_when_full(self):
+		store = self.create(max_size=2, policy='drop_oldest')
+		self.hold_consumer(store)
+		futures = [store['enqueue'](add_todo(text)) for text in ['a', 'b', 'c']]
+		self.gate.set()
+		store['close_queue']()
+		with self.assertRaises(CancelledError):
+			futures[0].result()
+		self.assertEqual([todo['text'] for todo in store['get_state']()], ['b', 'c'])
+		self.assertEqual(store['get_queue_metrics']()['dropped'], 1)
+		
+		store = self.create(max_size=2, policy='drop_newest')
+		self.hold_consumer(store)
+		futures = [store['enqueue'](add_todo(text)) for text in ['a', 'b', 'c']]
+		self.assertTrue(futures[2].cancelled())
+		self.gate.set()
+		store['close_queue']()
+		self.assertEqual([todo['text'] for todo in store['get_state']()], ['a', 'b'])
+	
+	def test_merges_queued_actions_by_key(self):
+		merge = lambda queued, action: dict(action, text=queued['text'] + action['text'])
+		store = self.create(policy='merge', key=lambda action: action['text'][0] if 'text' in action else None, merge=merge)
+		self.hold_consumer(store)
+		first = store['enqueue'](add_todo('a1'))
+		store['enqueue'](add_todo('b1'))
+		second = store['enqueue'](add_todo('a2'))
+		self.assertIs(first, second)
+		self.gate.set()
+		store['close_queue']()
+		self.assertEqual([todo['text'] for todo in store['get_state']()], ['a1a2', 'b1'])
+		self.assertEqual(store['get_queue_metrics']()['merged'], 1)
+	
+	def test_dispatches_queued_actions_in_batches(self):
+		store = self.create(max_batch=10)
+		notifications = []
+		store['subscribe'](lambda: notifications.append(len(store['get_state']())))
+		self.hold_consumer(store)
+		futures = [store['enqueue'](add_todo(text)) for text in ['a', 'b', 'c']]
+		self.gate.set()
+		store['close_queue']()
+		self.assertEqual([future.result() for future in futures], [add_todo('a'), add_todo('b'), add_todo('c')])
+		self.assertEqual(notifications, [0, 3])
+	
+	def test_resolves_every_future_of_a_filtered_batch(self):
+		def drop_noop(store):
+			return lambda next: lambda action: action if action.get('type') == 'noop' else next(action)
+		gate = threading.Event()
+		todos = reducers['todos']
+		
+		def reducer(state=None, action=None):
+			if action.get('type') == 'hold':
+				gate.wait(5)
+			return todos(state, action)
+		store = create_store(reducer, compose(dispatch_queue(max_batch=10), apply_middleware(drop_noop)))
+		self.addCleanup(gate.set)
+		store['enqueue']({ 'type': 'hold' })
+		actions = [{ 'type': 'noop' }, add_todo('a'), { 'type': 'noop' }, add_todo('b')]
+		futures = [store['enqueue'](action) for action in actions]
+		gate.set()
+		store['close_queue']()
+		self.assertEqual([future.result(0) for future in futures], actions)
+		self.assertEqual([todo['text'] for todo in store['get_state']()], ['a', 'b'])
+	
+	def test_feeds_the_store_from_many_producers(self):
+		store = self.create(max_size=8)
+		
+		def produce(producer):
+			for index in range(50):
+				store['enqueue'](add_todo('{}-{}'.format(producer, index)))
+		producers = [threading.Thread(target=produce, args=(producer,)) for producer in range(4)]
+		for producer in producers:
+			producer.start()
+		for producer in producers:
+			producer.join()
+		store['close_queue']()
+		self.assertEqual(len(store['get_state']()), 200)
+		self.assertLessEqual(store['get_queue_metrics']()['peak_depth'], 8)
+	
+	def test_throws_on_invalid_options(self):
+		with self.assertRaises(Exception):
+			dispatch_queue(policy='later')
+		with self.assertRaises(Exception):
+			dispatch_queue(policy='merge')
+
+if __name__ == '__main__':
+	unittest.main()
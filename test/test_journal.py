@@ -0,0 +1,124 @@
+import os
+import unittest
+from tempfile import TemporaryDirectory
+from python_redux import create_store, combine_reducers, apply_middleware, compose, journal
+from test.helpers.reducers import reducers
+from test.helpers.action_creators import add_todo, throw_error, unknown_action
+from test.helpers.middleware import thunk
+
+class TestJournal(unittest.TestCase):
+	def setUp(self):
+		self.directory = TemporaryDirectory()
+		self.path = self.directory.name
+		self.addCleanup(self.directory.cleanup)
+	
+	def create(self, reducer=None, enhancer=None, **options):
+		# Cleanups run last in first out, so journals are closed before the directory goes
+		store = create_store(reducer or combine_reducers(reducers), enhancer or journal(self.path, **options))
+		self.addCleanup(store['close_journal'])
+		return store
+	
+	def test_recovers_state_from_journal(self):
+		store = self.create()
+		store['dispatch'](add_todo('Hello'))
+		store['dispatch'](unknown_action())
+		store['dispatch_batch']([add_todo('World'), add_todo('!')])
+		state = store['get_state']()
+		store['close_journal']()
+		
+		recovered = self.create()
+		self.assertEqual(recovered['get_state'](), state)
+		recovered['dispatch'](add_todo('Again'))
+		recovered['close_journal']()
+		final = self.create()
+		self.assertEqual(final['get_state']()['todos'][-1], dict(id=4, text='Again'))
+		final['close_journal']()
+	
+	def test_snapshots_and_truncates_journal(self):
+		store = self.create(snapshot_every=3)
+		for text in ['a', 'b', 'c', 'd']:
+			store['dispatch'](add_todo(text))
+		store['close_journal']()
+		
+		self.assertTrue(os.path.exists(os.path.join(self.path, 'snapshot')))
+		replayed = []
+		def todos(state=None, action={}):
+			if action.get('type') == 'ADD_TODO':
+				replayed.append(action)
+			return reducers['todos'](state, action)
+		
+		recovered = self.create(combine_reducers(dict(reducers, todos=todos)), snapshot_every=3)
+		self.assertEqual([todo['text'] for todo in recovered['get_state']()['todos']], ['a', 'b', 'c', 'd'])
+		self.assertEqual(replayed, [add_todo('d')])
+	
+	def test_ignores_records_already_in_snapshot(self):
+		store = self.create(snapshot_every=2)
+		with open(os.path.join(self.path, 'journal'), 'rb') as f:
+			self.assertEqual(f.read(), b'')
+		store['dispatch'](add_todo('a'))
+		with open(os.path.join(self.path, 'journal'), 'rb') as f:
+			stale_journal = f.read()
+		store['dispatch'](add_todo('b'))
+		store['close_journal']()
+		# Simulate a crash between writing the snapshot and truncating the journal
+		with open(os.path.join(self.path, 'journal'), 'wb') as f:
+			f.write(stale_journal)
+		
+		self.assertEqual(len(self.create()['get_state']()['todos']), 2)
+	
+	def test_drops_torn_records(self):
+		store = self.create()
+		store['dispatch'](add_todo('Hello'))
+		store['close_journal']()
+		journal_path = os.path.join(self.path, 'journal')
+		size = os.path.getsize(journal_path)
+		with open(journal_path, 'ab') as f:
+			f.write(b'\x10\x00\x00\x00garbage')
+		
+		self.assertEqual(self.create()['get_state']()['todos'], [dict(id=1, text='Hello')])
+		self.assertEqual(os.path.getsize(journal_path), size)
+	
+	def test_does_not_journal_failed_batches(self):
+		store = self.create()
+		with self.assertRaises(Exception):
+			store['dispatch_batch']([add_todo('Lost'), throw_error()])
+		store['dispatch'](add_todo('Kept'))
+		store['close_journal']()
+		self.assertEqual(self.create()['get_state']()['todos'], [dict(id=1, text='Kept')])
+	
+	def test_journals_nested_dispatches_in_order(self):
+		store = self.create()
+		def add_reply():
+			todos = store['get_state']()['todos']
+			if todos[-1]['text'] == 'Ping':
+				store['dispatch'](add_todo('Pong'))
+		store['subscribe'](add_reply)
+		store['dispatch_batch']([add_todo('Hello'), add_todo('Ping')])
+		store['dispatch'](add_todo('Ping'))
+		state = store['get_state']()
+		store['close_journal']()
+		
+		self.assertEqual([todo['text'] for todo in state['todos']], ['Hello', 'Ping', 'Pong', 'Ping', 'Pong'])
+		self.assertEqual(self.create()['get_state'](), state)
+	
+	def test_composes_with_middleware(self):
+		store = self.create(enhancer=compose(apply_middleware(thunk), journal(self.path)))
+		store['dispatch'](lambda dispatch, get_state: dispatch(add_todo('From thunk')))
+		store['close_journal']()
+		self.assertEqual(self.create()['get_state']()['todos'], [dict(id=1, text='From thunk')])
+	
+	def test_keeps_journaling_after_reducer_injection(self):
+		store = self.create(combine_reducers({ 'todos': reducers['todos'] }))
+		store['inject_reducer']('todos_reverse', reducers['todos_reverse'])
+		store['dispatch'](add_todo('Hello'))
+		store['close_journal']()
+		
+		recovered = self.create(combine_reducers({ 'todos': reducers['todos'], 'todos_reverse': reducers['todos_reverse'] }))
+		self.assertEqual(recovered['get_state'](), {
+			'todos': [dict(id=1, text='Hello')],
+			'todos_reverse': [dict(id=1, text='Hello')]
+		})
+		recovered['close_journal']()
+
+if __name__ == '__main__':
+	unittest.main()
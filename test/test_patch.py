@@ -0,0 +1,104 @@
+import unittest
+import random
+import unittest.mock as mock
+from python_redux import PersistentMap, PersistentVector, apply_patch, combine_reducers, create_store, diff_state, patch_stream
+from test.helpers.reducers import reducers
+from test.helpers.action_creators import add_todo, unknown_action
+
+class TestPatch(unittest.TestCase):
+	def test_diffs_only_changed_subtrees(self):
+		shared = { 'big': list(range(1000)) }
+		previous = { 'a': shared, 'b': { 'c': 1, 'd': 2 }, 'e': 1 }
+		next = { 'a': shared, 'b': { 'c': 1, 'd': 3, 'f': 4 }, 'g': 1 }
+		
+		patch = diff_state(previous, next)
+		self.assertEqual(sorted(patch, key=lambda operation: operation['path']), [
+			{ 'op': 'replace', 'path': ('b', 'd'), 'value': 3 },
+			{ 'op': 'add', 'path': ('b', 'f'), 'value': 4 },
+			{ 'op': 'remove', 'path': ('e',) },
+			{ 'op': 'add', 'path': ('g',), 'value': 1 }
+		])
+		self.assertEqual(apply_patch(previous, patch), next)
+		self.assertEqual(previous, { 'a': shared, 'b': { 'c': 1, 'd': 2 }, 'e': 1 })
+		self.assertTrue(apply_patch(previous, patch)['a'] is shared)
+		self.assertEqual(diff_state(previous, previous), [])
+	
+	def test_only_looks_at_changed_keys(self):
+		previous = { 'a': 1, 'b': 2 }
+		next = { 'a': 2, 'b': 3 }
+		self.assertEqual(diff_state(previous, next, frozenset(['b'])), [{ 'op': 'replace', 'path': ('b',), 'value': 3 }])
+	
+	def test_trims_common_prefix_and_suffix_of_lists(self):
+		items = [{ 'id': i } for i in range(100)]
+		inserted = items[:50] + [{ 'id': 'new' }] + items[50:]
+		self.assertEqual(diff_state(items, inserted), [{ 'op': 'add', 'path': (50,), 'value': { 'id': 'new' } }])
+		self.assertEqual(diff_state(inserted, items), [{ 'op': 'remove', 'path': (50,) }])
+		
+		changed = list(items)
+		changed[10] = { 'id': 10, 'done': True }
+		self.assertEqual(diff_state(items, changed), [{ 'op': 'add', 'path': (10, 'done'), 'value': True }])
+	
+	def test_round_trips_random_changes(self):
+		rng = random.Random(3)
+		for container in (list, PersistentVector):
+			state = { 'items': container([0] * 5), 'map': PersistentMap(a=1) }
+			for i in range(200):
+				previous = state
+				items = list(state['items'])
+				choice = rng.randrange(3)
+				if choice == 0:
+					items.insert(rng.randrange(len(items) + 1), i)
+				elif choice == 1 and items:
+					del items[rng.randrange(len(items))]
+				elif items:
+					items[rng.randrange(len(items))] = i
+				state = { 'items': container(items), 'map': state['map'].set(rng.randrange(5), i) }
+				self.assertEqual(apply_patch(previous, diff_state(previous, state)), state)
+	
+	def test_skips_shared_nodes_of_vectors(self):
+		rng = random.Random(5)
+		vector = PersistentVector(range(3000))
+		for i in range(100):
+			previous = vector
+			choice = rng.randrange(3)
+			if choice == 0:
+				vector = vector.set(rng.randrange(len(vector)), -i)
+			elif choice == 1:
+				vector = vector.append(i)
+			else:
+				vector = vector.pop()
+			patch = diff_state(previous, vector)
+			self.assertEqual(len(patch), 1)
+			self.assertEqual(apply_patch(previous, patch), vector)
+	
+	def test_rejects_invalid_patches(self):
+		with self.assertRaises(Exception):
+			apply_patch({ 'a': 1 }, [{ 'op': 'move', 'path': ('a',) }])
+		with self.assertRaises(Exception):
+			apply_patch({ 'a': 1 }, [{ 'op': 'remove', 'path': () }])
+	
+	def test_streams_patches_that_rebuild_the_state(self):
+		store = create_store(combine_reducers(reducers), patch_stream)
+		follower_state = store['get_state']()
+		patches = []
+		def on_patch(patch, action):
+			nonlocal follower_state
+			patches.append((patch, action))
+			follower_state = apply_patch(follower_state, patch)
+		store['subscribe_patches'](on_patch)
+		store['subscribe_patches'](mock.MagicMock())
+		
+		store['dispatch'](add_todo('Hello'))
+		store['dispatch'](unknown_action())
+		store['dispatch_batch']([add_todo('World'), add_todo('!')])
+		
+		self.assertEqual(len(patches), 2)
+		patch, action = patches[0]
+		self.assertEqual(action, add_todo('Hello'))
+		self.assertEqual(len(patch), 2)
+		self.assertTrue({ 'op': 'add', 'path': ('todos', 0), 'value': dict(id=1, text='Hello') } in patch)
+		self.assertEqual(len(patches[1][0]), 4)
+		self.assertEqual(follower_state, store['get_state']())
+		
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,157 @@
+import unittest
+import random
+import unittest.mock as mock
+from python_redux import PersistentMap, PersistentVector, combine_reducers, create_store, handles
+
+class CollidingKey(object):
+	def __init__(self, value):
+		self.value = value
+	def __hash__(self):
+		return self.value % 3
+	def __eq__(self, other):
+		return isinstance(other, CollidingKey) and other.value == self.value
+
+class TestPersistentMap(unittest.TestCase):
+	def test_behaves_like_an_immutable_dict(self):
+		m1 = PersistentMap({ 'a': 1 }, b=2)
+		m2 = m1.set('c', 3)
+		m3 = m2.remove('a')
+		
+		self.assertEqual(m1, { 'a': 1, 'b': 2 })
+		self.assertEqual(m2, { 'a': 1, 'b': 2, 'c': 3 })
+		self.assertEqual(m3, { 'b': 2, 'c': 3 })
+		self.assertEqual(len(m3), 2)
+		self.assertTrue('a' in m2 and 'a' not in m3)
+		self.assertEqual(m3.get('a', 'missing'), 'missing')
+		self.assertEqual(sorted(m2.keys()), ['a', 'b', 'c'])
+		with self.assertRaises(KeyError):
+			m3['a']
+		self.assertEqual(m1.update({ 'a': 10 }, d=4), { 'a': 10, 'b': 2, 'd': 4 })
+	
+	def test_returns_itself_if_nothing_changed(self):
+		value = [1, 2, 3]
+		m = PersistentMap(a=value)
+		self.assertTrue(m.set('a', value) is m)
+		self.assertTrue(m.remove('missing') is m)
+		self.assertFalse(m.set('a', [1, 2, 3]) is m)
+	
+	def test_matches_dict_under_random_updates(self):
+		rng = random.Random(7)
+		expected = {}
+		m = PersistentMap()
+		versions = []
+		for i in range(5000):
+			key = rng.choice([rng.randint(0, 700), CollidingKey(rng.randint(0, 30))])
+			if rng.random() < 0.6:
+				value = rng.random()
+				expected[key] = value
+				m = m.set(key, value)
+			else:
+				expected.pop(key, None)
+				m = m.remove(key)
+			if i % 250 == 0:
+				versions.append((m, dict(expected)))
+		versions.append((m, expected))
+		
+		for version, items in versions:
+			self.assertEqual(len(version), len(items))
+			self.assertEqual(dict(version.items()), items)
+		for key in list(expected):
+			m = m.remove(key)
+		self.assertEqual(len(m), 0)
+		self.assertEqual(list(m), [])
+
+class TestPersistentVector(unittest.TestCase):
+	def test_behaves_like_an_immutable_list(self):
+		v1 = PersistentVector([1, 2, 3])
+		v2 = v1.append(4)
+		v3 = v2.set(0, 'a')
+		v4 = v3.pop()
+		
+		self.assertEqual(v1, [1, 2, 3])
+		self.assertEqual(v2, [1, 2, 3, 4])
+		self.assertEqual(v3, ['a', 2, 3, 4])
+		self.assertEqual(v4, ['a', 2, 3])
+		self.assertEqual(v4[-1], 3)
+		self.assertEqual(v2[1:3], [2, 3])
+		self.assertEqual(v2.index(3), 2)
+		with self.assertRaises(IndexError):
+			v1[3]
+		with self.assertRaises(IndexError):
+			PersistentVector().pop()
+	
+	def test_returns_itself_if_nothing_changed(self):
+		value = { 'id': 1 }
+		v = PersistentVector([value])
+		self.assertTrue(v.set(0, value) is v)
+		self.assertFalse(v.set(0, { 'id': 1 }) is v)
+	
+	def test_matches_list_under_random_updates(self):
+		rng = random.Random(7)
+		expected = []
+		v = PersistentVector()
+		versions = []
+		for i in range(20000):
+			operation = rng.random()
+			if operation < 0.6 or not expected:
+				expected.append(i)
+				v = v.append(i)
+			elif operation < 0.8:
+				expected.pop()
+				v = v.pop()
+			else:
+				index = rng.randrange(len(expected))
+				expected[index] = -i
+				v = v.set(index, -i)
+			if i % 1000 == 0:
+				versions.append((v, list(expected)))
+		versions.append((v, expected))
+		
+		for version, items in versions:
+			self.assertEqual(len(version), len(items))
+			self.assertEqual(list(version), items)
+		while len(v):
+			v = v.pop()
+			expected.pop()
+		self.assertEqual(list(v), expected)
+
+class TestPersistentState(unittest.TestCase):
+	def test_combine_reducers_accepts_persistent_root_state(self):
+		@handles('push')
+		def stack(state=None, action=None):
+			if state is None:
+				state = PersistentVector()
+			if action.get('type') == 'push':
+				return state.append(action.get('value'))
+			return state
+		
+		def counter(state=None, action=None):
+			if state is None:
+				state = 0
+			if action.get('type') == 'increment':
+				return state + 1
+			return state
+		
+		store = create_store(combine_reducers(dict(stack=stack, counter=counter)), PersistentMap())
+		initial_state = store['get_state']()
+		self.assertTrue(isinstance(initial_state, PersistentMap))
+		self.assertEqual(initial_state, { 'stack': [], 'counter': 0 })
+		
+		store['dispatch']({ 'type': 'unknown' })
+		self.assertTrue(store['get_state']() is initial_state)
+		
+		store['dispatch']({ 'type': 'push', 'value': 'a' })
+		store['dispatch']({ 'type': 'increment' })
+		state = store['get_state']()
+		self.assertTrue(isinstance(state, PersistentMap))
+		self.assertEqual(state, { 'stack': ['a'], 'counter': 1 })
+		self.assertEqual(initial_state, { 'stack': [], 'counter': 0 })
+	
+	@mock.patch('logging.warning', new_callable=mock.MagicMock())
+	def test_drops_unexpected_keys_from_persistent_root_state(self, logging):
+		reducer = combine_reducers({ 'counter': lambda state, action: 1 if state is None else state + 1 })
+		self.assertEqual(reducer(PersistentMap(counter=1, extra=True), { 'type': 'increment' }), { 'counter': 2 })
+		self.assertTrue('Unexpected key "extra"' in str(logging.call_args))
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+import unittest.mock as mock
+from python_redux import apply_middleware, combine_reducers, create_store, set_production_mode
+from test.helpers.reducers import reducers
+from test.helpers.action_creators import add_todo
+from test.helpers.middleware import thunk
+
+class TestProductionMode(unittest.TestCase):
+	def tearDown(self):
+		set_production_mode(False)
+
+	def test_production_store_skips_action_checks(self):
+		store = create_store(reducers['todos'], production=True)
+		store['dispatch']({})
+		store['dispatch_batch']([{ 'type': None }, add_todo('Hello')])
+		self.assertEqual(store['get_state'](), [dict(id=1, text='Hello')])
+
+		with self.assertRaises(Exception):
+			create_store(reducers['todos'])['dispatch']({})
+
+	def test_passes_production_through_enhancers(self):
+		store = create_store(reducers['todos'], apply_middleware(thunk), production=True)
+		store['dispatch']({})
+
+		store = create_store(reducers['todos'], apply_middleware(thunk))
+		with self.assertRaises(Exception):
+			store['dispatch']({})
+
+	@mock.patch('logging.warning', new_callable=mock.MagicMock())
+	def test_only_checks_state_shape_for_first_init(self, logging):
+		def foo(state=None, action=None):
+			return 1 if state is None else state
+
+		self.assertFalse(set_production_mode())
+		reducer = combine_reducers({ 'foo': foo })
+		self.assertEqual(reducer.options['sanity_check'], 'off')
+		self.assertTrue(reducer.options['production'])
+
+		reducer({ 'bar': 1 }, add_todo('Hello'))
+		self.assertEqual(len(logging.call_args_list), 0)
+		create_store(reducer, { 'bar': 1 })
+		self.assertEqual(len(logging.call_args_list), 1)
+		create_store(reducer, { 'baz': 1 })
+		reducer({ 'qux': 1 }, add_todo('Hello'))
+		self.assertEqual(len(logging.call_args_list), 1)
+
+		self.assertTrue(set_production_mode(False))
+		combine_reducers({ 'foo': foo })({ 'bar': 1 }, add_todo('Hello'))
+		self.assertEqual(len(logging.call_args_list), 2)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,154 @@
+import json
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from python_redux import create_store, combine_reducers, apply_middleware, compose, create_profiler, handles, parallel
+from test.helpers.reducers import reducers
+from test.helpers.action_creators import add_todo, unknown_action
+from test.helpers.middleware import thunk
+
+class FakeClock(object):
+	def __init__(self):
+		self.now = 0.0
+	def __call__(self):
+		return self.now
+	def advance(self, seconds):
+		self.now += seconds
+
+class TestProfiler(unittest.TestCase):
+	def test_records_reducers_listeners_and_middleware(self):
+		clock = FakeClock()
+		def slow_todos(state=None, action={}):
+			clock.advance(0.002)
+			return reducers['todos'](state, action)
+		def listener():
+			clock.advance(0.001)
+		
+		profiler = create_profiler(clock=clock)
+		store = create_store(
+			combine_reducers({ 'todos': slow_todos, 'other': combine_reducers({ 'todos_reverse': reducers['todos_reverse'] }) }),
+			compose(apply_middleware(*profiler['middleware'](thunk)), profiler['enhancer'])
+		)
+		store['subscribe'](listener)
+		store['dispatch'](add_todo('Hello'))
+		store['dispatch'](unknown_action())
+		
+		components = profiler['snapshot']()['components']
+		self.assertEqual(sorted(components['reducer'].keys()), ['@root', 'other', 'other.todos_reverse', 'todos'])
+		todos = components['reducer']['todos']
+		self.assertEqual(todos['calls'], 3)
+		self.assertAlmostEqual(todos['mean'], 0.002)
+		self.assertAlmostEqual(todos['p50'], 0.002, delta=0.0003)
+		self.assertAlmostEqual(todos['p99'], 0.002, delta=0.0003)
+		self.assertEqual(todos['by_action_type']['ADD_TODO']['calls'], 1)
+		self.assertEqual(todos['by_action_type']['@@redux/INIT']['calls'], 1)
+		
+		root = components['reducer']['@root']
+		self.assertAlmostEqual(root['mean'], 0.0)
+		self.assertAlmostEqual(root['inclusive_mean'], 0.002)
+		
+		listener_stats = components['listener'][listener.__module__ + '.' + listener.__qualname__]
+		self.assertEqual(listener_stats['calls'], 2)
+		self.assertEqual(sorted(listener_stats['by_action_type'].keys()), ['ADD_TODO', 'UNKNOWN_ACTION'])
+		self.assertAlmostEqual(listener_stats['max'], 0.001)
+		
+		middleware_stats = components['middleware'][thunk.__module__ + '.thunk']
+		self.assertEqual(middleware_stats['calls'], 2)
+		self.assertAlmostEqual(middleware_stats['mean'], 0.0)
+		self.assertAlmostEqual(middleware_stats['inclusive_mean'], 0.003)
+		self.assertEqual(components['dispatch']['dispatch']['calls'], 2)
+		self.assertEqual(json.loads(profiler['to_json']()), profiler['snapshot']())
+		
+		self.assertEqual(store['get_state']()['todos'], [dict(id=1, text='Hello')])
+	
+	def test_counts_every_call_but_only_times_sampled_dispatches(self):
+		profiler = create_profiler(sample_rate=0)
+		store = create_store(combine_reducers(reducers), profiler['enhancer'])
+		store['dispatch'](add_todo('Hello'))
+		todos = profiler['snapshot']()['components']['reducer']['todos']
+		self.assertEqual(todos['calls'], 2)
+		self.assertEqual(todos['sampled'], 0)
+		self.assertEqual(todos['p99'], None)
+		
+		profiler['reset']()
+		self.assertEqual(profiler['snapshot']()['components'], {})
+	
+	def test_counts_unsampled_calls_from_every_thread(self):
+		profiler = create_profiler(sample_rate=0)
+		store = create_store(combine_reducers(reducers), profiler['enhancer'])
+		lock = threading.Lock()
+		def dispatch_many():
+			for _ in range(100):
+				with lock:
+					store['dispatch'](unknown_action())
+		threads = [threading.Thread(target=dispatch_many) for _ in range(4)]
+		for thread in threads:
+			thread.start()
+		for thread in threads:
+			thread.join()
+		todos = profiler['snapshot']()['components']['reducer']['todos']
+		self.assertEqual(todos['calls'], 401)
+		self.assertEqual(todos['by_action_type']['UNKNOWN_ACTION']['calls'], 400)
+	
+	def test_keeps_action_type_routing_and_change_detection(self):
+		calls = []
+		@handles('increment')
+		def counter(state=None, action=None):
+			calls.append(action['type'])
+			if state is None:
+				state = 0
+			return state + 1 if action['type'] == 'increment' else state
+		
+		profiler = create_profiler()
+		store = create_store(combine_reducers({ 'counter': counter, 'todos': reducers['todos'] }), profiler['enhancer'])
+		changes = []
+		store['subscribe'](lambda *change: changes.append(change[3]), with_change=True)
+		store['dispatch'](add_todo('Hello'))
+		store['replace_reducer'](combine_reducers({ 'counter': counter, 'todos': reducers['todos'] }))
+		store['dispatch']({ 'type': 'increment' })
+		
+		self.assertEqual([c for c in calls if not c.startswith('@@redux/')], ['increment'])
+		self.assertEqual(changes, [frozenset(['todos']), frozenset(), frozenset(['counter'])])
+	
+	def test_keeps_the_action_types_of_middleware(self):
+		seen = []
+		@handles('increment')
+		def only_increments(store):
+			def apply_next(next):
+				def apply_action(action):
+					seen.append(action['type'])
+					return next(action)
+				return apply_action
+			return apply_next
+		
+		profiler = create_profiler()
+		instrumented = profiler['middleware'](only_increments)
+		self.assertEqual(instrumented[0].action_types, only_increments.action_types)
+		store = create_store(reducers['todos'], compose(apply_middleware(*instrumented), profiler['enhancer']))
+		store['dispatch'](add_todo('Hello'))
+		store['dispatch']({ 'type': 'increment' })
+		self.assertEqual(seen, ['increment'])
+	
+	def test_keeps_parallel_slices_on_the_executor(self):
+		threads = []
+		@parallel
+		def todos(state=None, action=None):
+			threads.append(threading.current_thread())
+			return reducers['todos'](state, action)
+		
+		profiler = create_profiler()
+		with ThreadPoolExecutor(1) as executor:
+			store = create_store(combine_reducers({ 'todos': todos, 'other': reducers['todos_reverse'] }, executor=executor), profiler['enhancer'])
+			threads[:] = []
+			store['dispatch'](add_todo('Hello'))
+		self.assertEqual(len(threads), 1)
+		self.assertIsNot(threads[0], threading.current_thread())
+		self.assertEqual(store['get_state']()['todos'], [dict(id=1, text='Hello')])
+		self.assertEqual(profiler['snapshot']()['components']['reducer']['todos']['by_action_type']['ADD_TODO']['calls'], 1)
+	
+	def test_throws_if_sample_rate_is_invalid(self):
+		with self.assertRaises(Exception):
+			create_profiler(sample_rate=2)
+
+if __name__ == '__main__':
+	unittest.main()
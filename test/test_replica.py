@@ -0,0 +1,85 @@
+import threading
+import unittest
+import unittest.mock as mock
+from multiprocessing import Pipe, Process
+from python_redux import combine_reducers, create_replica, create_store, replication
+from test.helpers.reducers import reducers
+from test.helpers.action_creators import add_todo, unknown_action
+
+def create_primary():
+	return create_store(combine_reducers({ 'todos': reducers['todos'], 'todos_reverse': reducers['todos_reverse'] }), replication)
+
+def count_todos_in_replica(connection, results):
+	replica = create_replica(connection, background=False)
+	while len((replica['get_state']() or {}).get('todos', [])) < 3:
+		replica['poll'](1)
+	results.send((replica['get_state'](), replica['lag']()))
+
+class TestReplica(unittest.TestCase):
+	def test_follows_primary_through_patches(self):
+		primary = create_primary()
+		primary['dispatch'](add_todo('Hello'))
+		sender, receiver = Pipe()
+		primary['add_replica'](sender)
+		replica = create_replica(receiver, background=False)
+		self.assertEqual(replica['poll'](), 1)
+		self.assertEqual(replica['get_state'](), primary['get_state']())
+		
+		listener = mock.MagicMock()
+		replica['subscribe'](listener, 'todos', with_change=True)
+		primary['dispatch'](add_todo('World'))
+		primary['dispatch'](unknown_action())
+		primary['dispatch_batch']([add_todo('!'), add_todo('?')])
+		self.assertEqual(replica['poll'](), 2)
+		self.assertEqual(replica['get_state'](), primary['get_state']())
+		self.assertEqual(len(listener.call_args_list), 2)
+		args, kwargs = listener.call_args
+		self.assertEqual(args[2], add_todo('?'))
+		
+		lag = replica['lag']()
+		self.assertEqual(lag['sequence'], 2)
+		self.assertEqual(lag['updates'], 3)
+		self.assertTrue(lag['seconds'] >= 0)
+		self.assertFalse('dispatch' in replica)
+	
+	def test_applies_updates_in_the_background(self):
+		primary = create_primary()
+		sender, receiver = Pipe()
+		primary['add_replica'](sender)
+		replica = create_replica(receiver)
+		updated = threading.Event()
+		replica['subscribe'](lambda: updated.set() if len(replica['get_state']()['todos']) == 2 else None)
+		
+		primary['dispatch'](add_todo('Hello'))
+		primary['dispatch'](add_todo('World'))
+		self.assertTrue(updated.wait(10))
+		self.assertEqual(replica['get_state'](), primary['get_state']())
+		replica['close']()
+	
+	def test_drops_replicas_that_went_away(self):
+		primary = create_primary()
+		sender, receiver = Pipe()
+		remove = primary['add_replica'](sender)
+		receiver.close()
+		primary['dispatch'](add_todo('Hello'))
+		remove()
+		with self.assertRaises(Exception):
+			primary['add_replica'](None)
+	
+	def test_feeds_replica_in_another_process(self):
+		primary = create_primary()
+		sender, receiver = Pipe()
+		results, results_sender = Pipe(duplex=False)
+		worker = Process(target=count_todos_in_replica, args=(receiver, results_sender))
+		worker.start()
+		primary['add_replica'](sender)
+		for text in ('a', 'b', 'c'):
+			primary['dispatch'](add_todo(text))
+		self.assertTrue(results.poll(10))
+		state, lag = results.recv()
+		worker.join(10)
+		self.assertEqual(state, primary['get_state']())
+		self.assertEqual(lag['sequence'], 3)
+		
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,102 @@
+import asyncio
+import threading
+import unittest
+from python_redux import apply_middleware, coalesce, create_store, debounce, immediate, next_tick, throttle
+from test.helpers.reducers import reducers
+from test.helpers.action_creators import add_todo
+from test.helpers.middleware import thunk
+
+class TestSchedulers(unittest.TestCase):
+	def test_immediate_notifies_within_dispatch(self):
+		store = create_store(reducers['todos'], scheduler=immediate)
+		seen = []
+		store['subscribe'](lambda: seen.append(len(store['get_state']())))
+		store['dispatch'](add_todo('a'))
+		store['dispatch'](add_todo('b'))
+		self.assertEqual(seen, [1, 2])
+	
+	def test_coalesces_nested_dispatches(self):
+		def create(scheduler):
+			store = create_store(reducers['todos'], scheduler=scheduler)
+			seen = []
+			
+			def dispatching_listener():
+				if len(store['get_state']()) == 1:
+					for text in ['b', 'c', 'd']:
+						store['dispatch'](add_todo(text))
+			store['subscribe'](dispatching_listener)
+			store['subscribe'](lambda: seen.append(len(store['get_state']())))
+			store['dispatch'](add_todo('a'))
+			self.assertEqual(len(store['get_state']()), 4)
+			return seen
+		
+		self.assertEqual(create(None), [2, 3, 4, 4])
+		self.assertEqual(create(coalesce), [4, 4])
+	
+	def test_debounce_notifies_once_after_a_burst(self):
+		store = create_store(reducers['todos'], scheduler=debounce(0.05))
+		notified = threading.Event()
+		seen = []
+		
+		def listener():
+			seen.append(len(store['get_state']()))
+			notified.set()
+		store['subscribe'](listener)
+		for text in ['a', 'b', 'c']:
+			store['dispatch'](add_todo(text))
+		self.assertEqual(seen, [])
+		self.assertTrue(notified.wait(2))
+		self.assertEqual(seen, [3])
+	
+	def test_debounce_max_wait_bounds_the_delay(self):
+		store = create_store(reducers['todos'], scheduler=debounce(10, max_wait=0.05))
+		notified = threading.Event()
+		store['subscribe'](notified.set)
+		store['dispatch'](add_todo('a'))
+		self.assertTrue(notified.wait(2))
+	
+	def test_throttle_notifies_with_the_latest_state(self):
+		store = create_store(reducers['todos'], scheduler=throttle(0.05))
+		notified = threading.Event()
+		seen = []
+		
+		def listener():
+			seen.append(len(store['get_state']()))
+			notified.set()
+		store['subscribe'](listener)
+		for text in ['a', 'b']:
+			store['dispatch'](add_todo(text))
+		self.assertTrue(notified.wait(2))
+		self.assertEqual(seen, [2])
+	
+	def test_next_tick_notifies_once_per_loop_iteration(self):
+		async def run():
+			store = create_store(reducers['todos'], scheduler=next_tick())
+			seen = []
+			store['subscribe'](lambda: seen.append(len(store['get_state']())))
+			store['dispatch'](add_todo('a'))
+			store['dispatch_batch']([add_todo('b'), add_todo('c')])
+			self.assertEqual(seen, [])
+			await asyncio.sleep(0)
+			return seen
+		self.assertEqual(asyncio.run(run()), [3])
+	
+	def test_passes_the_scheduler_through_enhancers(self):
+		store = create_store(reducers['todos'], apply_middleware(thunk), scheduler=coalesce)
+		seen = []
+		
+		def dispatching_listener():
+			if len(store['get_state']()) == 1:
+				store['dispatch'](add_todo('b'))
+				store['dispatch'](add_todo('c'))
+		store['subscribe'](dispatching_listener)
+		store['subscribe'](lambda: seen.append(len(store['get_state']())))
+		store['dispatch'](add_todo('a'))
+		self.assertEqual(seen, [3, 3])
+	
+	def test_throws_if_scheduler_is_not_a_function(self):
+		with self.assertRaises(Exception):
+			create_store(reducers['todos'], scheduler='later')
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,115 @@
+import time
+import unittest
+import unittest.mock as mock
+from threading import Thread, Barrier
+from python_redux import create_store, combine_reducers, apply_middleware, compose, thread_safe
+from test.helpers.reducers import reducers
+from test.helpers.action_creators import add_todo, dispatch_in_middle, unknown_action
+
+PRODUCERS = 32
+ACTIONS_PER_PRODUCER = 250
+
+class TestThreadSafe(unittest.TestCase):
+	def test_serializes_dispatches_from_many_threads(self):
+		store = create_store(combine_reducers({ 'counter': reducers['counter'], 'todos': reducers['todos'] }), thread_safe)
+		notified = []
+		store['subscribe'](lambda: notified.append(store['get_state']()['counter']))
+		barrier = Barrier(PRODUCERS + 1)
+		errors = []
+		
+		def produce():
+			barrier.wait()
+			try:
+				for i in range(ACTIONS_PER_PRODUCER):
+					store['dispatch']({ 'type': 'increment' })
+			except Exception as e:
+				errors.append(e)
+		
+		def read():
+			barrier.wait()
+			last = 0
+			while last < PRODUCERS * ACTIONS_PER_PRODUCER:
+				current = store['get_state']()['counter']
+				if current < last:
+					errors.append(Exception('State went backwards'))
+				last = current
+		
+		threads = [Thread(target=produce) for i in range(PRODUCERS)] + [Thread(target=read)]
+		for thread in threads:
+			thread.start()
+		for thread in threads:
+			thread.join()
+		
+		self.assertEqual(errors, [])
+		self.assertEqual(store['get_state']()['counter'], PRODUCERS * ACTIONS_PER_PRODUCER)
+		self.assertEqual(notified, list(range(1, PRODUCERS * ACTIONS_PER_PRODUCER + 1)))
+	
+	def test_serializes_subscriptions_from_many_threads(self):
+		store = create_store(reducers['counter'], thread_safe)
+		listener = mock.MagicMock()
+		
+		def churn():
+			for i in range(100):
+				store['subscribe'](listener)()
+				store['dispatch']({ 'type': 'increment' })
+		
+		threads = [Thread(target=churn) for i in range(PRODUCERS)]
+		for thread in threads:
+			thread.start()
+		for thread in threads:
+			thread.join()
+		
+		listener.reset_mock()
+		store['dispatch'](unknown_action())
+		self.assertEqual(len(listener.call_args_list), 0)
+		self.assertEqual(store['get_state'](), PRODUCERS * 100)
+	
+	def test_allows_nested_dispatch_from_listeners(self):
+		store = create_store(reducers['todos'], thread_safe)
+		def add_once():
+			if len(store['get_state']()) == 1:
+				store['dispatch'](add_todo('World'))
+		store['subscribe'](add_once)
+		store['dispatch'](add_todo('Hello'))
+		self.assertEqual(store['get_state'](), [dict(id=1, text='Hello'), dict(id=2, text='World')])
+	
+	def test_still_does_not_allow_dispatch_from_within_reducer(self):
+		store = create_store(reducers['dispatch_in_middle_of_reducer'], thread_safe)
+		with self.assertRaises(Exception) as e:
+			store['dispatch'](dispatch_in_middle(lambda: store['dispatch'](unknown_action())))
+		self.assertTrue('may not dispatch' in str(e.exception))
+	
+	def test_composes_with_middleware(self):
+		def spy(store):
+			return lambda next: lambda action: next(action)
+		store = create_store(reducers['todos'], compose(apply_middleware(spy), thread_safe))
+		store['dispatch_batch']([add_todo('Hello'), add_todo('World')])
+		self.assertEqual(len(store['get_state']()), 2)
+	
+	def test_keeps_batches_from_many_threads_apart(self):
+		def yielding(store):
+			def apply_next(next):
+				def apply_action(action):
+					time.sleep(0)
+					return next(action)
+				return apply_action
+			return apply_next
+		store = create_store(reducers['counter'], compose(apply_middleware(yielding), thread_safe))
+		notified = []
+		store['subscribe'](lambda: notified.append(store['get_state']()))
+		barrier = Barrier(8)
+		
+		def produce():
+			barrier.wait()
+			for i in range(20):
+				store['dispatch_batch']([{ 'type': 'increment' }] * 5)
+		
+		threads = [Thread(target=produce) for i in range(8)]
+		for thread in threads:
+			thread.start()
+		for thread in threads:
+			thread.join()
+		self.assertEqual(notified, list(range(5, 8 * 20 * 5 + 1, 5)))
+
+if __name__ == '__main__':
+	unittest.main()
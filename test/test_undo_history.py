@@ -0,0 +1,119 @@
+import unittest
+from python_redux import apply_middleware, combine_reducers, compose, create_store, undo_history
+from test.helpers.reducers import reducers
+from test.helpers.action_creators import add_todo, unknown_action
+from test.helpers.middleware import thunk
+
+def texts(store):
+	return [todo['text'] for todo in store['get_state']()['todos']]
+
+class TestUndoHistory(unittest.TestCase):
+	def create(self, **options):
+		return create_store(combine_reducers({ 'todos': reducers['todos'] }), undo_history(group_by=None, **options))
+	
+	def test_undoes_and_redoes(self):
+		store = self.create()
+		self.assertFalse(store['undo']())
+		store['dispatch'](add_todo('a'))
+		store['dispatch'](add_todo('b'))
+		store['dispatch'](unknown_action())
+		self.assertEqual(store['get_history']()['index'], 2)
+		
+		self.assertTrue(store['undo']())
+		self.assertEqual(texts(store), ['a'])
+		self.assertTrue(store['undo']())
+		self.assertEqual(texts(store), [])
+		self.assertFalse(store['undo']())
+		self.assertTrue(store['redo']())
+		self.assertTrue(store['redo']())
+		self.assertEqual(texts(store), ['a', 'b'])
+		self.assertFalse(store['redo']())
+	
+	def test_new_actions_drop_the_redo_entries(self):
+		store = self.create()
+		for text in ['a', 'b', 'c']:
+			store['dispatch'](add_todo(text))
+		store['jump'](1)
+		self.assertEqual(texts(store), ['a'])
+		store['dispatch'](add_todo('d'))
+		self.assertEqual(texts(store), ['a', 'd'])
+		self.assertEqual(len(store['get_history']()['actions']), 3)
+		self.assertFalse(store['redo']())
+		
+		with self.assertRaises(Exception):
+			store['jump'](3)
+	
+	def test_notifies_listeners_when_moving_through_history(self):
+		store = self.create()
+		store['dispatch'](add_todo('a'))
+		seen = []
+		store['subscribe'](lambda: seen.append(texts(store)))
+		store['undo']()
+		store['redo']()
+		self.assertEqual(seen, [[], ['a']])
+	
+	def test_shares_state_between_entries(self):
+		store = create_store(combine_reducers({ 'todos': reducers['todos'], 'count': reducers['counter'] }), undo_history())
+		store['dispatch'](add_todo('a'))
+		todos = store['get_state']()['todos']
+		store['dispatch']({ 'type': 'increment' })
+		store['undo']()
+		self.assertIs(store['get_state']()['todos'], todos)
+	
+	def test_limits_the_number_of_entries(self):
+		store = self.create(limit=2)
+		for text in ['a', 'b', 'c', 'd']:
+			store['dispatch'](add_todo(text))
+		history = store['get_history']()
+		self.assertEqual(history['index'], 2)
+		self.assertEqual(history['actions'], (None, add_todo('c'), add_todo('d')))
+		store['undo']()
+		store['undo']()
+		self.assertFalse(store['undo']())
+		self.assertEqual(texts(store), ['a', 'b'])
+	
+	def test_limits_the_estimated_bytes(self):
+		store = create_store(reducers['todos'], undo_history(limit=None, max_bytes=2000, group_by=None))
+		for index in range(100):
+			store['dispatch'](add_todo('todo {}'.format(index)))
+		history = store['get_history']()
+		self.assertLessEqual(history['bytes'], 2000)
+		self.assertLess(len(history['actions']), 100)
+		self.assertGreater(len(history['actions']), 1)
+	
+	def test_merges_consecutive_actions_of_the_same_type(self):
+		store = create_store(combine_reducers({ 'todos': reducers['todos'], 'count': reducers['counter'] }), undo_history())
+		store['dispatch'](add_todo('a'))
+		for index in range(5):
+			store['dispatch']({ 'type': 'increment' })
+		store['dispatch'](add_todo('b'))
+		self.assertEqual(len(store['get_history']()['actions']), 4)
+		
+		store['undo']()
+		self.assertEqual(store['get_state']()['count'], 5)
+		store['undo']()
+		self.assertEqual(store['get_state']()['count'], 0)
+		self.assertEqual(texts(store), ['a'])
+		store['dispatch']({ 'type': 'increment' })
+		self.assertEqual(store['get_history']()['index'], 2)
+	
+	def test_clears_history_when_replacing_the_reducer(self):
+		store = self.create()
+		store['dispatch'](add_todo('a'))
+		store['replace_reducer'](combine_reducers({ 'todos': reducers['todos'], 'count': reducers['counter'] }))
+		self.assertEqual(store['get_history']()['index'], 0)
+		store['dispatch']({ 'type': 'increment' })
+		store['undo']()
+		self.assertEqual(store['get_state'](), { 'todos': [dict(id=1, text='a')], 'count': 0 })
+		
+		store['inject_reducer']('other', reducers['counter'])
+		self.assertFalse(store['undo']())
+	
+	def test_works_with_middleware(self):
+		store = create_store(reducers['todos'], compose(apply_middleware(thunk), undo_history()))
+		store['dispatch'](lambda dispatch, get_state: dispatch(add_todo('a')))
+		self.assertTrue(store['undo']())
+		self.assertEqual(store['get_state'](), [])
+
+if __name__ == '__main__':
+	unittest.main()